@@ -0,0 +1,117 @@
+"""
+Queries per second of batch search against one query per call, at several
+batch sizes.
+
+By default the corpus is generated and searched in process, so the numbers
+are the scoring alone: Corpus.search per query against Corpus.search_batch
+per batch. With --url the same queries go to a running server instead, as
+POST /search per query against POST /search/batch per batch, which adds the
+HTTP round trip a batch saves.
+
+Run from MCP Server/:
+    python benchmarks/bench_batch.py [--documents 10] [--size-mb 1] [--queries 512] [--batch-sizes 1,8,32,100]
+    python benchmarks/bench_batch.py --url http://127.0.0.1:8000
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.bench_search import QUERIES, WORDS, generate_corpus
+from corpus import Corpus, Document
+from search_index import SentenceIndex
+
+
+def generate_queries(count: int, seed: int = 11) -> list:
+    """QUERIES plus random two to four word questions over the same vocabulary"""
+    rng = random.Random(seed)
+    queries = list(QUERIES)
+    while len(queries) < count:
+        queries.append(" ".join(rng.choices(WORDS, k=rng.randint(2, 4))))
+    return queries[:count]
+
+
+def generate_index_corpus(documents: int, size_mb: float) -> Corpus:
+    corpus = {}
+    for i in range(documents):
+        file_id = f"policy-{i:03d}"
+        text = generate_corpus(size_mb / documents, seed=i)
+        corpus[file_id] = Document(file_id, f"{file_id}.txt", "generated", len(text), SentenceIndex.from_text(text))
+    return Corpus(corpus)
+
+
+def queries_per_second(run_batch, queries: list, batch_size: int) -> tuple:
+    """QPS of answering all queries batch_size at a time, and the results in query order"""
+    results = []
+    start = time.perf_counter()
+    for first in range(0, len(queries), batch_size):
+        results.extend(run_batch(queries[first:first + batch_size]))
+    return len(queries) / (time.perf_counter() - start), results
+
+
+def http_backend(url: str, k: int):
+    import requests
+    session = requests.Session()
+
+    def post(path, body):
+        response = session.post(f"{url}{path}", json=body, timeout=30)
+        response.raise_for_status()
+        return response.json()
+
+    def single(queries):
+        return [post("/search", {"query": query, "k": k})["results"] for query in queries]
+
+    def batch(queries):
+        return [entry["results"] for entry in post("/search/batch", {"queries": queries, "k": k})["results"]]
+
+    return single, batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=10)
+    parser.add_argument("--size-mb", type=float, default=1, help="total size of the generated documents")
+    parser.add_argument("--queries", type=int, default=512)
+    parser.add_argument("--batch-sizes", default="1,8,32,100", help="comma-separated queries per batch call (the server takes up to 100)")
+    parser.add_argument("--k", type=int, default=5, help="results per query")
+    parser.add_argument("--url", default=None, help="benchmark a running server over HTTP instead")
+    parser.add_argument("--output", default=None, help="write the results as JSON")
+    args = parser.parse_args()
+
+    queries = generate_queries(args.queries)
+    if args.url:
+        print(f"🌐 {args.url}, {len(queries)} queries")
+        single, batch = http_backend(args.url.rstrip("/"), args.k)
+    else:
+        corpus = generate_index_corpus(args.documents, args.size_mb)
+        print(f"📚 {args.documents} documents, {args.size_mb}MB, {corpus.sentences} sentences, {len(queries)} queries")
+
+        def single(queries):
+            return [corpus.search(query, args.k) for query in queries]
+
+        def batch(queries):
+            return corpus.search_batch(queries, args.k)
+
+    # Warm up both paths once
+    single(queries[:8])
+    batch(queries[:8])
+
+    single_qps, expected = queries_per_second(single, queries, 1)
+    print(f"🐢 One query per call: {single_qps:.0f} queries/s")
+    results = {"queries": len(queries), "single_qps": round(single_qps, 1), "batch": []}
+    for batch_size in [int(size) for size in args.batch_sizes.split(",")]:
+        qps, answered = queries_per_second(batch, queries, batch_size)
+        assert answered == expected, "batch results differ from single-query results"
+        results["batch"].append({"batch_size": batch_size, "qps": round(qps, 1), "speedup": round(qps / single_qps, 2)})
+        print(f"⚡ Batches of {batch_size}: {qps:.0f} queries/s ({qps / single_qps:.2f}x)")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
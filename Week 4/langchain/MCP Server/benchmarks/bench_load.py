@@ -0,0 +1,123 @@
+"""
+Peak memory of loading a large corpus: the buffered loader (each download
+held in a BytesIO, decoded into one string, then indexed) against the
+streamed one (downloads written to disk in chunks, text extracted from the
+file and read back into the index a chunk at a time).
+
+Each loader runs in a fresh process, so its peak RSS is its own. The corpus
+is one large generated text file plus a generated PDF, served by a local
+fake Drive (LocalDriveClient).
+
+Run from MCP Server/:
+    python benchmarks/bench_load.py [--text-mb 50] [--pdf-pages 300]
+"""
+import argparse
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.bench_pdf import generate_pdf, serial_extract
+from benchmarks.bench_search import generate_corpus
+
+MODES = ("buffered", "streamed")
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / (1 << 10)
+
+
+def buffered_load(drive: Path) -> int:
+    """The loader before streaming; returns the number of sentences indexed"""
+    from search_index import SentenceIndex
+    sentences = 0
+    for path in sorted(drive.iterdir()):
+        # What MediaIoBaseDownload into a BytesIO left behind
+        file_content = io.BytesIO(path.read_bytes())
+        if path.suffix == ".pdf":
+            text = serial_extract(file_content.getvalue())
+        else:
+            text = file_content.getvalue().decode('utf-8', errors='ignore')
+        sentences += len(SentenceIndex.from_text(text))
+    return sentences
+
+
+def streamed_load(drive: Path, cache_dir: Path) -> int:
+    """sync_drive into a cold cache, then the corpus built from it"""
+    from corpus import Corpus
+    from drive_sync import CorpusCache, LocalDriveClient, sync_drive
+    cache = CorpusCache(cache_dir)
+    result = sync_drive(LocalDriveClient(drive), cache, folder_id=".")
+    return Corpus().updated(result.files, cache).sentences
+
+
+def child(mode: str, drive: Path, cache_dir: Path):
+    """Runs in its own process: load once and print the measurements as JSON"""
+    import corpus, drive_sync  # noqa: F401 -- count the imports in the baseline, not the load
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    if mode == "buffered":
+        sentences = buffered_load(drive)
+    else:
+        sentences = streamed_load(drive, cache_dir)
+    seconds = time.perf_counter() - start
+    print(json.dumps({
+        "mode": mode,
+        "seconds": round(seconds, 2),
+        "sentences": sentences,
+        "baseline_mb": round(baseline, 1),
+        "peak_mb": round(peak_rss_mb(), 1),
+        "growth_mb": round(peak_rss_mb() - baseline, 1),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--text-mb", type=float, default=50, help="size of the generated text document")
+    parser.add_argument("--pdf-pages", type=int, default=300, help="pages of the generated PDF (0 for none)")
+    parser.add_argument("--output", default=None, help="write the results as JSON")
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--drive", help=argparse.SUPPRESS)
+    parser.add_argument("--cache", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child, Path(args.drive), Path(args.cache))
+        return
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        drive = Path(workdir) / "drive"
+        drive.mkdir()
+        (drive / "policy.txt").write_text(generate_corpus(args.text_mb), encoding="utf-8")
+        if args.pdf_pages:
+            (drive / "handbook.pdf").write_bytes(generate_pdf(args.pdf_pages))
+        size_mb = sum(path.stat().st_size for path in drive.iterdir()) / 1e6
+        print(f"📚 {size_mb:.1f}MB on the fake Drive: {args.text_mb}MB of text, {args.pdf_pages} PDF pages")
+
+        for mode in MODES:
+            cache_dir = Path(workdir) / f"cache-{mode}"
+            env = dict(os.environ, PDF_PAGE_CACHE_DIR=str(cache_dir / "pages"))
+            output = subprocess.run(
+                [sys.executable, __file__, "--child", mode, "--drive", str(drive), "--cache", str(cache_dir)],
+                env=env, capture_output=True, text=True, check=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            results.append(result)
+            print(f"{'🐢' if mode == 'buffered' else '⚡'} {mode}: peak RSS {result['peak_mb']}MB "
+                  f"(+{result['growth_mb']}MB while loading), {result['seconds']}s, {result['sentences']} sentences")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
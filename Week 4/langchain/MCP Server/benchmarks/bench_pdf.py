@@ -0,0 +1,128 @@
+"""
+PDF extraction benchmark on a generated multi-hundred-page PDF: the old
+serial page loop against the process pool at several worker counts, a
+fully cached run, and a resume after half the cached pages were lost
+(what a crash mid-extraction leaves behind).
+
+The pool is only used with more than one core and at least
+PDF_PARALLEL_MIN_PAGES pages (see parallel_workers); otherwise a worker
+count runs the serial path, reported as 0 processes. On one core the pool
+measured 0.89x at 2 workers and 0.76x at 4 for 80 pages, hence the gate.
+
+Run from MCP Server/:
+    python benchmarks/bench_pdf.py [--pages 400] [--workers 1,2,4,<cores>]
+"""
+import argparse
+import io
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PyPDF2 import PdfReader
+from benchmarks.bench_search import WORDS
+from pdf_extract import PageCache, extract_pdf_text, parallel_workers
+
+
+def generate_pdf(pages: int, lines_per_page: int = 45, seed: int = 7) -> bytes:
+    """A plain PDF 1.4 file: one Helvetica text stream of random insurance sentences per page"""
+    rng = random.Random(seed)
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for _ in range(pages):
+        lines = [" ".join(rng.choices(WORDS, k=rng.randint(8, 14))).capitalize() + "." for _ in range(lines_per_page)]
+        text = " Tj T* ".join(f"({line})" for line in lines)
+        stream = f"BT /F1 10 Tf 12 TL 50 780 Td {text} Tj ET".encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(b"%d 0 R" % kid for kid in kids), pages)
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    out.write(b"".join(b"%010d 00000 n \n" % offset for offset in offsets))
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def serial_extract(data: bytes) -> str:
+    """The loader's extraction before the pool and the page cache"""
+    pdf_reader = PdfReader(io.BytesIO(data))
+    text_content = []
+    for page_num, page in enumerate(pdf_reader.pages, 1):
+        page_text = page.extract_text()
+        if page_text:
+            text_content.append(f"--- Page {page_num} ---\n{page_text}\n")
+    return "\n".join(text_content)
+
+
+def timed(function, *args, **kwargs) -> tuple:
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def main():
+    cores = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=400)
+    parser.add_argument("--workers", default=",".join(str(w) for w in sorted({1, 2, 4, cores})))
+    parser.add_argument("--output", default=None, help="write the results as JSON")
+    args = parser.parse_args()
+
+    data = generate_pdf(args.pages)
+    print(f"📄 {args.pages} pages, {len(data) / 1e6:.1f}MB, {cores} cores")
+    serial_s, expected = timed(serial_extract, data)
+    print(f"🐢 Serial loop: {serial_s:.2f}s")
+
+    results = {"pages": args.pages, "cores": cores, "serial_s": round(serial_s, 3), "pool": []}
+    with tempfile.TemporaryDirectory() as workdir:
+        # Extraction reads the PDF from the file it was downloaded to
+        pdf_path = Path(workdir) / "bench.pdf"
+        pdf_path.write_bytes(data)
+        for workers in [int(w) for w in args.workers.split(",")]:
+            cache_dir = Path(workdir) / f"pages-{workers}"
+            # The first run per worker count also starts the pool; time a second, cold-cache run
+            extract_pdf_text(pdf_path, workers=workers, cache_dir=cache_dir)
+            shutil.rmtree(cache_dir)
+            seconds, text = timed(extract_pdf_text, pdf_path, workers=workers, cache_dir=cache_dir)
+            assert text == expected
+            processes = parallel_workers(workers, args.pages)
+            results["pool"].append({"workers": workers, "processes": processes, "seconds": round(seconds, 3), "speedup": round(serial_s / seconds, 2)})
+            print(f"⚡ {workers} workers ({processes} processes): {seconds:.2f}s ({serial_s / seconds:.2f}x)")
+
+        cached_s, text = timed(extract_pdf_text, pdf_path, workers=cores, cache_dir=cache_dir)
+        assert text == expected
+        results["cached_s"] = round(cached_s, 3)
+        print(f"💾 All pages cached: {cached_s:.3f}s")
+
+        # Lose every other page, as if the process died halfway through
+        page_cache = next(PageCache(cache_dir, digest.name) for digest in cache_dir.iterdir())
+        for page_num in range(1, args.pages + 1, 2):
+            page_cache._path(page_num).unlink()
+        resume_s, text = timed(extract_pdf_text, pdf_path, workers=cores, cache_dir=cache_dir)
+        assert text == expected
+        results["resume_half_s"] = round(resume_s, 3)
+        print(f"🔁 Resume with half the pages cached: {resume_s:.2f}s")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Per-query latency of search_insurance_docs against document size: the old
+scan (re.split + lower over the whole text on every query) versus BM25
+top-k over the sentence index built once at load time.
+
+The corpus is generated, so no Google Drive access is needed.
+
+Run from MCP Server/:
+    python benchmarks/bench_search.py [--sizes 0.1,1,10] [--queries 200] [--k 5] [--output search.json]
+"""
+import argparse
+import json
+import random
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from search_index import SentenceIndex
+
+QUERIES = [
+    "dependent coverage",
+    "hospitalization expenses",
+    "PPO deductible",
+    "life insurance beneficiary",
+    "in-network",
+    "maternity leave benefits",
+    "HSA contribution limit",
+    "vision and dental",
+]
+
+WORDS = (
+    "the of and to a in for is are with your plan coverage deductible premium employee "
+    "spouse children claim provider network hospital outpatient inpatient prescription copay "
+    "coinsurance enrollment benefits policy annual maximum reimbursement eligible dependents "
+    "wellness vision dental life insurance accidental disability term beneficiary preventive "
+    "emergency pharmacy referral specialist maternity leave HSA contribution limit expenses"
+).split()
+
+
+def generate_corpus(size_mb: float, seed: int = 7) -> str:
+    """Insurance-flavoured sentences until the text is about `size_mb` megabytes"""
+    rng = random.Random(seed)
+    # Zipf-like vocabulary: a few very common words and a long tail, as in real documents
+    vocabulary = WORDS + [f"{rng.choice(WORDS)}{i}" for i in range(5000)]
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    target = int(size_mb * 1_000_000)
+    sentences, length = [], 0
+    while length < target:
+        words = rng.choices(vocabulary, weights, k=rng.randint(6, 20))
+        if rng.random() < 0.05:
+            words.append(f"{rng.randint(1, 99)}-{rng.choice(WORDS)}")
+        sentence = " ".join(words).capitalize() + rng.choice([".", ".", "!", "?", "\n"])
+        sentences.append(sentence)
+        length += len(sentence) + 1
+    return " ".join(sentences)
+
+
+def scan_search(text: str, query: str) -> list:
+    """The search as it was before the index"""
+    query_lower = query.lower()
+    relevant_sentences = []
+    for sentence in re.split(r'[.!?\n]+', text):
+        sentence = sentence.strip()
+        if sentence and any(word in sentence.lower() for word in query_lower.split()):
+            relevant_sentences.append(sentence)
+    return relevant_sentences[:5]
+
+
+def time_queries(search, queries: int) -> list:
+    """Latency of each of `queries` calls, cycling through QUERIES"""
+    latencies = []
+    for i in range(queries):
+        query = QUERIES[i % len(QUERIES)]
+        start = time.perf_counter()
+        search(query)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="0.1,1,10", help="comma-separated corpus sizes in MB")
+    parser.add_argument("--queries", type=int, default=200, help="timed queries per size (the scan runs at most 20)")
+    parser.add_argument("--k", type=int, default=5, help="results per query")
+    parser.add_argument("--output", default=None, help="write the results as JSON")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'size MB':>8}{'sentences':>11}{'build ms':>10}{'scan p50 ms':>13}{'index p50 ms':>14}{'speedup':>9}")
+    for size in [float(s) for s in args.sizes.split(",")]:
+        text = generate_corpus(size)
+
+        start = time.perf_counter()
+        index = SentenceIndex.from_text(text)
+        build = time.perf_counter() - start
+
+        # The scan is O(corpus) per query; a few runs are enough to see it
+        scan = statistics.median(time_queries(lambda q: scan_search(text, q), min(args.queries, 20)))
+        indexed = statistics.median(time_queries(lambda q: index.search(q, args.k), args.queries))
+        result = {
+            "size_mb": size,
+            "sentences": len(index),
+            "terms": len(index.postings),
+            "build_ms": round(build * 1000, 2),
+            "scan_p50_ms": round(scan * 1000, 3),
+            "index_p50_ms": round(indexed * 1000, 3),
+            "speedup": round(scan / indexed, 1),
+        }
+        results.append(result)
+        print(f"{size:>8}{len(index):>11}{result['build_ms']:>10}{result['scan_p50_ms']:>13}{result['index_p50_ms']:>14}{result['speedup']:>8}x")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
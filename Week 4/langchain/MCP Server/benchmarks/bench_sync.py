@@ -0,0 +1,75 @@
+"""
+Drive sync benchmark against a local fake Drive (LocalDriveClient over a
+generated folder, with a simulated round trip per API call): a cold sync,
+a restart with an unchanged corpus, and a restart after one file changed,
+each followed by (re)indexing.
+
+Run from MCP Server/:
+    python benchmarks/bench_sync.py [--files 40] [--size-kb 100] [--latency-ms 50] [--workers 1,8]
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.bench_search import generate_corpus
+from corpus import Corpus
+from drive_sync import CorpusCache, LocalDriveClient, sync_drive
+
+
+def restart(client, cache_dir: Path, workers: int) -> dict:
+    """What a server start does: open the cache, sync, build the corpus from scratch"""
+    start = time.perf_counter()
+    cache = CorpusCache(cache_dir)
+    result = sync_drive(client, cache, folder_id=".", workers=workers)
+    corpus = Corpus().updated(result.files, cache)
+    return {
+        "ms": round((time.perf_counter() - start) * 1000, 1),
+        "sync_ms": round(result.seconds * 1000, 1),
+        "downloaded": len(result.downloaded),
+        "documents": len(corpus.documents),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=40)
+    parser.add_argument("--size-kb", type=float, default=100, help="size of each generated document")
+    parser.add_argument("--latency-ms", type=float, default=50, help="simulated Drive round trip per call")
+    parser.add_argument("--workers", default="1,8", help="comma-separated sync concurrency levels")
+    parser.add_argument("--output", default=None, help="write the results as JSON")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        drive = Path(workdir) / "drive"
+        drive.mkdir()
+        for i in range(args.files):
+            (drive / f"policy-{i:03d}.txt").write_text(generate_corpus(args.size_kb / 1000, seed=i), encoding="utf-8")
+        client = LocalDriveClient(drive, latency_s=args.latency_ms / 1000)
+
+        for workers in [int(w) for w in args.workers.split(",")]:
+            cache_dir = Path(workdir) / f"cache-{workers}"
+            cold = restart(client, cache_dir, workers)
+            unchanged = restart(client, cache_dir, workers)
+            with open(drive / "policy-000.txt", "a", encoding="utf-8") as f:
+                f.write(" Updated rider on dental coverage.")
+            one_changed = restart(client, cache_dir, workers)
+            results.append({"workers": workers, "cold": cold, "unchanged": unchanged, "one_changed": one_changed})
+
+    print(f"\n{args.files} files x {args.size_kb}KB, {args.latency_ms}ms per Drive call")
+    print(f"{'workers':>8}{'cold ms':>10}{'unchanged ms':>14}{'1 changed ms':>14}  (sync ms / downloads)")
+    for r in results:
+        print(f"{r['workers']:>8}{r['cold']['ms']:>10}{r['unchanged']['ms']:>14}{r['one_changed']['ms']:>14}  "
+              f"({r['cold']['sync_ms']}/{r['cold']['downloaded']}, {r['unchanged']['sync_ms']}/{r['unchanged']['downloaded']}, "
+              f"{r['one_changed']['sync_ms']}/{r['one_changed']['downloaded']})")
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+The searchable insurance corpus: one keyword index (and optionally one
+vector index) per document.
+
+A corpus is never modified in place. updated() returns a new corpus that
+reuses the indexes of documents whose Drive version did not change (in
+memory, or stored in the corpus cache by an earlier run) and builds
+indexes only for the new or changed ones.
+"""
+import hashlib
+import heapq
+import time
+from dataclasses import dataclass, replace
+from functools import cached_property
+
+from search_index import Hit, SentenceIndex, bm25_idf, query_terms
+from vector_index import SentenceEmbedder, VectorIndex
+
+
+@dataclass(frozen=True)
+class Document:
+    file_id: str
+    name: str
+    version: str
+    characters: int
+    keyword: SentenceIndex
+    vectors: VectorIndex | None = None
+
+
+class Corpus:
+    def __init__(self, documents: dict | None = None, embedder=None):
+        self.documents = documents or {}
+        self.embedder = embedder
+
+    def __bool__(self):
+        return bool(self.documents)
+
+    @property
+    def characters(self) -> int:
+        return sum(document.characters for document in self.documents.values())
+
+    @property
+    def sentences(self) -> int:
+        return sum(len(document.keyword) for document in self.documents.values())
+
+    @cached_property
+    def version(self) -> str:
+        """Short hash of the documents' ids and Drive versions: changes whenever the content does"""
+        digest = hashlib.sha256()
+        for file_id in sorted(self.documents):
+            digest.update(f"{file_id}\0{self.documents[file_id].version}\0".encode("utf-8"))
+        return digest.hexdigest()[:12]
+
+    @property
+    def has_vectors(self) -> bool:
+        return bool(self.documents) and all(document.vectors is not None for document in self.documents.values())
+
+    def updated(self, files: list, cache, vectors: bool = False) -> "Corpus":
+        """
+        Corpus of `files` (DriveFile), reusing unchanged documents' indexes.
+
+        cache is the CorpusCache the files were synced into; a document's
+        text is only read from it, a chunk at a time straight into a new
+        index, when no index of its version exists yet.
+        """
+        embedder = self.embedder or (SentenceEmbedder() if vectors else None)
+        documents, built = {}, 0
+        start = time.perf_counter()
+        for file in files:
+            document = self.documents.get(file.id)
+            if document is None or document.version != file.version:
+                stored = cache.load_index(file)
+                if stored is None:
+                    index = SentenceIndex()
+                    stored = (index.add_chunks(cache.read_chunks(file.id)), index)
+                    cache.store_index(file, *stored)
+                    built += 1
+                document = Document(file.id, file.name, file.version, *stored)
+            if vectors and document.vectors is None:
+                try:
+                    document = replace(document, vectors=VectorIndex.build(document.keyword.sentences, embedder))
+                except Exception as vector_error:
+                    # Keyword search still works without the embedding model
+                    print(f"Vector search disabled: {vector_error}")
+                    vectors = False
+            documents[file.id] = document
+        corpus = Corpus(documents, embedder)
+        print(f"Indexed {built} new or changed of {len(documents)} documents in {time.perf_counter() - start:.2f}s")
+        return corpus
+
+    def _statistics(self, terms) -> tuple:
+        """Corpus-wide BM25 idf of `terms` and average sentence length, or None for an empty corpus"""
+        indexes = [document.keyword for document in self.documents.values()]
+        total = sum(len(index) for index in indexes)
+        if not total:
+            return None
+        average_length = sum(index.total_length for index in indexes) / total
+        idf = {term: bm25_idf(total, sum(len(index.postings.get(term, ())) for index in indexes)) for term in set(terms)}
+        return idf, average_length
+
+    @staticmethod
+    def _top_hits(ranked, k: int) -> list:
+        """Top k of (score, document, sentence_id) from every document"""
+        return [
+            Hit(round(score, 4), sentence_id, document.keyword.sentences[sentence_id], document.name)
+            for score, document, sentence_id in heapq.nlargest(k, ranked, key=lambda item: item[0])
+        ]
+
+    def search(self, query: str, k: int = 5) -> list:
+        """Top k sentences across all documents by BM25, with corpus-wide statistics"""
+        terms = query_terms(query)
+        statistics = self._statistics(terms)
+        if statistics is None:
+            return []
+        ranked = (
+            (score, document, sentence_id)
+            for document in self.documents.values()
+            for score, sentence_id in document.keyword.rank(terms, k, *statistics)
+        )
+        return self._top_hits(ranked, k)
+
+    def search_batch(self, queries: list, k: int = 5) -> list:
+        """search() for every query, in order, scored in one vectorized pass per document"""
+        term_lists = [query_terms(query) for query in queries]
+        statistics = self._statistics(term for terms in term_lists for term in terms)
+        if statistics is None:
+            return [[] for _ in queries]
+        ranked = [[] for _ in queries]
+        floors = [0.0] * len(queries)
+        for document in self.documents.values():
+            for query, top in enumerate(document.keyword.rank_batch(term_lists, k, *statistics, floors=floors)):
+                ranked[query].extend((score, document, sentence_id) for score, sentence_id in top)
+                # The k-th best score so far only rises as more documents are ranked
+                if len(ranked[query]) >= k:
+                    ranked[query] = heapq.nlargest(k, ranked[query], key=lambda item: item[0])
+                    floors[query] = ranked[query][-1][0]
+        return [self._top_hits(query_ranked, k) for query_ranked in ranked]
+
+    def vector_search(self, query: str, k: int = 5) -> list:
+        """Top k passages across all documents by cosine similarity"""
+        return self.vector_search_batch([query], k)[0] if self.has_vectors else []
+
+    def vector_search_batch(self, queries: list, k: int = 5) -> list:
+        """vector_search() for every query: one encode call, one matrix product per document"""
+        if not self.has_vectors or not queries:
+            return [[] for _ in queries]
+        query_vectors = self.embedder.encode(list(queries))
+        hits = [[] for _ in queries]
+        for document in self.documents.values():
+            scores = document.vectors.scores(query_vectors)
+            for column, query_hits in enumerate(hits):
+                query_hits.extend(hit._replace(source=document.name) for hit in document.vectors.top_k(scores[:, column], k))
+        return [heapq.nlargest(k, query_hits, key=lambda hit: hit.score) for query_hits in hits]
@@ -0,0 +1,418 @@
+"""
+Incremental sync of the insurance documents from Google Drive.
+
+The documents (a folder, or a list of file ids) are mirrored into a local
+cache directory as extracted text (plus each document's built keyword
+index), with a manifest of each file's Drive version (md5Checksum and
+modifiedTime). A sync lists the current versions,
+downloads only files that are new or changed, concurrently, and drops files
+that are gone. Drive access goes through the DriveClient interface, so a
+local directory (LocalDriveClient) can stand in for Drive.
+
+Memory stays bounded by the chunk sizes rather than the file sizes: a
+download is streamed to a file under the cache, text is extracted from that
+file and written out a chunk at a time, and readers get the text in chunks.
+"""
+import hashlib
+import json
+import mimetypes
+import os
+import pickle
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Protocol
+from urllib.parse import quote
+
+from pdf_extract import file_digest, pdf_text_chunks, prune_page_cache
+
+DRIVE_CACHE_DIR = os.getenv("DRIVE_CACHE_DIR", ".drive_cache")
+DRIVE_SYNC_WORKERS = int(os.getenv("DRIVE_SYNC_WORKERS", "8"))
+# Bytes per Drive download request (the API client's default is 100MB, held in memory per chunk)
+DRIVE_DOWNLOAD_CHUNK_BYTES = int(float(os.getenv("DRIVE_DOWNLOAD_CHUNK_MB", "8")) * (1 << 20))
+# Characters of text decoded, written or read at a time
+TEXT_CHUNK_CHARS = 1 << 20
+# Bytes read at a time while checksumming a local file
+HASH_CHUNK_BYTES = 1 << 20
+
+FOLDER_MIME = "application/vnd.google-apps.folder"
+# Google Workspace files have no bytes of their own and are exported instead
+EXPORT_MIME = {
+    "application/vnd.google-apps.document": "text/plain",
+    "application/vnd.google-apps.presentation": "text/plain",
+    "application/vnd.google-apps.spreadsheet": "text/csv",
+}
+
+
+@dataclass(frozen=True)
+class DriveFile:
+    """Drive metadata of one document"""
+    id: str
+    name: str
+    mime_type: str
+    modified_time: str = ""
+    md5_checksum: str = ""
+    size: int = 0
+
+    @classmethod
+    def from_api(cls, metadata: dict) -> "DriveFile":
+        return cls(
+            id=metadata["id"],
+            name=metadata.get("name", metadata["id"]),
+            mime_type=metadata.get("mimeType", ""),
+            modified_time=metadata.get("modifiedTime", ""),
+            # Google Docs have no checksum; modifiedTime alone tracks them
+            md5_checksum=metadata.get("md5Checksum", ""),
+            size=int(metadata.get("size", 0) or 0),
+        )
+
+    @property
+    def version(self) -> str:
+        return f"{self.md5_checksum}@{self.modified_time}"
+
+    @property
+    def is_pdf(self) -> bool:
+        return 'pdf' in self.mime_type.lower()
+
+    @property
+    def supported(self) -> bool:
+        return self.mime_type != FOLDER_MIME and (
+            not self.mime_type.startswith("application/vnd.google-apps.") or self.mime_type in EXPORT_MIME
+        )
+
+
+class DriveClient(Protocol):
+    """
+    Read-only access to the documents on Drive.
+    """
+
+    def get_file(self, file_id: str) -> DriveFile:
+        ...
+
+    def list_folder(self, folder_id: str) -> list:
+        ...
+
+    def fetch(self, file: DriveFile, destination: Path):
+        """Write the file's bytes (or its export) to destination"""
+        ...
+
+
+class GoogleDriveClient:
+    """
+    Drive v3 API. The API client is not thread-safe, so each sync worker builds its own.
+    """
+    FIELDS = "id,name,mimeType,modifiedTime,md5Checksum,size"
+
+    def __init__(self, credentials):
+        self.credentials = credentials
+        self._local = threading.local()
+
+    def _service(self):
+        service = getattr(self._local, "service", None)
+        if service is None:
+            from googleapiclient.discovery import build
+            service = self._local.service = build('drive', 'v3', credentials=self.credentials, cache_discovery=False)
+        return service
+
+    def get_file(self, file_id: str) -> DriveFile:
+        return DriveFile.from_api(self._service().files().get(fileId=file_id, fields=self.FIELDS).execute())
+
+    def list_folder(self, folder_id: str) -> list:
+        files, page_token = [], None
+        while True:
+            response = self._service().files().list(
+                q=f"'{folder_id}' in parents and trashed = false",
+                fields=f"nextPageToken, files({self.FIELDS})",
+                pageSize=100,
+                pageToken=page_token,
+            ).execute()
+            files.extend(DriveFile.from_api(metadata) for metadata in response.get("files", []))
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                return files
+
+    def fetch(self, file: DriveFile, destination: Path):
+        from googleapiclient.http import MediaIoBaseDownload
+        if file.mime_type in EXPORT_MIME:
+            request = self._service().files().export_media(fileId=file.id, mimeType=EXPORT_MIME[file.mime_type])
+        else:
+            request = self._service().files().get_media(fileId=file.id)
+        with open(destination, 'wb') as file_content:
+            downloader = MediaIoBaseDownload(file_content, request, chunksize=DRIVE_DOWNLOAD_CHUNK_BYTES)
+            done = False
+            while not done:
+                _, done = downloader.next_chunk()
+
+
+def _md5_file(path: Path) -> str:
+    digest = hashlib.md5()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class LocalDriveClient:
+    """
+    A local directory served as if it were a Drive folder: file ids are
+    paths relative to the directory, modifiedTime comes from the file's
+    mtime, md5Checksum from its bytes. latency_s is added to every call to
+    mimic the round trip to Drive.
+    """
+
+    def __init__(self, root, latency_s: float = 0.0):
+        self.root = Path(root)
+        self.latency_s = latency_s
+        self._checksums = {}
+        self._lock = threading.Lock()
+
+    def _describe(self, path: Path) -> DriveFile:
+        stat = path.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._checksums.get(path)
+        if cached is None or cached[0] != signature:
+            # Drive keeps the checksum with the file; compute it once per version
+            cached = (signature, _md5_file(path))
+            with self._lock:
+                self._checksums[path] = cached
+        return DriveFile(
+            id=path.relative_to(self.root).as_posix(),
+            name=path.name,
+            mime_type=mimetypes.guess_type(path.name)[0] or "text/plain",
+            modified_time=datetime.fromtimestamp(stat.st_mtime, timezone.utc).isoformat(),
+            md5_checksum=cached[1],
+            size=stat.st_size,
+        )
+
+    def get_file(self, file_id: str) -> DriveFile:
+        time.sleep(self.latency_s)
+        return self._describe(self.root / file_id)
+
+    def list_folder(self, folder_id: str) -> list:
+        time.sleep(self.latency_s)
+        folder = self.root / folder_id
+        return [self._describe(path) for path in sorted(folder.iterdir()) if path.is_file()]
+
+    def fetch(self, file: DriveFile, destination: Path):
+        time.sleep(self.latency_s)
+        shutil.copyfile(self.root / file.id, destination)
+
+
+def _read_text_chunks(path: Path):
+    # newline='' keeps line endings exactly as downloaded
+    with open(path, encoding='utf-8', errors='ignore', newline='') as f:
+        yield from iter(lambda: f.read(TEXT_CHUNK_CHARS), "")
+
+
+def extract_text(file: DriveFile, path: Path, page_digest: str | None = None):
+    """
+    Plain text of a document downloaded to path, yielded in chunks; PDF
+    pages are marked with '--- Page N ---'. page_digest is the PDF's
+    file_digest(), when the caller has it already.
+    """
+    if file.is_pdf:
+        return pdf_text_chunks(path, digest=page_digest)
+    return _read_text_chunks(path)
+
+
+def _write_atomic(path: Path, chunks):
+    """Write text (a string or an iterable of chunks) under a temporary name, then rename"""
+    temp_path = path.with_name(path.name + ".tmp")
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.writelines([chunks] if isinstance(chunks, str) else chunks)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+    os.replace(temp_path, path)
+
+
+class CorpusCache:
+    """
+    Extracted text of every synced document plus manifest.json:
+    file id -> DriveFile fields of the version that was extracted.
+    The keyword index built from a version is kept too, so a restart
+    does not have to tokenize unchanged documents again. For a PDF,
+    page_digests.json records which page cache directory its text came
+    from, so the pages of removed or replaced versions can be pruned.
+    """
+
+    def __init__(self, root=DRIVE_CACHE_DIR):
+        self.root = Path(root)
+        self.text_dir = self.root / "text"
+        self.index_dir = self.root / "index"
+        self.download_dir = self.root / "downloads"
+        self.manifest_path = self.root / "manifest.json"
+        self.page_digests_path = self.root / "page_digests.json"
+        # Sync workers store files concurrently; guards manifest and page_digests
+        self._lock = threading.Lock()
+        self.text_dir.mkdir(parents=True, exist_ok=True)
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self.download_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest = self._load_manifest()
+        self.page_digests = self._load_page_digests()
+
+    def _load_manifest(self) -> dict:
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                return {file_id: DriveFile(**entry) for file_id, entry in json.load(f).items()}
+        except (OSError, ValueError, TypeError):
+            return {}
+
+    def _load_page_digests(self) -> dict:
+        try:
+            with open(self.page_digests_path, encoding="utf-8") as f:
+                return dict(json.load(f))
+        except (OSError, ValueError, TypeError):
+            return {}
+
+    def save_manifest(self):
+        with self._lock:
+            manifest = {file_id: asdict(file) for file_id, file in self.manifest.items()}
+            page_digests = dict(self.page_digests)
+        _write_atomic(self.manifest_path, json.dumps(manifest, indent=2))
+        _write_atomic(self.page_digests_path, json.dumps(page_digests, indent=2))
+
+    def text_path(self, file_id: str) -> Path:
+        return self.text_dir / f"{quote(file_id, safe='')}.txt"
+
+    def is_current(self, file: DriveFile) -> bool:
+        cached = self.manifest.get(file.id)
+        return cached is not None and cached.version == file.version and self.text_path(file.id).exists()
+
+    def download_path(self, file_id: str) -> Path:
+        """Where a download is streamed to; only there until its text is extracted"""
+        return self.download_dir / f"{quote(file_id, safe='')}.part"
+
+    def store(self, file: DriveFile, text, page_digest: str | None = None):
+        """Record this version's text (a string or an iterable of chunks) and, for a PDF, its page cache digest"""
+        _write_atomic(self.text_path(file.id), text)
+        with self._lock:
+            self.manifest[file.id] = file
+            if page_digest:
+                self.page_digests[file.id] = page_digest
+            else:
+                self.page_digests.pop(file.id, None)
+
+    def read_chunks(self, file_id: str):
+        """The stored text, in chunks"""
+        with open(self.text_path(file_id), encoding="utf-8") as f:
+            yield from iter(lambda: f.read(TEXT_CHUNK_CHARS), "")
+
+    def index_path(self, file_id: str) -> Path:
+        return self.index_dir / f"{quote(file_id, safe='')}.pickle"
+
+    def load_index(self, file: DriveFile):
+        """(characters, index) stored for this version of the file, or None"""
+        try:
+            with open(self.index_path(file.id), 'rb') as f:
+                version, characters, index = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError, AttributeError):
+            return None
+        return (characters, index) if version == file.version else None
+
+    def store_index(self, file: DriveFile, characters: int, index):
+        path = self.index_path(file.id)
+        temp_path = path.with_name(path.name + ".tmp")
+        with open(temp_path, 'wb') as f:
+            pickle.dump((file.version, characters, index), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+
+    def remove(self, file_id: str):
+        self.text_path(file_id).unlink(missing_ok=True)
+        self.index_path(file_id).unlink(missing_ok=True)
+        with self._lock:
+            self.manifest.pop(file_id, None)
+            self.page_digests.pop(file_id, None)
+
+    def files(self) -> list:
+        """Every cached document, for serving without reaching Drive"""
+        return [file for file in self.manifest.values() if self.text_path(file.id).exists()]
+
+
+def _describe_or_error(client: DriveClient):
+    """client.get_file that returns the exception instead of raising it"""
+    def describe(file_id: str):
+        try:
+            return client.get_file(file_id)
+        except Exception as e:
+            return e
+    return describe
+
+
+@dataclass
+class SyncResult:
+    files: list = field(default_factory=list)
+    downloaded: list = field(default_factory=list)
+    removed: list = field(default_factory=list)
+    failed: dict = field(default_factory=dict)
+    seconds: float = 0.0
+
+
+def sync_drive(client: DriveClient, cache: CorpusCache, folder_id: str | None = None, file_ids: list | None = None,
+               workers: int = DRIVE_SYNC_WORKERS) -> SyncResult:
+    """
+    Bring the cache up to date with the folder (or the listed files) on Drive.
+
+    Only new or changed files are downloaded and extracted. A file that
+    fails, whether reading its metadata or downloading it, keeps its
+    previously cached version, if there is one. Cached PDF
+    pages are pruned to those of the versions now in the cache, plus the
+    partly extracted pages of failed downloads, so a retry resumes them.
+    """
+    start = time.perf_counter()
+    result = SyncResult()
+    extracting = {}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="drive-sync") as pool:
+        if folder_id:
+            listing = client.list_folder(folder_id)
+        else:
+            listing = []
+            file_ids = file_ids or []
+            for file_id, described in zip(file_ids, pool.map(_describe_or_error(client), file_ids)):
+                if isinstance(described, Exception):
+                    result.failed[file_id] = str(described)
+                    print(f"Failed to read metadata of {file_id}: {described}")
+                    # Listed as the cached version, so it is neither downloaded nor removed
+                    described = cache.manifest.get(file_id)
+                if described is not None:
+                    listing.append(described)
+        listed = {file.id for file in listing}
+
+        def download(file: DriveFile):
+            path = cache.download_path(file.id)
+            try:
+                client.fetch(file, path)
+                page_digest = extracting[file.id] = file_digest(path) if file.is_pdf else None
+                cache.store(file, extract_text(file, path, page_digest), page_digest)
+            finally:
+                path.unlink(missing_ok=True)
+
+        stale = [file for file in listing if file.supported and not cache.is_current(file)]
+        futures = {pool.submit(download, file): file for file in stale}
+        for future in as_completed(futures):
+            file = futures[future]
+            try:
+                future.result()
+                result.downloaded.append(file.id)
+                print(f"Synced {file.name} ({file.mime_type})")
+            except Exception as e:
+                result.failed[file.id] = str(e)
+                print(f"Failed to sync {file.name}: {e}")
+
+    for file_id in list(cache.manifest):
+        if file_id not in listed:
+            cache.remove(file_id)
+            result.removed.append(file_id)
+    cache.save_manifest()
+    prune_page_cache([*cache.page_digests.values(), *(extracting.get(file_id) for file_id in result.failed)])
+
+    # A file that failed to download is served at the version that was cached
+    result.files = [cache.manifest[file.id] for file in listing if file.supported and file.id in cache.manifest]
+    result.seconds = time.perf_counter() - start
+    return result
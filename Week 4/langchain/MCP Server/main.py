@@ -1,16 +1,18 @@
 from mcp.server.fastmcp import FastMCP
-from fastapi import FastAPI
-from pydantic import BaseModel
+from fastapi import FastAPI, Header, HTTPException, Response
+from pydantic import BaseModel, Field
+from typing import Literal
 import uvicorn
+import asyncio
 import os
 import pickle
-import io
-import re
+import threading
+import time
 from google.auth.transport.requests import Request
 from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload
-from PyPDF2 import PdfReader
+from corpus import Corpus
+from vector_index import prune_vector_cache
+from drive_sync import CorpusCache, GoogleDriveClient, LocalDriveClient, sync_drive
 
 # Create FastAPI app
 app = FastAPI()
@@ -18,23 +20,44 @@ app = FastAPI()
 # MCP instance
 mcp = FastMCP("Presidio Insurance MCP")
 
-# Global variable to store document content
-INSURANCE_DOCS_CONTENT = ""
+# Searchable corpus: one index per synced document, replaced (never modified) on every load.
+# A request reads it once and uses that snapshot throughout, so a reload never shows it half a corpus
+CORPUS = Corpus()
+
+# Readiness: loading until the first load finishes, then ready (documents loaded) or failed (mock data)
+READINESS = {"state": "loading", "corpus_version": None, "loaded_at": None, "reloads": 0}
+_reload_lock = threading.Lock()
+
+# Sync and swap in a new corpus every this many seconds (0: only on startup and /admin/reload)
+CORPUS_RELOAD_INTERVAL_S = float(os.getenv("CORPUS_RELOAD_INTERVAL_S", "0"))
+# Required in the X-Admin-Token header of /admin/reload when set
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+# Background loading tasks, referenced so they are not garbage collected mid-run
+_background_tasks = set()
+
+# Also embed passages for semantic search (needs sentence-transformers)
+VECTOR_SEARCH = os.getenv("SEARCH_VECTOR", "1") == "1"
+
+# Documents to sync: every file in a Drive folder, or a comma-separated list of file ids
+DRIVE_FOLDER_ID = os.getenv("GOOGLE_DRIVE_FOLDER_ID")
+DRIVE_FILE_IDS = [file_id.strip() for file_id in os.getenv("GOOGLE_DRIVE_FILE_IDS", os.getenv("GOOGLE_DRIVE_FILE_ID", "")).split(",") if file_id.strip()]
+
+# Serve this local directory as the Drive folder instead (no Google credentials needed)
+DRIVE_LOCAL_DIR = os.getenv("DRIVE_LOCAL_DIR")
 
 # Scopes required for Google Drive access
 SCOPES = ['https://www.googleapis.com/auth/drive.readonly']
 
-def load_google_drive_docs():
-    """Load and extract text from Google Drive (supports PDF, Google Docs, text files)"""
-    global INSURANCE_DOCS_CONTENT
-    
+def get_drive_credentials():
+    """OAuth credentials for Google Drive, or None when they are not available"""
     creds = None
     token_path = 'token.pickle'
     credentials_path = './credentials.json'
     
     # Check if credentials.json exists
     if not os.path.exists(credentials_path):
-        return False
+        return None
     
     try:
         # Load saved credentials if they exist
@@ -65,140 +88,194 @@ def load_google_drive_docs():
                     print("Authentication successful!")
                 except Exception as auth_error:
                     print(f"Authentication failed: {auth_error}")
-                    return False
+                    return None
             
             # Save credentials for next time
             with open(token_path, 'wb') as token:
                 pickle.dump(creds, token)
         
-        # Build Google Drive service
-        service = build('drive', 'v3', credentials=creds)
-        
-        # Your file ID from the URL
-        file_id = os.getenv("GOOGLE_DRIVE_FILE_ID")
-        
-        # Get file metadata
-        print("Fetching file metadata...")
-        file_metadata = service.files().get(fileId=file_id, fields='name,mimeType,size').execute()
-        file_name = file_metadata.get('name')
-        mime_type = file_metadata.get('mimeType')
-        file_size = file_metadata.get('size', 'Unknown')
+        return creds
         
-        print(f"File: {file_name}")
-        print(f"Type: {mime_type}")
-        print(f"Size: {file_size} bytes")
-        
-        if 'google-apps.document' in mime_type:
-            print("Exporting Google Doc as text...")
-            request = service.files().export_media(fileId=file_id, mimeType='text/plain')
-            file_content = io.BytesIO()
-            downloader = MediaIoBaseDownload(file_content, request)
-            
-            done = False
-            while not done:
-                status, done = downloader.next_chunk()
-                if status:
-                    print(f"\r Downloading... {int(status.progress() * 100)}%", end='')
-            print("\rDownload complete!       ")
-            
-            file_content.seek(0)
-            INSURANCE_DOCS_CONTENT = file_content.read().decode('utf-8', errors='ignore')
-            
-        elif 'pdf' in mime_type.lower():
-            # Handle PDF files
-            print("Downloading PDF file...")
-            request = service.files().get_media(fileId=file_id)
-            pdf_content = io.BytesIO()
-            downloader = MediaIoBaseDownload(pdf_content, request)
-            
-            done = False
-            while not done:
-                status, done = downloader.next_chunk()
-                if status:
-                    print(f"\rDownloading... {int(status.progress() * 100)}%", end='')
-            print("\rDownload complete!")
-            
-            # Extract text from PDF
-            print("Extracting text from PDF...")
-            pdf_content.seek(0)
-            pdf_reader = PdfReader(pdf_content)
-            
-            text_content = []
-            total_pages = len(pdf_reader.pages)
-            print(f"Total pages: {total_pages}")
-            
-            for page_num, page in enumerate(pdf_reader.pages, 1):
-                print(f"\r📖 Processing page {page_num}/{total_pages}...", end='')
-                page_text = page.extract_text()
-                if page_text:
-                    text_content.append(f"--- Page {page_num} ---\n{page_text}\n")
-            
-            print("Text extraction complete!      ")
-            INSURANCE_DOCS_CONTENT = "\n".join(text_content)
-            
+    except Exception as e:
+        print(f"Error loading credentials: {e}")
+        return None
+
+def _swap_in(corpus: Corpus):
+    """
+    Make `corpus` the live one, then delete stored vectors no corpus uses any more.
+    The old corpus is dropped by the assignment unless an in-flight search still
+    holds it, and its matrices are kept until then.
+    """
+    global CORPUS
+    CORPUS = corpus
+    if corpus.has_vectors:
+        prune_vector_cache(document.vectors.path for document in corpus.documents.values())
+
+def _serve_cached_docs(cache, reason: str) -> bool:
+    """Index whatever the last successful sync left in the cache"""
+    _swap_in(CORPUS.updated(cache.files(), cache, vectors=VECTOR_SEARCH))
+    print(f"{reason}: serving {len(CORPUS.documents)} cached documents")
+    return bool(CORPUS)
+
+def load_google_drive_docs():
+    """Sync the insurance documents from Google Drive (PDF, Google Docs, text files) and index them"""
+    cache = CorpusCache()
+    
+    try:
+        if DRIVE_LOCAL_DIR:
+            client = LocalDriveClient(DRIVE_LOCAL_DIR)
         else:
-            # Download as regular file (text, etc.)
-            print("Downloading file...")
-            request = service.files().get_media(fileId=file_id)
-            file_content = io.BytesIO()
-            downloader = MediaIoBaseDownload(file_content, request)
-            
-            done = False
-            while not done:
-                status, done = downloader.next_chunk()
-                if status:
-                    print(f"\r Downloading... {int(status.progress() * 100)}%", end='')
-            print("\rDownload complete!       ")
-            
-            file_content.seek(0)
-            INSURANCE_DOCS_CONTENT = file_content.read().decode('utf-8', errors='ignore')
+            creds = get_drive_credentials()
+            if creds is None:
+                return _serve_cached_docs(cache, "Drive not available")
+            client = GoogleDriveClient(creds)
         
-        print("Successfully loaded document")
-        print(f"Total content: {len(INSURANCE_DOCS_CONTENT)} characters")
+        folder_id = DRIVE_FOLDER_ID
+        if DRIVE_LOCAL_DIR and not folder_id and not DRIVE_FILE_IDS:
+            folder_id = "."
+        if not folder_id and not DRIVE_FILE_IDS:
+            # Syncing an empty selection would empty the cache
+            return _serve_cached_docs(cache, "Set GOOGLE_DRIVE_FOLDER_ID or GOOGLE_DRIVE_FILE_IDS")
+        print(f"Syncing {f'folder {folder_id}' if folder_id else f'{len(DRIVE_FILE_IDS)} file(s)'} from Drive...")
+        result = sync_drive(client, cache, folder_id=folder_id, file_ids=DRIVE_FILE_IDS)
+        print(f"Sync complete in {result.seconds:.2f}s: {len(result.downloaded)} downloaded, "
+              f"{len(result.files) - len(result.downloaded)} unchanged, {len(result.removed)} removed, {len(result.failed)} failed")
         
-        # Show preview
-        if INSURANCE_DOCS_CONTENT:
-            preview = INSURANCE_DOCS_CONTENT[:300].replace('\n', ' ')
-            print(f"\nPreview: {preview}...\n")
+        _swap_in(CORPUS.updated(result.files, cache, vectors=VECTOR_SEARCH))
         
-        return True
+        print("Successfully loaded documents")
+        for document in CORPUS.documents.values():
+            print(f"  {document.name}: {document.characters} characters, {len(document.keyword)} sentences")
+        print(f"Total content: {CORPUS.characters} characters")
+        
+        return bool(CORPUS)
         
     except Exception as e:
         print(f"Error loading docs: {e}")
         import traceback
         traceback.print_exc()
-        return False
+        return bool(CORPUS) or _serve_cached_docs(cache, "Sync failed")
+
+def reload_corpus(reason: str):
+    """
+    Sync and index a new corpus off to the side, then swap it in with one assignment.
+    Returns whether documents are loaded, or None when another reload is already running.
+    """
+    if not _reload_lock.acquire(blocking=False):
+        return None
+    return _reload_locked(reason)
+
+def _reload_locked(reason: str) -> bool:
+    """reload_corpus for a caller that already holds _reload_lock; releases it"""
+    try:
+        print(f"Loading corpus ({reason})...")
+        loaded = load_google_drive_docs()
+        READINESS.update(
+            state="ready" if loaded else "failed",
+            corpus_version=CORPUS.version if CORPUS else None,
+            loaded_at=time.strftime("%Y-%m-%dT%H:%M:%S"),
+            reloads=READINESS["reloads"] + 1
+        )
+        print(f"Corpus {READINESS['corpus_version'] or '(none, using mock data)'} is live")
+        return loaded
+    finally:
+        _reload_lock.release()
+
+def _initial_load():
+    """Serve the last synced snapshot right away, then sync it with Drive"""
+    # Held from the snapshot through the first sync, so a reload asked for
+    # meanwhile is refused rather than overwritten by the older snapshot
+    _reload_lock.acquire()
+    try:
+        cache = CorpusCache()
+        if cache.files():
+            _serve_cached_docs(cache, "Last snapshot, until the sync finishes")
+    except BaseException:
+        _reload_lock.release()
+        raise
+    _reload_locked("startup")
+
+async def _periodic_reload():
+    while True:
+        await asyncio.sleep(CORPUS_RELOAD_INTERVAL_S)
+        await asyncio.to_thread(reload_corpus, "periodic")
+
+def _start_background(coroutine):
+    task = asyncio.create_task(coroutine)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+# Most results a caller can ask for at once
+MAX_RESULTS = 50
+MAX_BATCH_QUERIES = 100
+
+SEARCH_MODES = ("keyword", "vector")
+
+def search_mode(corpus: Corpus, mode: str) -> str:
+    """The mode a request will actually use: vector falls back to keyword without embeddings"""
+    if mode == "vector" and not corpus.has_vectors:
+        return "keyword"
+    return mode
+
+def rank_insurance_docs(corpus: Corpus, query: str, k: int = 5, mode: str = "keyword") -> list:
+    """
+    Top k hits (score, sentence_id, text, source) from the corpus, best first.
+    keyword: BM25 over sentences; vector: cosine similarity over passages.
+    """
+    k = max(1, min(k, MAX_RESULTS))
+    if search_mode(corpus, mode) == "vector":
+        return corpus.vector_search(query, k=k)
+    return corpus.search(query, k=k)
+
+def rank_insurance_docs_batch(corpus: Corpus, queries: list, k: int = 5, mode: str = "keyword") -> list:
+    """rank_insurance_docs for every query, in order, scored together in one pass over the index"""
+    k = max(1, min(k, MAX_RESULTS))
+    if search_mode(corpus, mode) == "vector":
+        return corpus.vector_search_batch(queries, k=k)
+    return corpus.search_batch(queries, k=k)
+
+def _format_hits(hits: list) -> str:
+    if hits:
+        result = "\n\n".join(f"[score {hit.score:.2f} | {hit.source}] {hit.text}" for hit in hits)
+        return f"Found in insurance documents:\n\n{result}"
+    else:
+        return "No relevant information found in the insurance documents for your query."
 
 # MCP Tool - Search insurance documents
 @mcp.tool()
-def search_insurance_docs(query: str) -> str:
+def search_insurance_docs(query: str, k: int = 5, mode: str = "keyword") -> str:
     """
     Search Presidio insurance documents stored in Google Drive.
-    Performs keyword-based search on the loaded document content.
+    Returns the top k (default 5) results, each with its score; higher scores are more relevant.
+    mode "keyword" ranks sentences by BM25 relevance to the query's words;
+    mode "vector" ranks passages by semantic similarity to the query.
     """
+    corpus = CORPUS
+    
     # Fallback to mock data if Google Drive isn't loaded
-    if not INSURANCE_DOCS_CONTENT:
+    if not corpus:
         print(" Using mock data - Google Drive content not loaded")
         return _mock_search(query)
     
-    # Simple keyword search
-    query_lower = query.lower()
-    
-    # Find sentences containing query terms
-    sentences = re.split(r'[.!?\n]+', INSURANCE_DOCS_CONTENT)
-    relevant_sentences = []
+    return _format_hits(rank_insurance_docs(corpus, query, k, mode))
+
+# MCP Tool - Search insurance documents for several queries at once
+@mcp.tool()
+def search_insurance_docs_batch(queries: list[str], k: int = 5, mode: str = "keyword") -> list[str]:
+    """
+    Search Presidio insurance documents for several queries in one call.
+    Returns one result per query, in the same order, each formatted as by search_insurance_docs.
+    Prefer this over repeated search_insurance_docs calls when there are several questions.
+    """
+    corpus = CORPUS
+    queries = queries[:MAX_BATCH_QUERIES]
     
-    for sentence in sentences:
-        sentence = sentence.strip()
-        if sentence and any(word in sentence.lower() for word in query_lower.split()):
-            relevant_sentences.append(sentence)
+    if not corpus:
+        print(" Using mock data - Google Drive content not loaded")
+        return [_mock_search(query) for query in queries]
     
-    if relevant_sentences:
-        # Return top 5 most relevant sentences
-        result = "\n\n".join(relevant_sentences[:5])
-        return f"Found in insurance documents:\n\n{result}"
-    else:
-        return "No relevant information found in the insurance documents for your query."
+    return [_format_hits(hits) for hits in rank_insurance_docs_batch(corpus, queries, k, mode)]
 
 def _mock_search(query: str) -> str:
     """Fallback mock search when Google Drive isn't available"""
@@ -222,33 +299,111 @@ All plans include medical, dental, vision coverage, and full hospitalization exp
 # FastAPI HTTP Endpoints
 class QueryRequest(BaseModel):
     query: str
+    k: int = Field(5, ge=1, le=MAX_RESULTS)
+    mode: Literal["keyword", "vector"] = "keyword"
 
+# Plain def: FastAPI runs these in its threadpool, so query encoding and
+# scoring never block the event loop (and with it /ready and /admin/reload)
 @app.post("/search")
-async def search_endpoint(request: QueryRequest):
-    """HTTP endpoint for querying insurance docs"""
-    result = search_insurance_docs(request.query)
-    return {"result": result}
+def search_endpoint(request: QueryRequest):
+    """HTTP endpoint for querying insurance docs; `results` carries each hit's score"""
+    corpus = CORPUS
+    if not corpus:
+        return {"result": _mock_search(request.query), "results": [], "mode": "mock", "corpus_version": None}
+    mode = search_mode(corpus, request.mode)
+    hits = rank_insurance_docs(corpus, request.query, request.k, mode)
+    return {
+        "result": _format_hits(hits),
+        "results": [{"text": hit.text, "score": hit.score, "source": hit.source} for hit in hits],
+        "mode": mode,
+        "corpus_version": corpus.version
+    }
+
+class BatchQueryRequest(BaseModel):
+    queries: list[str] = Field(..., min_length=1, max_length=MAX_BATCH_QUERIES)
+    k: int = Field(5, ge=1, le=MAX_RESULTS)
+    mode: Literal["keyword", "vector"] = "keyword"
+
+@app.post("/search/batch")
+def search_batch_endpoint(request: BatchQueryRequest):
+    """Many queries in one request; `results` holds one /search-shaped entry per query, in order"""
+    corpus = CORPUS
+    if not corpus:
+        return {
+            "results": [{"query": query, "result": _mock_search(query), "results": []} for query in request.queries],
+            "mode": "mock",
+            "corpus_version": None
+        }
+    mode = search_mode(corpus, request.mode)
+    batch = rank_insurance_docs_batch(corpus, request.queries, request.k, mode)
+    return {
+        "results": [
+            {
+                "query": query,
+                "result": _format_hits(hits),
+                "results": [{"text": hit.text, "score": hit.score, "source": hit.source} for hit in hits]
+            }
+            for query, hits in zip(request.queries, batch)
+        ],
+        "mode": mode,
+        "corpus_version": corpus.version
+    }
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
+    """Liveness: the server is up and answering (from mock data or a snapshot while loading)"""
+    corpus = CORPUS
     return {
         "status": "healthy",
-        "docs_loaded": bool(INSURANCE_DOCS_CONTENT),
-        "content_length": len(INSURANCE_DOCS_CONTENT)
+        "docs_loaded": bool(corpus),
+        "documents": len(corpus.documents),
+        "content_length": corpus.characters,
+        "search_modes": [mode for mode in SEARCH_MODES if search_mode(corpus, mode) == mode]
     }
 
+@app.get("/ready")
+async def readiness_check(response: Response):
+    """Readiness: 200 once the first load has finished, with the corpus version being served"""
+    corpus = CORPUS
+    if READINESS["state"] != "ready":
+        response.status_code = 503
+    return {
+        **READINESS,
+        "serving": "mock" if not corpus else ("snapshot" if READINESS["state"] == "loading" else "corpus"),
+        "serving_version": corpus.version if corpus else None,
+        "documents": len(corpus.documents),
+        "reloading": _reload_lock.locked()
+    }
+
+@app.post("/admin/reload")
+async def admin_reload(response: Response, wait: bool = False, x_admin_token: str | None = Header(None)):
+    """Sync and swap in a new corpus; in-flight requests finish on the one they started with"""
+    if ADMIN_TOKEN and x_admin_token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    # Taken here rather than in the worker thread, so a second request sees it immediately
+    if not _reload_lock.acquire(blocking=False):
+        response.status_code = 409
+        return {"started": False, "detail": "A reload is already running"}
+    reload = asyncio.to_thread(_reload_locked, "admin")
+    if wait:
+        loaded = await reload
+        return {"started": True, "loaded": loaded, "corpus_version": READINESS["corpus_version"]}
+    _start_background(reload)
+    response.status_code = 202
+    return {"started": True}
+
 
 @app.on_event("startup")
 async def startup_event():
-    """Load documents on startup"""
+    """Start loading documents in the background; queries get mock data or the last snapshot meanwhile"""
     print("=" * 70)
     print("Starting Presidio Insurance MCP Server")
     print("=" * 70)
-    load_google_drive_docs()
-    print("=" * 70)
+    _start_background(asyncio.to_thread(_initial_load))
+    if CORPUS_RELOAD_INTERVAL_S > 0:
+        _start_background(_periodic_reload())
     print("Server ready at http://127.0.0.1:8000")
-    print(f"Documents loaded: {'Yes' if INSURANCE_DOCS_CONTENT else 'No (using mock data)'}")
+    print("Documents: loading in the background (see /ready)")
     print("=" * 70)
 
 if __name__ == "__main__":
@@ -0,0 +1,209 @@
+"""
+PDF text extraction spread over a process pool, with a per-page cache.
+
+The PDF is read from the file it was downloaded to, memory-mapped, so its
+bytes are never copied onto the heap. Each page's text is stored under
+<cache>/<sha256 of the PDF bytes>/<page>.txt as soon as it is extracted, so
+a crash or restart in the middle of a large PDF only redoes the pages that
+were not finished, and the same bytes are never extracted twice. The text
+is handed on page by page, never joined into one string.
+
+Nothing keeps the PDF open after extraction: the downloaded file is deleted
+right after, so every reader (and its mapping) is closed when its pages are
+done, in the worker processes too.
+"""
+import hashlib
+import io
+import json
+import mmap
+import os
+import shutil
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from PyPDF2 import PdfReader
+
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", "0")) or os.cpu_count() or 1
+# Fewest pages per task: each task opens the PDF and parses its structure again
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "16"))
+# Tasks per worker: more than one evens out workers that finish early
+PDF_TASKS_PER_WORKER = 2
+# Below this many pages to extract, the pool's per-task reopening costs more than it saves
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "64"))
+PDF_PAGE_CACHE_DIR = os.getenv("PDF_PAGE_CACHE_DIR", os.path.join(os.getenv("DRIVE_CACHE_DIR", ".drive_cache"), "pages"))
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+# Bytes read at a time while hashing a PDF
+HASH_CHUNK_BYTES = 1 << 20
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    """One pool for the server's lifetime, shared by every PDF being synced"""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=workers)
+            _pool_workers = workers
+        return _pool
+
+
+def _open_pdf(path) -> PdfReader:
+    """Reader over the memory-mapped file: pages are read from the OS page cache on demand"""
+    with open(path, 'rb') as f:
+        try:
+            return PdfReader(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        except ValueError:
+            # An empty file cannot be mapped; let the reader report it
+            return PdfReader(io.BytesIO(f.read()))
+
+
+def _close_pdf(reader: PdfReader | None):
+    """Unmap the file behind a reader from _open_pdf, so it can be deleted"""
+    if reader is not None:
+        reader.stream.close()
+
+
+def parallel_workers(workers: int, pages: int) -> int:
+    """
+    Worker processes worth starting for `pages` pages: none (0) when there
+    are too few pages or only one core, since extraction is CPU-bound and
+    bench_pdf measures the pool slower than the serial loop on one core.
+    """
+    workers = min(workers, os.cpu_count() or 1)
+    return workers if workers > 1 and pages >= PDF_PARALLEL_MIN_PAGES else 0
+
+
+def file_digest(path) -> str:
+    """sha256 of the file's bytes: the key of its pages in the page cache"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _read_pages(reader: PdfReader, page_numbers: list) -> list:
+    """(page number, text) for 1-based page numbers"""
+    return [(page_num, reader.pages[page_num - 1].extract_text() or "") for page_num in page_numbers]
+
+
+def _extract_pages(path: str, page_numbers: list) -> list:
+    """_read_pages for the PDF at path; runs in a worker process"""
+    reader = _open_pdf(path)
+    try:
+        return _read_pages(reader, page_numbers)
+    finally:
+        _close_pdf(reader)
+
+
+class PageCache:
+    """Extracted text of one PDF's pages, one file per page"""
+
+    def __init__(self, root, digest: str):
+        self.dir = Path(root) / digest
+        self.dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, page_num: int) -> Path:
+        return self.dir / f"{page_num:05d}.txt"
+
+    def get(self, page_num: int) -> str | None:
+        try:
+            return self._path(page_num).read_text(encoding="utf-8")
+        except OSError:
+            return None
+
+    def put(self, page_num: int, text: str):
+        path = self._path(page_num)
+        temp_path = path.with_name(path.name + ".tmp")
+        temp_path.write_text(text, encoding="utf-8")
+        os.replace(temp_path, path)
+
+    def missing(self, total_pages: int) -> list:
+        return [page_num for page_num in range(1, total_pages + 1) if not self._path(page_num).exists()]
+
+    @property
+    def page_count(self) -> int | None:
+        try:
+            with open(self.dir / "pages.json", encoding="utf-8") as f:
+                return json.load(f)["pages"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    @page_count.setter
+    def page_count(self, pages: int):
+        with open(self.dir / "pages.json", "w", encoding="utf-8") as f:
+            json.dump({"pages": pages}, f)
+
+
+def pdf_text_chunks(path, workers: int = PDF_WORKERS, cache_dir=PDF_PAGE_CACHE_DIR, digest: str | None = None):
+    """
+    Text of every page of the PDF at path, each marked with '--- Page N ---',
+    yielded a page at a time.
+
+    Pages already in the cache are not extracted again; the rest are split
+    into tasks for the process pool when there are enough of them.
+    digest is the file's file_digest(), when the caller has it already.
+    """
+    digest = digest or file_digest(path)
+    cache = PageCache(cache_dir, digest)
+    reader = None
+    try:
+        total_pages = cache.page_count
+        if total_pages is None:
+            reader = _open_pdf(path)
+            total_pages = len(reader.pages)
+            cache.page_count = total_pages
+
+        missing = cache.missing(total_pages)
+        if missing:
+            print(f"Extracting {len(missing)} of {total_pages} pages ({total_pages - len(missing)} cached)...")
+            pool_workers = parallel_workers(workers, len(missing))
+            if pool_workers:
+                # Workers open the PDF from disk rather than receiving its bytes with every task
+                per_task = max(PDF_PAGES_PER_TASK, -(-len(missing) // (pool_workers * PDF_TASKS_PER_WORKER)))
+                tasks = [missing[start:start + per_task] for start in range(0, len(missing), per_task)]
+                pool = _get_pool(pool_workers)
+                futures = [pool.submit(_extract_pages, str(path), pages) for pages in tasks]
+                for future in as_completed(futures):
+                    for page_num, text in future.result():
+                        cache.put(page_num, text)
+            else:
+                reader = reader or _open_pdf(path)
+                for page_num, text in _read_pages(reader, missing):
+                    cache.put(page_num, text)
+    finally:
+        # Every page is in the cache now: release the mapping before handing out text
+        _close_pdf(reader)
+
+    separator = ""
+    for page_num in range(1, total_pages + 1):
+        page_text = cache.get(page_num)
+        if page_text:
+            yield f"{separator}--- Page {page_num} ---\n{page_text}\n"
+            separator = "\n"
+
+
+def extract_pdf_text(path, workers: int = PDF_WORKERS, cache_dir=PDF_PAGE_CACHE_DIR) -> str:
+    """All of pdf_text_chunks as one string"""
+    return "".join(pdf_text_chunks(path, workers, cache_dir))
+
+
+def prune_page_cache(keep, cache_dir=PDF_PAGE_CACHE_DIR):
+    """Delete the cached pages of every PDF whose digest is not in `keep`"""
+    keep = set(keep)
+    root = Path(cache_dir)
+    if not root.is_dir():
+        return
+    for stale in root.iterdir():
+        if not stale.is_dir() or stale.name in keep:
+            continue
+        try:
+            shutil.rmtree(stale)
+        except OSError as e:
+            print(f"Could not delete cached pages {stale}: {e}")
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Tests import the server's modules the way main.py does, from MCP Server/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
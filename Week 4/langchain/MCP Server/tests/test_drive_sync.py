@@ -0,0 +1,58 @@
+import hashlib
+import threading
+
+import pytest
+
+import drive_sync
+from drive_sync import CorpusCache, LocalDriveClient, sync_drive
+
+
+@pytest.fixture
+def drive(tmp_path):
+    root = tmp_path / "drive"
+    root.mkdir()
+    (root / "dental.txt").write_text("Dental cleanings are covered twice a year.\n")
+    (root / "vision.txt").write_text("Vision exams are covered every two years.\n")
+    return root
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(drive_sync, "prune_page_cache", lambda keep: None)
+    return CorpusCache(tmp_path / "cache")
+
+
+def test_unreadable_file_id_keeps_its_cached_version(drive, cache):
+    client = LocalDriveClient(drive)
+    first = sync_drive(client, cache, file_ids=["dental.txt", "vision.txt"])
+    assert sorted(first.downloaded) == ["dental.txt", "vision.txt"]
+
+    class FlakyClient(LocalDriveClient):
+        def get_file(self, file_id):
+            if file_id == "vision.txt":
+                raise PermissionError("403 forbidden")
+            return super().get_file(file_id)
+
+    second = sync_drive(FlakyClient(drive), cache, file_ids=["dental.txt", "vision.txt", "missing.txt"])
+    assert set(second.failed) == {"vision.txt", "missing.txt"}
+    assert second.removed == []
+    assert sorted(file.id for file in second.files) == ["dental.txt", "vision.txt"]
+    assert "vision.txt" in cache.manifest
+
+
+def test_local_checksum_matches_md5_of_the_bytes(drive, monkeypatch):
+    monkeypatch.setattr(drive_sync, "HASH_CHUNK_BYTES", 7)
+    file = LocalDriveClient(drive).get_file("dental.txt")
+    assert file.md5_checksum == hashlib.md5((drive / "dental.txt").read_bytes()).hexdigest()
+
+
+def test_concurrent_stores_all_reach_the_manifest(drive, cache):
+    file = LocalDriveClient(drive).get_file("dental.txt")
+    files = [drive_sync.DriveFile(f"doc-{i}", f"doc-{i}.txt", file.mime_type, file.modified_time, file.md5_checksum) for i in range(64)]
+    threads = [threading.Thread(target=cache.store, args=(f, "text")) for f in files]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    cache.save_manifest()
+    assert len(CorpusCache(cache.root).manifest) == 64
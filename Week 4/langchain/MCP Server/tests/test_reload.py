@@ -0,0 +1,79 @@
+import asyncio
+
+import httpx
+import pytest
+
+pytest.importorskip("mcp.server.fastmcp")
+pytest.importorskip("google_auth_oauthlib")
+
+import drive_sync
+import main
+from corpus import Corpus
+from drive_sync import CorpusCache
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    """main wired to a local fake Drive and a fresh cache, keyword search only"""
+    drive = tmp_path / "drive"
+    drive.mkdir()
+    (drive / "dental.txt").write_text("Dental cleanings are covered twice a year.\n")
+    monkeypatch.setattr(drive_sync, "prune_page_cache", lambda keep: None)
+    monkeypatch.setattr(main, "CorpusCache", lambda: CorpusCache(tmp_path / "cache"))
+    monkeypatch.setattr(main, "DRIVE_LOCAL_DIR", str(drive))
+    monkeypatch.setattr(main, "DRIVE_FOLDER_ID", None)
+    monkeypatch.setattr(main, "DRIVE_FILE_IDS", [])
+    monkeypatch.setattr(main, "VECTOR_SEARCH", False)
+    monkeypatch.setattr(main, "ADMIN_TOKEN", None)
+    monkeypatch.setattr(main, "CORPUS", Corpus())
+    monkeypatch.setattr(main, "READINESS", {"state": "loading", "corpus_version": None, "loaded_at": None, "reloads": 0})
+    return drive
+
+
+def call(method, path):
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.request(method, path)
+    return asyncio.run(run())
+
+
+def test_reload_swaps_in_the_new_corpus_version(server):
+    assert call("GET", "/ready").status_code == 503
+    assert main.reload_corpus("test") is True
+    first = main.READINESS["corpus_version"]
+    assert call("GET", "/ready").json()["serving_version"] == first
+
+    (server / "vision.txt").write_text("Vision exams are covered every two years.\n")
+    assert main.reload_corpus("test") is True
+    assert main.READINESS["corpus_version"] not in (None, first)
+    assert main.READINESS["reloads"] == 2
+    assert len(main.CORPUS.documents) == 2
+
+
+def test_reload_while_one_is_running_is_refused(server):
+    with main._reload_lock:
+        assert main.reload_corpus("test") is None
+        response = call("POST", "/admin/reload")
+        assert response.status_code == 409
+        assert call("GET", "/ready").json()["reloading"] is True
+    assert main.READINESS["reloads"] == 0
+    assert call("POST", "/admin/reload?wait=true").json()["loaded"] is True
+
+
+def test_search_answers_from_the_corpus_it_started_with(server, monkeypatch):
+    main.reload_corpus("test")
+    old = main.CORPUS.version
+    ranked = main.rank_insurance_docs
+
+    def reload_mid_search(corpus, query, k, mode):
+        # A reload lands while the request is scoring
+        (server / "vision.txt").write_text("Vision exams are covered every two years.\n")
+        main.reload_corpus("test")
+        return ranked(corpus, query, k, mode)
+
+    monkeypatch.setattr(main, "rank_insurance_docs", reload_mid_search)
+    body = main.search_endpoint(main.QueryRequest(query="dental cleanings"))
+    assert body["corpus_version"] == old
+    assert all(hit["source"] == "dental.txt" for hit in body["results"])
+    assert main.CORPUS.version != old
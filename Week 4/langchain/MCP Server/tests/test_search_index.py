@@ -0,0 +1,18 @@
+from search_index import SentenceIndex, query_terms
+
+TEXT = "Dental work needs a claim submitted online. Submit the claim for dental work online."
+
+
+def test_phrase_boost_ignores_stop_words_between_query_words():
+    index = SentenceIndex.from_text(TEXT)
+    # Same terms and length, so only the phrase boost can break the tie towards the second sentence
+    assert index.score(query_terms("claim for dental"))[0] == index.score(query_terms("claim for dental"))[1]
+    hits = index.search("claim for dental", k=2)
+    assert [hit.sentence_id for hit in hits] == [1, 0]
+    assert hits[0].score > hits[1].score
+
+
+def test_batch_ranking_applies_the_same_phrase_boost():
+    index = SentenceIndex.from_text(TEXT)
+    terms = query_terms("claim for dental")
+    assert index.rank_batch([terms], 2) == [index.rank(terms, 2)]
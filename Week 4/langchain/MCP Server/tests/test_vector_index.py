@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from corpus import Corpus, Document
+from search_index import SentenceIndex
+from vector_index import VectorIndex, passage_windows, prune_vector_cache
+
+
+class FakeEmbedder:
+    """Bag-of-letters vectors: deterministic and similar for similar words"""
+    name = "fake"
+    dimension = 26
+    batch_size = 8
+
+    def encode(self, texts):
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for char in text.lower():
+                if "a" <= char <= "z":
+                    vectors[row, ord(char) - ord("a")] += 1
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+
+def document(file_id, text, cache_dir):
+    index = SentenceIndex.from_text(text)
+    vectors = VectorIndex.build(index.sentences, FakeEmbedder(), cache_dir=cache_dir)
+    return Document(file_id, f"{file_id}.txt", "v1", len(text), index, vectors)
+
+
+@pytest.mark.parametrize("dtype", ["float32", "int8"])
+def test_document_without_passages_has_an_empty_matrix(tmp_path, dtype):
+    assert passage_windows([]) == []
+    index = VectorIndex.build([], FakeEmbedder(), cache_dir=tmp_path, dtype=dtype)
+    assert index.matrix.shape == (0, FakeEmbedder.dimension)
+    assert index.path is None and not list(tmp_path.iterdir())
+    assert index.search("dental") == []
+
+
+def test_corpus_with_an_empty_document_still_searches(tmp_path):
+    corpus = Corpus({
+        "empty": document("empty", "", tmp_path),
+        "dental": document("dental", "Dental cleanings are covered twice a year. Vision exams are yearly.", tmp_path),
+    }, FakeEmbedder())
+    assert corpus.has_vectors
+    hits = corpus.vector_search("dental cleanings", k=3)
+    assert hits and all(hit.source == "dental.txt" for hit in hits)
+    # Pruning skips the empty document's missing path and keeps the live matrix
+    prune_vector_cache([d.vectors.path for d in corpus.documents.values()], tmp_path)
+    assert corpus.documents["dental"].vectors.path.exists()
@@ -0,0 +1,222 @@
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables import RunnableConfig
+from agents.model.AgentState import AgentState
+from agents.events import emit_event
+from mcp_tools.doc_store import get_document_store
+
+# Words that do not change what is being asked
+_FILLER_WORDS = frozenset("a an the please kindly hi hello hey".split())
+_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+
+
+def normalize_question(text: str) -> str:
+    """
+    Lowercase, drop punctuation and filler words, collapse whitespace.
+    """
+    words = _PUNCTUATION_RE.sub(" ", text.lower()).split()
+    return " ".join(word for word in words if word not in _FILLER_WORDS)
+
+
+@dataclass
+class CachedAnswer:
+    response: str
+    created: float
+    embedding: Any = None
+
+
+class AnswerCache:
+    """
+    Cache of specialist answers in front of the IT and Finance nodes.
+
+    Purpose:
+    - Keys are (domain, hash of docs/<domain> contents, normalized question),
+      so editing a policy file invalidates its domain's answers automatically
+    - Near-duplicates match through the normalized text and, when an embedder
+      and a similarity threshold are configured, by cosine similarity
+    - LRU eviction at max_entries, entries expire after ttl seconds
+    - Only first-turn questions are cached; follow-ups depend on the conversation
+    """
+
+    def __init__(
+        self,
+        max_entries: int | None = None,
+        ttl: float | None = None,
+        similarity: float | None = None,
+        embedder=None,
+        enabled: bool | None = None,
+    ):
+        self.max_entries = max_entries or int(os.getenv("ANSWER_CACHE_SIZE", "256"))
+        self.ttl = ttl if ttl is not None else float(os.getenv("ANSWER_CACHE_TTL_S", "3600"))
+        self.similarity = similarity if similarity is not None else float(os.getenv("ANSWER_CACHE_SIMILARITY", "0"))
+        self.embedder = embedder
+        if enabled is None:
+            enabled = os.getenv("ANSWER_CACHE", "1") == "1"
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple[str, str, str], CachedAnswer] = OrderedDict()
+        self._stats = {"exact_hits": 0, "similar_hits": 0, "misses": 0, "bypassed": 0, "stores": 0, "evictions": 0, "expired": 0, "rejected": 0}
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    async def _embed(self, text: str):
+        if self.embedder is None or self.similarity <= 0:
+            return None
+        import numpy as np
+
+        vector = np.asarray(await self.embedder.aembed_query(text), dtype=np.float32)
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+    def _similar(self, domain: str, doc_hash: str, embedding, now: float):
+        # Caller holds the lock; expired entries met on the way are evicted
+        best_key, best_score = None, self.similarity
+        expired = []
+        for key, entry in self._entries.items():
+            if key[0] != domain or key[1] != doc_hash or entry.embedding is None:
+                continue
+            if now - entry.created > self.ttl:
+                expired.append(key)
+                continue
+            score = float(entry.embedding @ embedding)
+            if score >= best_score:
+                best_key, best_score = key, score
+        for key in expired:
+            del self._entries[key]
+        self._stats["expired"] += len(expired)
+        return best_key
+
+    async def lookup(self, domain: str, question: str) -> tuple[str | None, tuple, Any]:
+        """
+        Return (answer or None, key, embedding); key and embedding are passed to store().
+        """
+        doc_hash = get_document_store().content_hash(domain)
+        key = (domain, doc_hash, normalize_question(question))
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry.created > self.ttl:
+                del self._entries[key]
+                self._stats["expired"] += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._stats["exact_hits"] += 1
+                return entry.response, key, entry.embedding
+
+        embedding = await self._embed(question)
+        if embedding is not None:
+            with self._lock:
+                similar_key = self._similar(domain, doc_hash, embedding, now)
+                if similar_key is not None:
+                    self._entries.move_to_end(similar_key)
+                    self._stats["similar_hits"] += 1
+                    return self._entries[similar_key].response, key, embedding
+
+        self._count("misses")
+        return None, key, embedding
+
+    def store(self, key: tuple, response: str, embedding=None):
+        """
+        Cache an answer under a key from lookup(); empty answers are not cached.
+        """
+        if not isinstance(response, str) or not response.strip():
+            self._count("rejected")
+            return
+        with self._lock:
+            self._entries[key] = CachedAnswer(response=response, created=time.monotonic(), embedding=embedding)
+            self._entries.move_to_end(key)
+            self._stats["stores"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self._stats["exact_hits"] + self._stats["similar_hits"]
+            lookups = hits + self._stats["misses"]
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+def _build_embedder():
+    """
+    Azure OpenAI embeddings when ANSWER_CACHE_EMBEDDING_DEPLOYMENT is set, else None.
+    """
+    deployment = os.getenv("ANSWER_CACHE_EMBEDDING_DEPLOYMENT")
+    if not deployment:
+        return None
+    from langchain_openai import AzureOpenAIEmbeddings
+
+    return AzureOpenAIEmbeddings(
+        azure_deployment=deployment,
+        api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
+    )
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_answer_cache() -> AnswerCache:
+    """
+    Return the process-wide AnswerCache.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = AnswerCache(embedder=_build_embedder())
+    return _cache
+
+
+def bypass_requested(config: RunnableConfig | None) -> bool:
+    """
+    True when the run config asks to skip the cache: {"configurable": {"bypass_answer_cache": True}}.
+    """
+    return bool((config or {}).get("configurable", {}).get("bypass_answer_cache"))
+
+
+def cached_specialist(domain: str, agent):
+    """
+    Wrap a specialist node so repeated questions are answered from the AnswerCache.
+    """
+
+    async def node(state: AgentState, config: RunnableConfig | None = None) -> dict:
+        cache = get_answer_cache()
+        human_turns = sum(isinstance(msg, HumanMessage) for msg in state["messages"])
+        if not cache.enabled or bypass_requested(config) or human_turns > 1 or state.get("summary"):
+            cache._count("bypassed")
+            return await agent(state)
+
+        question = next(msg.content for msg in reversed(state["messages"]) if isinstance(msg, HumanMessage))
+        answer, key, embedding = await cache.lookup(domain, question)
+        if answer is not None:
+            print(f"💾 Answer cache hit ({domain})")
+            await emit_event("answer_cache", {"domain": domain, "hit": True})
+            return {"response": answer, "messages": [AIMessage(content=answer)]}
+
+        result = await agent(state)
+        # Agents count an LLM call only when they produced an answer, not an error message
+        if result.get("llm_calls", state["llm_calls"]) > state["llm_calls"] and not result.get("error"):
+            cache.store(key, result["response"], embedding)
+        return result
+
+    node.__name__ = agent.__name__
+    return node
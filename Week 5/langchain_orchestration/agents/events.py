@@ -0,0 +1,28 @@
+from langchain_core.callbacks.manager import adispatch_custom_event
+
+# Tag put on each role's LLM client so streamed tokens can be traced to an agent
+ROLE_TAG_PREFIX = "agent:"
+
+
+def role_tag(role: str) -> str:
+    return f"{ROLE_TAG_PREFIX}{role}"
+
+
+def role_from_tags(tags: list | None) -> str | None:
+    for tag in tags or []:
+        if tag.startswith(ROLE_TAG_PREFIX):
+            return tag[len(ROLE_TAG_PREFIX):]
+    return None
+
+
+async def emit_event(name: str, data: dict):
+    """
+    Publish a custom progress event to astream_events listeners.
+
+    Does nothing when the caller is not running inside a graph or runnable
+    (e.g. an agent function called directly from a script).
+    """
+    try:
+        await adispatch_custom_event(name, data)
+    except RuntimeError:
+        pass
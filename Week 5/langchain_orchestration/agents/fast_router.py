@@ -0,0 +1,189 @@
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter
+
+from agents.model.RouteDecision import RouteDecision
+from mcp_tools.doc_store import DocumentStore, get_document_store
+
+# Folder under docs/ for each route
+ROUTE_DOMAINS = {"IT": "it", "Finance": "finance"}
+
+# Strong signals that settle the route on their own
+KEYWORDS = {
+    "IT": {
+        "vpn": 3.0, "laptop": 3.0, "software": 3.0, "password": 3.0, "wifi": 3.0,
+        "network": 2.0, "computer": 2.0, "monitor": 2.0, "install": 2.0, "login": 2.0,
+        "access": 1.5, "email": 1.5, "printer": 2.0, "hardware": 2.0, "system": 1.0,
+        "security": 1.5, "account": 1.0, "mfa": 3.0, "license": 1.5, "device": 1.5,
+    },
+    "Finance": {
+        "payroll": 3.0, "reimbursement": 3.0, "reimburse": 3.0, "expense": 3.0, "invoice": 3.0,
+        "budget": 3.0, "salary": 3.0, "paycheck": 3.0, "payday": 3.0, "tax": 2.0,
+        "payment": 2.0, "pay": 1.5, "receipt": 2.0, "bonus": 2.0, "deduction": 2.0,
+        "travel": 1.0, "cost": 1.0, "refund": 2.0, "finance": 2.0, "w2": 3.0,
+    },
+}
+
+# How much a full cosine match to a docs centroid is worth next to one keyword hit
+CENTROID_WEIGHT = 4.0
+
+# Lead over the runner-up (in score units: a strong keyword is 3.0) below which
+# the share of the total is not trusted, since there is too little evidence behind it
+ROUTER_MIN_MARGIN = float(os.getenv("ROUTER_MIN_MARGIN", "1.5"))
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Lowercase word tokens with a light plural strip ("laptops" -> "laptop").
+    """
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        if len(token) > 4 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+class FastRouter:
+    """
+    In-process IT / Finance classifier used before the supervisor LLM.
+
+    Purpose:
+    - Scores a query with weighted keyword rules
+    - Adds cosine similarity to TF-IDF centroids built from docs/it and docs/finance
+      (sparse term-weight vectors, not neural embeddings)
+    - Returns a RouteDecision with a confidence score so the supervisor can
+      skip the LLM when the answer is obvious; queries with little evidence
+      either way (no keywords, barely any overlap with the docs) get a low
+      confidence and go to the LLM
+    - Counts fast-path and fallback routes for threshold tuning
+    """
+
+    def __init__(self, store: DocumentStore | None = None, threshold: float | None = None,
+                 min_margin: float = ROUTER_MIN_MARGIN):
+        if threshold is None:
+            threshold = float(os.getenv("ROUTER_CONFIDENCE_THRESHOLD", "0.75"))
+        self.threshold = threshold
+        self.min_margin = min_margin
+        self._lock = threading.Lock()
+        self._idf: dict[str, float] = {}
+        self._centroids: dict[str, dict[str, float]] = {}
+        self._build_centroids(store or get_document_store())
+        self.reset_stats()
+
+    def _build_centroids(self, store: DocumentStore):
+        term_counts = {
+            route: [Counter(tokenize(doc.text)) for doc in store.documents(domain)]
+            for route, domain in ROUTE_DOMAINS.items()
+        }
+
+        # Every file counts as one document for IDF; terms found in all files score zero
+        document_freq = Counter()
+        total_files = 0
+        for counts in term_counts.values():
+            for counts_per_file in counts:
+                document_freq.update(counts_per_file.keys())
+                total_files += 1
+        self._idf = {
+            term: math.log((1 + total_files) / (1 + df)) for term, df in document_freq.items()
+        }
+
+        for route, counts in term_counts.items():
+            centroid = Counter()
+            for counts_per_file in counts:
+                for term, count in counts_per_file.items():
+                    centroid[term] += (1 + math.log(count)) * self._idf[term]
+            self._centroids[route] = _normalize(centroid)
+
+    def _vectorize(self, tokens: list[str]) -> dict[str, float]:
+        counts = Counter(tokens)
+        return _normalize({
+            term: (1 + math.log(count)) * self._idf[term]
+            for term, count in counts.items()
+            if self._idf.get(term)
+        })
+
+    def score(self, query: str) -> dict[str, float]:
+        """
+        Raw per-route scores (keyword weight + weighted centroid similarity).
+        """
+        tokens = tokenize(query)
+        query_vector = self._vectorize(tokens)
+        scores = {}
+        for route, keywords in KEYWORDS.items():
+            keyword_score = sum(keywords.get(token, 0.0) for token in set(tokens))
+            centroid = self._centroids.get(route, {})
+            similarity = sum(weight * centroid.get(term, 0.0) for term, weight in query_vector.items())
+            scores[route] = keyword_score + CENTROID_WEIGHT * similarity
+        return scores
+
+    def classify(self, query: str) -> RouteDecision:
+        """
+        Return the most likely route with a confidence: its share of the total
+        score, scaled down when its lead over the other route is under min_margin.
+
+        The share alone says nothing about how much evidence there is: a query
+        with no keywords and a faint overlap with one docs folder ("What is the
+        weather today?") would get a share near 1.
+        """
+        start = time.perf_counter()
+        scores = self.score(query)
+        route = max(scores, key=scores.get)
+        total = sum(scores.values())
+        share = scores[route] / total if total > 0 else 0.5
+        margin = scores[route] - max((score for other, score in scores.items() if other != route), default=0.0)
+        evidence = min(1.0, margin / self.min_margin) if self.min_margin > 0 else 1.0
+        confidence = share * evidence
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self._stats["classified"] += 1
+            self._stats["classify_time_s"] += elapsed
+        return RouteDecision(route=route, confidence=round(confidence, 4))
+
+    def is_confident(self, decision: RouteDecision) -> bool:
+        return decision.confidence >= self.threshold
+
+    def record(self, decision: RouteDecision, fast_path: bool):
+        """
+        Count a routed query, bucketed by confidence so the threshold can be tuned.
+        """
+        with self._lock:
+            self._stats["fast_path" if fast_path else "fallback"] += 1
+            bucket = f"{min(int(decision.confidence * 10), 9) / 10:.1f}"
+            self._stats["confidence_buckets"][bucket] += 1
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats = {
+                "classified": 0,
+                "fast_path": 0,
+                "fallback": 0,
+                "classify_time_s": 0.0,
+                "confidence_buckets": Counter(),
+            }
+
+    def stats(self) -> dict:
+        with self._lock:
+            classified = self._stats["classified"]
+            routed = self._stats["fast_path"] + self._stats["fallback"]
+            return {
+                "threshold": self.threshold,
+                "fast_path": self._stats["fast_path"],
+                "fallback": self._stats["fallback"],
+                "fast_path_ratio": round(self._stats["fast_path"] / routed, 4) if routed else 0.0,
+                "avg_classify_us": round(self._stats["classify_time_s"] / classified * 1e6, 2) if classified else 0.0,
+                "confidence_buckets": dict(sorted(self._stats["confidence_buckets"].items())),
+            }
+
+
+def _normalize(vector: dict[str, float]) -> dict[str, float]:
+    norm = math.sqrt(sum(value * value for value in vector.values()))
+    if not norm:
+        return {}
+    return {term: value / norm for term, value in vector.items()}
@@ -0,0 +1,161 @@
+import asyncio
+import os
+import threading
+import uuid
+
+from langchain_core.messages import AIMessage, HumanMessage, RemoveMessage, SystemMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.memory import InMemorySaver
+from agents.model.AgentState import AgentState
+from agents.tokens import count_message_tokens
+from agents.prompts import assemble, prompt_cache_stats
+
+
+class CompactMemorySaver(InMemorySaver):
+    """
+    In-memory LangGraph checkpointer that keeps only the latest checkpoint
+    (and its parent) per session, so memory per session stays flat no matter
+    how many turns it has had.
+    """
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        saved = super().put(config, checkpoint, metadata, new_versions)
+        thread_id = saved["configurable"]["thread_id"]
+        checkpoint_ns = saved["configurable"]["checkpoint_ns"]
+        keep = {checkpoint["id"], config["configurable"].get("checkpoint_id")}
+        self._prune(thread_id, checkpoint_ns, keep)
+        return saved
+
+    def _prune(self, thread_id: str, checkpoint_ns: str, keep: set):
+        checkpoints = self.storage[thread_id][checkpoint_ns]
+        kept_blobs = set()
+        for checkpoint_id in keep:
+            if checkpoint_id in checkpoints:
+                kept = self.serde.loads_typed(checkpoints[checkpoint_id][0])
+                kept_blobs.update(kept["channel_versions"].items())
+
+        for checkpoint_id in [cid for cid in checkpoints if cid not in keep]:
+            old = self.serde.loads_typed(checkpoints.pop(checkpoint_id)[0])
+            for channel, version in old["channel_versions"].items():
+                if (channel, version) not in kept_blobs:
+                    self.blobs.pop((thread_id, checkpoint_ns, channel, version), None)
+            self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+
+
+def session_config(session_id: str | None = None) -> RunnableConfig:
+    """
+    Graph config for a conversation; a new session id is generated if none is given.
+    """
+    return {"configurable": {"thread_id": session_id or str(uuid.uuid4())}}
+
+
+def conversation_history(messages: list) -> list:
+    """
+    Earlier user/assistant turns, without the current question, router notes
+    or tool traffic.
+    """
+    last_human = max((i for i, msg in enumerate(messages) if isinstance(msg, HumanMessage)), default=-1)
+    return [
+        msg for msg in messages[:last_human]
+        if isinstance(msg, (HumanMessage, AIMessage)) and not getattr(msg, "tool_calls", None) and msg.content
+    ]
+
+
+def summary_message(state: AgentState) -> list:
+    summary = state.get("summary")
+    if not summary:
+        return []
+    return [SystemMessage(content=f"Summary of the earlier conversation:\n{summary}")]
+
+
+class SessionMemory:
+    """
+    Session memory for the agent graph.
+
+    Purpose:
+    - Owns the checkpointer that stores each session's state by session id
+    - Trims each session's messages to a token budget before routing
+    - Optionally summarizes trimmed turns in the background; the summary is
+      picked up by the session's next turn
+    """
+
+    def __init__(self, token_budget: int | None = None, summarize: bool | None = None):
+        self.token_budget = token_budget or int(os.getenv("MEMORY_TOKEN_BUDGET", "2000"))
+        if summarize is None:
+            summarize = os.getenv("MEMORY_SUMMARIZE", "0") == "1"
+        self.summarize = summarize
+        self.checkpointer = CompactMemorySaver()
+        self._lock = threading.Lock()
+        self._summaries: dict[str, str] = {}
+        self._tasks: set = set()
+        self.stats = {"trimmed_messages": 0, "summaries": 0, "summary_errors": 0}
+
+    def trim(self, messages: list) -> list:
+        """
+        Oldest messages that must go for the rest to fit in the token budget.
+        The latest user message is always kept and history starts at a user turn.
+        """
+        last_human = max((i for i, msg in enumerate(messages) if isinstance(msg, HumanMessage)), default=len(messages) - 1)
+        total = count_message_tokens(messages)
+        cut = 0
+        while cut < last_human and total > self.token_budget:
+            total -= count_message_tokens(messages[cut:cut + 1])
+            cut += 1
+        # Never keep an answer without the question it belongs to
+        while cut < last_human and not isinstance(messages[cut], HumanMessage):
+            cut += 1
+        return messages[:cut]
+
+    async def _summarize(self, session_id: str, previous: str, evicted: list):
+        # Imported here because the runtime builds the graph, which imports this module
+        from agents.runtime import get_llm
+
+        transcript = "\n".join(
+            f"{'User' if isinstance(msg, HumanMessage) else 'Assistant'}: {msg.content}"
+            for msg in evicted if isinstance(msg, (HumanMessage, AIMessage))
+        )
+        prompt = assemble("summarizer", HumanMessage(content=f"Existing summary:\n{previous or '(none)'}\n\nNew messages:\n{transcript}"))
+        try:
+            result = await get_llm("summarizer").ainvoke(prompt)
+            prompt_cache_stats.record("summarizer", result)
+            with self._lock:
+                self._summaries[session_id] = result.content
+                self.stats["summaries"] += 1
+        except Exception as e:
+            print(f"⚠️ Memory summary failed: {e}")
+            with self._lock:
+                self.stats["summary_errors"] += 1
+
+    async def memory_node(self, state: AgentState, config: RunnableConfig) -> dict:
+        """
+        Graph node: apply any finished summary and trim history to the budget.
+        """
+        session_id = config["configurable"]["thread_id"]
+        updates = {}
+        with self._lock:
+            summary = self._summaries.pop(session_id, None)
+        if summary:
+            updates["summary"] = summary
+
+        evicted = self.trim(state["messages"])
+        if evicted:
+            updates["messages"] = [RemoveMessage(id=msg.id) for msg in evicted]
+            with self._lock:
+                self.stats["trimmed_messages"] += len(evicted)
+            print(f"🧠 Memory trimmed {len(evicted)} old message(s) to stay within {self.token_budget} tokens")
+            if self.summarize:
+                task = asyncio.create_task(self._summarize(session_id, summary or state.get("summary", ""), evicted))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+        return updates
+
+    def end_session(self, session_id: str):
+        """
+        Drop a session's checkpoints and any pending summary.
+        """
+        self.checkpointer.delete_thread(session_id)
+        with self._lock:
+            self._summaries.pop(session_id, None)
+
+    def session_count(self) -> int:
+        return len(self.checkpointer.storage)
@@ -1,9 +1,14 @@
 from langchain.messages import AnyMessage
-from typing_extensions import TypedDict, Annotated
-import operator
+from langgraph.graph.message import add_messages
+from typing_extensions import TypedDict, Annotated, NotRequired
 
 class AgentState(TypedDict):
-    messages: Annotated[list[AnyMessage], operator.add]
+    # add_messages appends node output by message id and honours RemoveMessage,
+    # so nodes return only the messages they add
+    messages: Annotated[list[AnyMessage], add_messages]
     llm_calls: int
     route: str
-    response: str 
\ No newline at end of file
+    response: str
+    summary: NotRequired[str]
+    # Set by a specialist whose turn failed; `response` then holds the error text
+    error: NotRequired[str | None]
\ No newline at end of file
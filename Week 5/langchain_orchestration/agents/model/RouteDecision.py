@@ -7,4 +7,10 @@ class RouteDecision(BaseModel):
     """
     route: Literal["IT","Finance"] = Field(
         description="The category of the user's request"
+    )
+    confidence: float = Field(
+        default=1.0,
+        ge=0.0,
+        le=1.0,
+        description="How confident the classifier is in the route, from 0 to 1"
     )
\ No newline at end of file
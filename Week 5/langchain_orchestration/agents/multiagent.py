@@ -4,6 +4,9 @@ from langgraph.graph import StateGraph, END, START
 from agents.finance_agent import finance_agent
 from agents.it_agent import it_agent
 from agents.supervisor import supervisor_agent
+from agents.speculative import SpeculationPolicy, make_speculative_agent
+from agents.memory import SessionMemory
+from agents.answer_cache import cached_specialist
 
 def route_to_agent(state: AgentState) -> Literal["IT","Finance"]:
     """
@@ -12,20 +15,42 @@ def route_to_agent(state: AgentState) -> Literal["IT","Finance"]:
     return state["route"]
 
 
-def create_agent_graph():
+def create_agent_graph(policy: SpeculationPolicy | None = None, memory: SessionMemory | None = None):
     """
     Builds the LangGraph workflow with LLM-powered routing.
+
+    With a speculative policy (SPECULATIVE_MODE=likely|both) the router and
+    the specialists run concurrently inside a single "speculative" node.
+
+    With a SessionMemory the graph is compiled with its checkpointer and a
+    "memory" node trims history first; every invoke then needs a
+    {"configurable": {"thread_id": session_id}} config.
     """
+    if policy is None:
+        policy = SpeculationPolicy.from_env()
     
     workflow = StateGraph(AgentState)
+
+    entry = START
+    if memory is not None:
+        workflow.add_node("memory", memory.memory_node)
+        workflow.add_edge(START, "memory")
+        entry = "memory"
+    checkpointer = memory.checkpointer if memory is not None else None
+
+    if policy.enabled:
+        workflow.add_node("speculative", make_speculative_agent(policy))
+        workflow.add_edge(entry, "speculative")
+        workflow.add_edge("speculative", END)
+        return workflow.compile(checkpointer=checkpointer)
     
     # Add all nodes
     workflow.add_node("router", supervisor_agent)
-    workflow.add_node("IT", it_agent)
-    workflow.add_node("Finance", finance_agent)
+    workflow.add_node("IT", cached_specialist("it", it_agent))
+    workflow.add_node("Finance", cached_specialist("finance", finance_agent))
     
     # Start with router
-    workflow.add_edge(START, "router")
+    workflow.add_edge(entry, "router")
     
     # Conditional routing from router to agents
     workflow.add_conditional_edges(
@@ -41,4 +66,4 @@ def create_agent_graph():
     workflow.add_edge("Finance", END)
     workflow.add_edge("IT", END)
     
-    return workflow.compile()
\ No newline at end of file
+    return workflow.compile(checkpointer=checkpointer)
\ No newline at end of file
@@ -0,0 +1,200 @@
+"""
+Prompt assembly laid out for provider prefix caching.
+
+Every agent's prompt is: [static system prompt + bound tool schemas] followed
+by the dynamic part (summary, history, question). The static part is
+rendered at import and re-rendered only when the docs catalog in the
+read_file schema changes (refresh_prefixes), so requests send byte-identical
+prefix bytes.
+
+Azure OpenAI only caches a prompt prefix of at least 1024 tokens, and every
+static prefix here is shorter (router ~90, specialists ~520, summarizer ~30
+tokens), so a single-turn request gets no cached tokens. What can be cached
+is a longer stable head built on top of them: a session's follow-up turns
+resend the same prefix and history, and a specialist's later tool rounds
+resend the whole earlier round. PromptCacheStats reports what the provider
+actually served from cache, and prefix_cacheable says whether the static
+prefix alone would qualify.
+"""
+import hashlib
+import json
+import threading
+from dataclasses import dataclass
+
+from langchain_core.messages import SystemMessage
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from agents.tokens import count_tokens
+from mcp_tools.file_tool import read_file, refresh_catalog
+from mcp_tools.search_tool import search_docs
+from mcp_tools.web_tool import web_search
+
+# Bound in this order for every specialist; the schemas are part of the cached prefix
+SPECIALIST_TOOLS = [search_docs, read_file, web_search]
+
+# Azure OpenAI only caches prompts whose shared prefix is at least this long
+PROVIDER_MIN_CACHED_TOKENS = 1024
+
+ROUTER_PROMPT = """
+You are a Supervisor Agent responsible for routing employee queries
+to the correct specialist agent.
+
+Classify the user query into ONE category only.
+
+Categories:
+
+IT:
+- Technology, systems, software, hardware, VPN, laptops, access, tools
+
+Finance:
+- Payroll, reimbursement, expenses, invoices, budgets, payments
+
+Return ONLY the classification as structured output.
+""".strip()
+
+IT_PROMPT = """
+You are an IT Support Agent for the company.
+
+Your responsibilities:
+- Answer IT-related questions about technology, systems, software, hardware, VPN, laptops, access, and tools
+- Use the search_docs tool to find the relevant passages in internal documentation first
+- Use the read_file tool to read a whole internal IT document only when the passages are not enough
+- Use the web_search tool to find additional information from external sources when needed
+- Provide clear, helpful, and accurate responses
+
+When using search_docs or read_file, use domain "it".
+
+Common IT topics you handle:
+- VPN setup and troubleshooting
+- Software approval and installation
+- Hardware requests (laptops, monitors, etc.)
+- System access and permissions
+- Network connectivity issues
+- Security protocols and best practices
+
+Always be helpful and provide step-by-step instructions when appropriate.
+""".strip()
+
+FINANCE_PROMPT = """
+You are a Finance Support Agent for the company.
+
+Your responsibilities:
+- Answer Finance-related questions about payroll, reimbursements, expenses, invoices, budgets, and payments
+- Use the search_docs tool to find the relevant passages in internal documentation first
+- Use the read_file tool to read a whole internal finance document only when the passages are not enough
+- Use the web_search tool to find additional information from external sources when needed
+- Provide clear, helpful, and accurate responses
+
+When using search_docs or read_file, use domain "finance".
+
+Common Finance topics you handle:
+- Expense reimbursement processes
+- Payroll schedules and procedures
+- Budget reports and financial statements
+- Invoice processing and payments
+- Financial policies and procedures
+- Tax and compliance information
+
+Always be helpful and provide step-by-step instructions when appropriate.
+""".strip()
+
+SUMMARIZER_PROMPT = "Summarize this employee support conversation in at most five short bullet points. Keep names, dates, amounts and open questions."
+
+
+@dataclass(frozen=True)
+class PromptPrefix:
+    """
+    Pre-rendered static head of one agent's prompt.
+    """
+    agent: str
+    message: SystemMessage
+    fingerprint: str
+    tokens: int
+
+
+def _render(agent: str, text: str, tools: list) -> PromptPrefix:
+    schemas = [convert_to_openai_tool(tool) for tool in tools]
+    # The provider sees tools and system prompt together, so both go into the fingerprint
+    payload = json.dumps(schemas, sort_keys=True, separators=(",", ":")) + "\n" + text
+    return PromptPrefix(
+        agent=agent,
+        message=SystemMessage(content=text),
+        fingerprint=hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16],
+        tokens=count_tokens(payload),
+    )
+
+
+PREFIXES = {
+    "router": _render("router", ROUTER_PROMPT, []),
+    "it": _render("it", IT_PROMPT, SPECIALIST_TOOLS),
+    "finance": _render("finance", FINANCE_PROMPT, SPECIALIST_TOOLS),
+    "summarizer": _render("summarizer", SUMMARIZER_PROMPT, []),
+}
+
+
+_prefix_lock = threading.Lock()
+_prefix_catalog_version = None
+
+
+def refresh_prefixes() -> int:
+    """
+    Re-render the specialist prefixes if the read_file catalog changed.
+    Returns the catalog version the prefixes (and bound tools) should match.
+    """
+    global _prefix_catalog_version
+    version = refresh_catalog()
+    with _prefix_lock:
+        if version != _prefix_catalog_version:
+            PREFIXES["it"] = _render("it", IT_PROMPT, SPECIALIST_TOOLS)
+            PREFIXES["finance"] = _render("finance", FINANCE_PROMPT, SPECIALIST_TOOLS)
+            _prefix_catalog_version = version
+    return version
+
+
+def assemble(agent: str, *dynamic) -> list:
+    """
+    The agent's static prefix followed by the per-request messages.
+    """
+    return [PREFIXES[agent].message, *dynamic]
+
+
+class PromptCacheStats:
+    """
+    Prompt and cached prompt tokens per agent, read from provider usage metadata.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._usage: dict[str, dict] = {}
+
+    def record(self, agent: str, message) -> int | None:
+        """
+        Count one response's usage; returns its cached prompt tokens (None without usage metadata).
+        """
+        usage = getattr(message, "usage_metadata", None)
+        if not usage:
+            return None
+        cached = (usage.get("input_token_details") or {}).get("cache_read", 0) or 0
+        with self._lock:
+            totals = self._usage.setdefault(agent, {"calls": 0, "prompt_tokens": 0, "cached_tokens": 0})
+            totals["calls"] += 1
+            totals["prompt_tokens"] += usage.get("input_tokens", 0)
+            totals["cached_tokens"] += cached
+        return cached
+
+    def report(self) -> dict:
+        with self._lock:
+            report = {}
+            for agent, prefix in PREFIXES.items():
+                totals = self._usage.get(agent, {"calls": 0, "prompt_tokens": 0, "cached_tokens": 0})
+                report[agent] = {
+                    **totals,
+                    "cached_ratio": round(totals["cached_tokens"] / totals["prompt_tokens"], 4) if totals["prompt_tokens"] else 0.0,
+                    "prefix_fingerprint": prefix.fingerprint,
+                    "prefix_tokens": prefix.tokens,
+                    # Shorter prefixes are never cached; the history after them may still be
+                    "prefix_cacheable": prefix.tokens >= PROVIDER_MIN_CACHED_TOKENS,
+                }
+            return report
+
+
+prompt_cache_stats = PromptCacheStats()
@@ -0,0 +1,31 @@
+from langchain_core.messages import AIMessage
+
+
+def extract_final_response(state: dict) -> str:
+    """
+    Robustly extract the final assistant response from a LangGraph state.
+    Priority:
+    1. state["response"] (if set by graph)
+    2. Last AIMessage found anywhere (even nested)
+    """
+    # ✅ 1. Best case: graph already set response
+    if isinstance(state, dict):
+        response = state.get("response")
+        if isinstance(response, str) and response.strip():
+            return response.strip()
+
+    # ✅ 2. Walk messages (including nested dicts)
+    def walk(messages):
+        for msg in reversed(messages):
+            if isinstance(msg, AIMessage):
+                return msg.content
+            if isinstance(msg, dict) and "messages" in msg:
+                found = walk(msg["messages"])
+                if found:
+                    return found
+        return None
+
+    messages = state.get("messages", [])
+    found = walk(messages)
+
+    return found or "No response generated."
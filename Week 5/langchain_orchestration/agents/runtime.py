@@ -0,0 +1,255 @@
+import asyncio
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+
+from langchain_core.messages import HumanMessage
+from agents.model.RouteDecision import RouteDecision
+from agents.fast_router import FastRouter
+from agents.events import role_tag
+from agents.memory import SessionMemory
+from agents.prompts import SPECIALIST_TOOLS, refresh_prefixes
+from mcp_tools.search_tool import get_search_index
+
+# Roles that get their own pre-bound LLM client
+ROLES = ("router", "it", "finance", "summarizer")
+
+
+@dataclass
+class RuntimeStats:
+    """
+    Setup cost paid once at warm-up and the setup time saved afterwards.
+
+    Every reuse of the compiled graph or of a pre-bound client would have
+    cost a full rebuild in the old per-request code, so each reuse adds
+    the measured build time of that object to `saved_s`.
+    """
+    graph_build_s: float = 0.0
+    base_client_build_s: float = 0.0
+    client_build_s: dict = field(default_factory=dict)
+    graph_reuses: int = 0
+    client_reuses: dict = field(default_factory=dict)
+    saved_s: float = 0.0
+
+    def report(self) -> dict:
+        return {
+            "graph_build_ms": round(self.graph_build_s * 1000, 2),
+            "base_client_build_ms": round(self.base_client_build_s * 1000, 2),
+            "client_build_ms": {
+                role: round(seconds * 1000, 2) for role, seconds in self.client_build_s.items()
+            },
+            "graph_reuses": self.graph_reuses,
+            "client_reuses": dict(self.client_reuses),
+            "saved_ms": round(self.saved_s * 1000, 2),
+        }
+
+
+class AgentRuntime:
+    """
+    Process-wide runtime shared by every graph node.
+
+    Purpose:
+    - Compiles the LangGraph workflow once
+    - Keeps one pooled HTTP client pair for all Azure OpenAI traffic
+    - Keeps one pre-bound LLM client per role (router / it / finance)
+    - Holds the local fast-path router built from docs/
+    - Holds the session memory (checkpointer + history trimming)
+    - Tracks how much per-request setup time the reuse saves
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._graph = None
+        self._base_llm = None
+        self._llms: dict = {}
+        # Catalog version each specialist's tools were bound with
+        self._tools_versions: dict[str, int] = {}
+        self._fast_router = None
+        self.memory = SessionMemory()
+        self._http_client = None
+        self._http_async_client = None
+        self.stats = RuntimeStats()
+
+    def _limits(self):
+        import httpx
+
+        return httpx.Limits(
+            max_connections=int(os.getenv("AZURE_OPENAI_MAX_CONNECTIONS", "20")),
+            max_keepalive_connections=int(os.getenv("AZURE_OPENAI_MAX_KEEPALIVE", "10")),
+            keepalive_expiry=float(os.getenv("AZURE_OPENAI_KEEPALIVE_EXPIRY", "60")),
+        )
+
+    def _get_base_llm(self):
+        # Caller holds the lock
+        if self._base_llm is None:
+            # Imported on first use: langchain_openai and the openai SDK take over a second to import
+            import httpx
+            from langchain_openai import AzureChatOpenAI
+
+            start = time.perf_counter()
+
+            self._http_client = httpx.Client(limits=self._limits())
+            self._http_async_client = httpx.AsyncClient(limits=self._limits())
+            self._base_llm = AzureChatOpenAI(
+                azure_deployment=os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME"),  # your Azure deployment name
+                api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
+                temperature=0,
+                azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
+                api_key=os.getenv("AZURE_OPENAI_API_KEY"),
+                http_client=self._http_client,
+                http_async_client=self._http_async_client,
+            )
+            self.stats.base_client_build_s = time.perf_counter() - start
+        return self._base_llm
+
+    def _build_llm(self, role: str):
+        # Caller holds the lock
+        base = self._get_base_llm()
+        start = time.perf_counter()
+        if role == "router":
+            # include_raw keeps the AIMessage so its token usage can be read
+            llm = base.with_structured_output(RouteDecision, include_raw=True)
+        elif role in ("it", "finance"):
+            self._tools_versions[role] = refresh_prefixes()
+            llm = base.bind_tools(SPECIALIST_TOOLS)
+        elif role == "summarizer":
+            llm = base
+        else:
+            raise ValueError(f"Unknown LLM role: {role}")
+        # Tagged so streaming consumers can tell which agent produced a token
+        llm = llm.with_config(tags=[role_tag(role)])
+        self.stats.client_build_s[role] = time.perf_counter() - start
+        return llm
+
+    def get_llm(self, role: str):
+        """
+        Return the shared, pre-bound LLM client for a role.
+
+        A specialist client is re-bound when docs/ gained or lost a file,
+        since its tool schemas carry the read_file catalog.
+        """
+        version = refresh_prefixes() if role in self._tools_versions else None
+        with self._lock:
+            llm = self._llms.get(role)
+            if llm is not None and version is not None and self._tools_versions.get(role, version) != version:
+                llm = None
+            if llm is None:
+                llm = self._build_llm(role)
+                self.stats.client_reuses.setdefault(role, 0)
+                self._llms[role] = llm
+            else:
+                # The old code built a fresh AzureChatOpenAI and re-bound it on every call
+                self.stats.client_reuses[role] += 1
+                self.stats.saved_s += self.stats.base_client_build_s + self.stats.client_build_s[role]
+            return llm
+
+    def set_llm(self, role: str, llm):
+        """
+        Replace the client for a role (e.g. with a fake LLM for offline runs).
+        """
+        if hasattr(llm, "with_config"):
+            llm = llm.with_config(tags=[role_tag(role)])
+        with self._lock:
+            self._llms[role] = llm
+            self._tools_versions.pop(role, None)
+            self.stats.client_build_s.setdefault(role, 0.0)
+            self.stats.client_reuses.setdefault(role, 0)
+
+    def get_fast_router(self) -> FastRouter:
+        """
+        Return the local keyword/centroid router, building it from docs/ on first use.
+        """
+        with self._lock:
+            if self._fast_router is None:
+                self._fast_router = FastRouter()
+            return self._fast_router
+
+    def get_graph(self):
+        """
+        Return the compiled agent graph, compiling it on first use.
+        """
+        # Imported here because the graph imports the agents, which import this module
+        from agents.multiagent import create_agent_graph
+
+        with self._lock:
+            if self._graph is None:
+                start = time.perf_counter()
+                self._graph = create_agent_graph(memory=self.memory)
+                self.stats.graph_build_s = time.perf_counter() - start
+            else:
+                self.stats.graph_reuses += 1
+                self.stats.saved_s += self.stats.graph_build_s
+            return self._graph
+
+    def prepare(self):
+        """
+        Build the graph, every role client, the fast router and the docs
+        search index. Blocking; safe to call from a background thread.
+        """
+        with self._lock:
+            for role in ROLES:
+                if role not in self._llms:
+                    self._llms[role] = self._build_llm(role)
+                    self.stats.client_reuses.setdefault(role, 0)
+        self.get_fast_router()
+        get_search_index()
+        refresh_prefixes()
+        if self._graph is None:
+            self.get_graph()
+
+    async def warm_up(self, ping: bool | None = None):
+        """
+        Prepare everything before the first request, off the event loop.
+
+        With ping enabled (AGENT_WARMUP_PING=1) a one-token request is sent so
+        the TCP/TLS connection is already open in the pool when the user asks
+        the first question.
+        """
+        if ping is None:
+            ping = os.getenv("AGENT_WARMUP_PING", "0") == "1"
+
+        await asyncio.to_thread(self.prepare)
+
+        if ping and self._base_llm is not None:
+            try:
+                await self._base_llm.bind(max_tokens=1).ainvoke([HumanMessage(content="ping")])
+            except Exception as e:
+                print(f"⚠️ Warm-up ping failed: {e}")
+
+    async def aclose(self):
+        """
+        Close the pooled HTTP connections.
+        """
+        if self._http_async_client is not None:
+            await self._http_async_client.aclose()
+        if self._http_client is not None:
+            self._http_client.close()
+
+
+_runtime = None
+_runtime_lock = threading.Lock()
+
+
+def get_runtime() -> AgentRuntime:
+    """
+    Return the process-wide AgentRuntime.
+    """
+    global _runtime
+    if _runtime is None:
+        with _runtime_lock:
+            if _runtime is None:
+                _runtime = AgentRuntime()
+    return _runtime
+
+
+def get_llm(role: str):
+    return get_runtime().get_llm(role)
+
+
+def get_fast_router() -> FastRouter:
+    return get_runtime().get_fast_router()
+
+
+def get_agent_graph():
+    return get_runtime().get_graph()
@@ -0,0 +1,195 @@
+import asyncio
+import os
+import threading
+from dataclasses import dataclass
+
+from langchain_core.messages import HumanMessage
+from langchain_core.runnables import RunnableConfig
+from agents.model.AgentState import AgentState
+from agents.finance_agent import finance_agent
+from agents.it_agent import it_agent
+from agents.supervisor import route_query
+from agents.runtime import get_fast_router
+from agents.answer_cache import cached_specialist
+from agents.prompts import PREFIXES
+from agents.tokens import count_message_tokens
+
+SPECIALISTS = {"IT": cached_specialist("it", it_agent), "Finance": cached_specialist("finance", finance_agent)}
+# Prompt prefix of each specialist route
+SPECIALIST_ROLES = {"IT": "it", "Finance": "finance"}
+
+# Completion tokens budgeted per specialist call
+SPECIALIST_COMPLETION_TOKENS = 150
+
+
+@dataclass
+class SpeculationPolicy:
+    """
+    Controls how much work is started before the route is known.
+
+    mode:
+    - "off": plain router -> specialist graph
+    - "likely": start only the branch the local router thinks is most likely
+    - "both": start IT and Finance together with the supervisor
+
+    max_speculative_tokens caps the estimated tokens spent on branches that
+    may be thrown away; branches that do not fit are not started. A branch
+    is estimated as one call per tool round plus the answer, each sending the
+    specialist's real prompt prefix and the conversation and getting
+    SPECIALIST_COMPLETION_TOKENS back.
+    """
+    mode: str = "off"
+    max_speculative_tokens: int = 3000
+    # Tool rounds a specialist is expected to make before answering
+    expected_tool_rounds: int = 1
+
+    @classmethod
+    def from_env(cls) -> "SpeculationPolicy":
+        mode = os.getenv("SPECULATIVE_MODE", "off").lower()
+        if mode not in ("off", "likely", "both"):
+            raise ValueError(f"SPECULATIVE_MODE must be off, likely or both, got: {mode}")
+        return cls(
+            mode=mode,
+            max_speculative_tokens=int(os.getenv("SPECULATIVE_MAX_TOKENS", "3000")),
+            expected_tool_rounds=int(os.getenv("SPECULATIVE_TOOL_ROUNDS", "1")),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    def branch_tokens(self, route: str, conversation_tokens: int) -> int:
+        """
+        Estimated tokens one specialist branch spends: every call resends its prefix and the conversation.
+        """
+        calls = 1 + self.expected_tool_rounds
+        prompt = PREFIXES[SPECIALIST_ROLES[route]].tokens + conversation_tokens
+        return calls * (prompt + SPECIALIST_COMPLETION_TOKENS)
+
+    def branches_for(self, likely_route: str, conversation_tokens: int) -> list[str]:
+        """
+        Specialist routes to start alongside the supervisor, most likely first.
+        """
+        candidates = [likely_route]
+        if self.mode == "both":
+            candidates += [route for route in SPECIALISTS if route != likely_route]
+
+        budget = self.max_speculative_tokens
+        branches = []
+        for route in candidates:
+            cost = self.branch_tokens(route, conversation_tokens)
+            if cost > budget:
+                break
+            branches.append(route)
+            budget -= cost
+        return branches
+
+
+class SpeculationStats:
+    """
+    Counts how often the speculated branch was the one the router picked.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.skipped = 0
+        self.hits = 0
+        self.misses = 0
+        self.cancelled = 0
+
+    def add(self, name: str, count: int = 1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + count)
+
+    def report(self) -> dict:
+        with self._lock:
+            speculated = self.hits + self.misses
+            return {
+                "skipped": self.skipped,
+                "hits": self.hits,
+                "misses": self.misses,
+                "cancelled": self.cancelled,
+                "hit_ratio": round(self.hits / speculated, 4) if speculated else 0.0,
+            }
+
+
+speculation_stats = SpeculationStats()
+
+
+async def _cancel(tasks):
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def make_speculative_agent(policy: SpeculationPolicy):
+    """
+    Build a graph node that runs the supervisor and the specialist(s) concurrently.
+    """
+
+    async def speculative_agent(state: AgentState, config: RunnableConfig) -> dict:
+        """
+        Speculative router + specialist node.
+
+        Purpose:
+        - Starts supervisor_agent and the likely specialist(s) at the same time
+        - Commits the branch matching the supervisor's route
+        - Cancels the other branch, or runs the right one if it was not started
+        """
+        last_user_message = next(
+            (msg.content for msg in reversed(state["messages"]) if isinstance(msg, HumanMessage)),
+            ""
+        )
+
+        # When the local router is confident the supervisor answers instantly,
+        # so there is no LLM latency to hide and nothing is speculated
+        fast_router = get_fast_router()
+        guess = fast_router.classify(last_user_message)
+        if fast_router.is_confident(guess):
+            branches = []
+            speculation_stats.add("skipped")
+        else:
+            branches = policy.branches_for(guess.route, count_message_tokens(state["messages"]))
+            print(f"⚡ Speculatively starting: {', '.join(branches) or 'nothing (token cap)'}")
+
+        # Agents only read the state and return their updates, so branches can share it.
+        # The supervisor reuses the guess rather than classifying the query again
+        router_task = asyncio.create_task(route_query(state, guess))
+        branch_tasks = {
+            route: asyncio.create_task(SPECIALISTS[route](state, config))
+            for route in branches
+        }
+
+        try:
+            routed = await router_task
+        except BaseException:
+            await _cancel(list(branch_tasks.values()))
+            raise
+
+        route = routed["route"]
+        losers = [task for name, task in branch_tasks.items() if name != route]
+        if losers:
+            speculation_stats.add("cancelled", len(losers))
+            await _cancel(losers)
+
+        if route in branch_tasks:
+            speculation_stats.add("hits")
+            result = await branch_tasks[route]
+        else:
+            if branches:
+                speculation_stats.add("misses")
+            result = await SPECIALISTS[route](state, config)
+
+        # Both branches counted their LLM calls on top of the same starting state
+        added_calls = (routed["llm_calls"] - state["llm_calls"]) + (result.get("llm_calls", state["llm_calls"]) - state["llm_calls"])
+        update = {
+            "messages": result["messages"],
+            "llm_calls": state["llm_calls"] + added_calls,
+            "route": route,
+            "response": result["response"],
+        }
+        if "error" in result:
+            update["error"] = result["error"]
+        return update
+
+    return speculative_agent
@@ -0,0 +1,47 @@
+from agents.events import role_from_tags
+from agents.model.AgentState import AgentState
+
+SPECIALIST_ROLES = ("it", "finance")
+
+
+async def stream_agent_events(agent, state: AgentState, config: dict | None = None):
+    """
+    Run the graph with LangGraph event streaming and yield simplified events.
+
+    Yields (kind, data) tuples:
+    - ("route", {"route", "confidence", "fast_path"}) once the supervisor decides
+    - ("tool_start" / "tool_end", {...}) for every specialist tool call
+    - ("token", str) for each answer token from the routed specialist
+    - ("done", final_state) when the graph finishes
+
+    Tokens produced before the route is known (speculative mode runs both
+    specialists) are buffered per agent; only the routed agent's are yielded.
+    """
+    route_role = None
+    pending: dict[str, list[str]] = {}
+
+    async for event in agent.astream_events(state, config=config, version="v2"):
+        kind = event["event"]
+
+        if kind == "on_chat_model_stream":
+            role = role_from_tags(event.get("tags"))
+            text = event["data"]["chunk"].content
+            if role not in SPECIALIST_ROLES or not isinstance(text, str) or not text:
+                continue
+            if route_role is None:
+                pending.setdefault(role, []).append(text)
+            elif role == route_role:
+                yield "token", text
+
+        elif kind == "on_custom_event" and event["name"] == "route":
+            route_role = event["data"]["route"].lower()
+            yield "route", event["data"]
+            for text in pending.get(route_role, []):
+                yield "token", text
+            pending.clear()
+
+        elif kind == "on_custom_event" and event["name"] in ("tool_start", "tool_end"):
+            yield event["name"], event["data"]
+
+        elif kind == "on_chain_end" and not event.get("parent_ids"):
+            yield "done", event["data"]["output"]
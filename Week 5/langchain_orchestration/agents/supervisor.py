@@ -1,16 +1,30 @@
-from langchain_openai import AzureChatOpenAI
-from langchain_core.messages import SystemMessage, HumanMessage
+from langchain_core.messages import HumanMessage
 from agents.model.AgentState import AgentState
 from agents.model.RouteDecision import RouteDecision
-import os 
+from agents.runtime import get_llm, get_fast_router
+from agents.events import emit_event
+from agents.prompts import assemble, prompt_cache_stats
 
-async def supervisor_agent(state: AgentState) -> AgentState:
+async def supervisor_agent(state: AgentState) -> dict:
     """
     Supervisor router agent (Azure OpenAI).
 
     Purpose:
     - Classifies user queries into IT or Finance
     - Routes to the appropriate specialist agent
+
+    The local fast router answers first; the LLM is only called when its
+    confidence is below ROUTER_CONFIDENCE_THRESHOLD.
+
+    Returns only the state keys it changes.
+    """
+    return await route_query(state)
+
+
+async def route_query(state: AgentState, local_decision: RouteDecision | None = None) -> dict:
+    """
+    supervisor_agent, reusing the fast router's decision when the caller
+    has already classified the query (the speculative node does).
     """
 
     if "messages" not in state or len(state["messages"]) == 0:
@@ -20,52 +34,37 @@ async def supervisor_agent(state: AgentState) -> AgentState:
         (msg.content for msg in reversed(state["messages"]) if isinstance(msg, HumanMessage)),
         None
     )
-    llm = AzureChatOpenAI(
-        azure_deployment=os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME"),  # your Azure deployment name
-        api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
-        temperature=0,
-        azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-        api_key=os.getenv("AZURE_OPENAI_API_KEY")
-        ).with_structured_output(RouteDecision)
-
     if last_user_message is None:
         raise ValueError("No HumanMessage found in state['messages']")
 
-    print("🧭 Routing agent initiated (Azure OpenAI)...")
+    # Fast path: local classifier, no network round trip
+    fast_router = get_fast_router()
+    if local_decision is None:
+        local_decision = fast_router.classify(last_user_message)
+    if fast_router.is_confident(local_decision):
+        fast_router.record(local_decision, fast_path=True)
+        print(f"🧭 ROUTER (fast path, confidence {local_decision.confidence:.2f}) → Routing to: {local_decision.route}")
+        await emit_event("route", {"route": local_decision.route, "confidence": local_decision.confidence, "fast_path": True})
+        return {"route": local_decision.route, "llm_calls": state["llm_calls"]}
 
-    # Azure OpenAI LLM
-    llm =llm
-    system_prompt = """
-        You are a Supervisor Agent responsible for routing employee queries
-        to the correct specialist agent.
+    fast_router.record(local_decision, fast_path=False)
+    print(f"🧭 Routing agent initiated (Azure OpenAI, local confidence {local_decision.confidence:.2f})...")
 
-        Classify the user query into ONE category only.
+    # Shared, pre-bound structured-output client from the runtime
+    llm = get_llm("router")
 
-        Categories:
+    # Pre-rendered static prefix, question last
+    messages = assemble("router", HumanMessage(content=last_user_message))
 
-        IT:
-        - Technology, systems, software, hardware, VPN, laptops, access, tools
-
-        Finance:
-        - Payroll, reimbursement, expenses, invoices, budgets, payments
-
-        Return ONLY the classification as structured output.
-        """
-
-    messages = [
-        SystemMessage(content=system_prompt),
-        HumanMessage(content=last_user_message),
-    ]
-
-    # Invoke Azure OpenAI
-    decision: RouteDecision = await llm.ainvoke(messages)
-
-    # Update state
-    state["route"] = decision.route
-    state["llm_calls"] += 1
-    state["messages"].append(
-        SystemMessage(content=f"Router decision: {decision.route}")
-    )
+    # Invoke Azure OpenAI; the raw message carries the usage metadata
+    result = await llm.ainvoke(messages)
+    prompt_cache_stats.record("router", result["raw"])
+    decision: RouteDecision = result["parsed"]
+    if decision is None:
+        raise ValueError(f"Router returned no valid route: {result.get('parsing_error')}")
 
     print(f"🧭 ROUTER → Routing to: {decision.route}")
-    return state
+    await emit_event("route", {"route": decision.route, "confidence": decision.confidence, "fast_path": False})
+
+    # Only the changed keys; the route lives in state["route"], not in the message history
+    return {"route": decision.route, "llm_calls": state["llm_calls"] + 1}
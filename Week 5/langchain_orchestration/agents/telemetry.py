@@ -0,0 +1,346 @@
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+
+from langchain_core.callbacks import AsyncCallbackHandler
+from agents.events import role_from_tags
+from agents.tokens import count_message_tokens, count_tokens
+
+SERVICE_NAME = "presidio-hr-assistant"
+
+# Counter of finished spans per span kind
+SPAN_COUNTERS = {"run": "agent_runs_total", "node": "agent_node_runs_total", "llm": "agent_llm_calls_total", "tool": "agent_tool_calls_total"}
+
+# Histogram bucket bounds in seconds
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Metrics:
+    """
+    Process-wide Prometheus-style counters and histograms.
+    """
+
+    def __init__(self, buckets: tuple = DURATION_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._counters: dict[tuple[str, tuple], float] = {}
+        self._histograms: dict[tuple[str, tuple], list] = {}
+
+    def inc(self, metric: str, value: float = 1, **labels):
+        key = (metric, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, metric: str, seconds: float, **labels):
+        key = (metric, tuple(sorted(labels.items())))
+        with self._lock:
+            # Per-bucket counts, then sum and count
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    histogram[i] += 1
+                    break
+            histogram[-2] += seconds
+            histogram[-1] += 1
+
+    def render(self) -> str:
+        """
+        Prometheus text exposition format.
+        """
+        def labels_text(labels, extra=()):
+            pairs = [*labels, *extra]
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{key}="{value}"' for key, value in pairs) + "}"
+
+        lines = []
+        with self._lock:
+            for name in sorted({name for name, _ in self._counters}):
+                lines.append(f"# TYPE {name} counter")
+                for (metric, labels), value in sorted(self._counters.items()):
+                    if metric == name:
+                        lines.append(f"{name}{labels_text(labels)} {value:g}")
+            for name in sorted({name for name, _ in self._histograms}):
+                lines.append(f"# TYPE {name} histogram")
+                for (metric, labels), histogram in sorted(self._histograms.items()):
+                    if metric != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(self.buckets, histogram):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{labels_text(labels, [('le', f'{bound:g}')])} {cumulative}")
+                    lines.append(f"{name}_bucket{labels_text(labels, [('le', '+Inf')])} {histogram[-1]}")
+                    lines.append(f"{name}_sum{labels_text(labels)} {histogram[-2]:.6f}")
+                    lines.append(f"{name}_count{labels_text(labels)} {histogram[-1]}")
+        return "\n".join(lines) + "\n"
+
+
+_metrics = Metrics()
+
+
+def get_metrics() -> Metrics:
+    return _metrics
+
+
+@dataclass
+class Span:
+    name: str
+    kind: str  # "run", "node", "llm" or "tool"
+    span_id: str
+    parent_id: str | None
+    start_ns: int
+    end_ns: int = 0
+    error: str | None = None
+    attributes: dict = field(default_factory=dict)
+
+    @property
+    def duration_s(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e9
+
+
+class RunRecorder(AsyncCallbackHandler):
+    """
+    Callback handler that records one graph run as a tree of spans.
+
+    Purpose:
+    - One span per graph node, LLM call and tool call, plus a root "agent.run"
+    - Records wall time, queue wait, prompt/completion tokens, cache hits and errors
+    - Updates the process-wide Metrics when each span ends
+    - Exports the run as OpenTelemetry (OTLP/JSON) spans
+
+    Token counts come from the provider's usage metadata; they are only
+    estimated locally when the response has none.
+    """
+    # Handlers only touch plain dicts, so run them inline instead of as tasks
+    run_inline = True
+
+    def __init__(self, queue_wait_s: float = 0.0):
+        self.trace_id = uuid.uuid4().hex
+        self.queue_wait_s = queue_wait_s
+        self.spans: list[Span] = []
+        self._open: dict = {}
+        self._parents: dict = {}
+        self._span_runs: set = set()
+        self._llm_messages: dict = {}
+
+    def _span_id(self, run_id) -> str:
+        return run_id.hex[16:]
+
+    def _nearest_span(self, run_id) -> str | None:
+        # Walk up the LangChain run tree to the closest recorded span
+        while run_id is not None:
+            if run_id in self._span_runs:
+                return self._span_id(run_id)
+            run_id = self._parents.get(run_id)
+        return None
+
+    def _start(self, key, name: str, kind: str, parent_run_id, **attributes) -> Span:
+        span = Span(
+            name=name,
+            kind=kind,
+            span_id=self._span_id(key) if isinstance(key, uuid.UUID) else uuid.uuid4().hex[:16],
+            parent_id=self._nearest_span(parent_run_id),
+            start_ns=time.time_ns(),
+            attributes=attributes,
+        )
+        self._open[key] = span
+        if isinstance(key, uuid.UUID):
+            self._span_runs.add(key)
+        return span
+
+    def _end(self, key, error: str | None = None) -> Span | None:
+        span = self._open.pop(key, None)
+        if span is None:
+            return None
+        span.end_ns = time.time_ns()
+        span.error = error
+        self.spans.append(span)
+
+        metrics = get_metrics()
+        label = span.attributes.get("agent.role") or span.name
+        if span.kind == "node":
+            metrics.observe("agent_node_duration_seconds", span.duration_s, node=span.name)
+        elif span.kind == "llm":
+            metrics.observe("agent_llm_duration_seconds", span.duration_s, role=label)
+            metrics.inc("agent_llm_tokens_total", span.attributes.get("llm.prompt_tokens", 0), role=label, type="prompt")
+            metrics.inc("agent_llm_tokens_total", span.attributes.get("llm.completion_tokens", 0), role=label, type="completion")
+            metrics.inc("agent_llm_tokens_total", span.attributes.get("llm.cached_tokens", 0), role=label, type="cached")
+        elif span.kind == "tool":
+            metrics.observe("agent_tool_duration_seconds", span.duration_s, tool=span.name)
+            metrics.observe("agent_tool_queue_wait_seconds", span.attributes.get("queue_wait_s", 0.0), tool=span.name)
+        elif span.kind == "run":
+            metrics.observe("agent_run_duration_seconds", span.duration_s)
+        metrics.inc(SPAN_COUNTERS[span.kind], name=span.name)
+        if error:
+            metrics.inc("agent_errors_total", kind=span.kind, name=span.name)
+        return span
+
+    async def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, tags=None, metadata=None, **kwargs):
+        self._parents[run_id] = parent_run_id
+        if parent_run_id is None:
+            self._start(run_id, "agent.run", "run", None, queue_wait_s=self.queue_wait_s)
+            return
+        node = (metadata or {}).get("langgraph_node")
+        if node and (kwargs.get("name") or (serialized or {}).get("name")) == node:
+            self._start(run_id, node, "node", parent_run_id)
+
+    async def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._end(run_id)
+
+    async def on_chain_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error=repr(error))
+
+    async def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, tags=None, metadata=None, **kwargs):
+        self._parents[run_id] = parent_run_id
+        role = role_from_tags(tags) or "unknown"
+        self._start(run_id, f"llm.{role}", "llm", parent_run_id, **{"agent.role": role})
+        self._llm_messages[run_id] = messages[0] if messages else []
+
+    async def on_llm_end(self, response, *, run_id, **kwargs):
+        span = self._open.get(run_id)
+        messages = self._llm_messages.pop(run_id, [])
+        if span is not None:
+            usage = (response.llm_output or {}).get("token_usage") or {}
+            prompt, completion = usage.get("prompt_tokens"), usage.get("completion_tokens")
+            cached = (usage.get("prompt_tokens_details") or {}).get("cached_tokens")
+            if prompt is None and response.generations and response.generations[0]:
+                message = getattr(response.generations[0][0], "message", None)
+                usage_metadata = getattr(message, "usage_metadata", None) or {}
+                prompt, completion = usage_metadata.get("input_tokens"), usage_metadata.get("output_tokens")
+                cached = (usage_metadata.get("input_token_details") or {}).get("cache_read")
+            if prompt is None:
+                span.attributes["llm.tokens_estimated"] = True
+                prompt = count_message_tokens(messages)
+                completion = sum(count_tokens(g.text) for g in response.generations[0]) if response.generations else 0
+            span.attributes["llm.prompt_tokens"] = prompt
+            span.attributes["llm.completion_tokens"] = completion
+            span.attributes["llm.cached_tokens"] = cached or 0
+        self._end(run_id)
+
+    async def on_llm_error(self, error, *, run_id, **kwargs):
+        self._llm_messages.pop(run_id, None)
+        self._end(run_id, error=repr(error))
+
+    async def on_custom_event(self, name, data, *, run_id, **kwargs):
+        if name == "tool_start":
+            self._start(("tool", data["tool_call_id"]), data["tool"], "tool", run_id, domain=data["domain"])
+        elif name == "tool_end":
+            span = self._open.get(("tool", data["tool_call_id"]))
+            if span is not None:
+                span.attributes.update(queue_wait_s=data.get("queue_wait_s", 0.0), chars=data["chars"])
+                self._end(("tool", data["tool_call_id"]), error=None if data["status"] == "success" else data["status"])
+        elif name == "answer_cache":
+            span = self._open.get(run_id)
+            if span is not None:
+                span.attributes["cache_hit"] = data["hit"]
+            if data["hit"]:
+                get_metrics().inc("agent_cache_hits_total", cache="answer", domain=data["domain"])
+
+    def summary(self) -> dict:
+        """
+        Compact per-run record for results and API responses.
+        """
+        run = next((span for span in self.spans if span.kind == "run"), None)
+        nodes: dict[str, float] = {}
+        for span in self.spans:
+            if span.kind == "node":
+                nodes[span.name] = round(nodes.get(span.name, 0.0) + span.duration_s * 1000, 2)
+        llm = [span for span in self.spans if span.kind == "llm"]
+        return {
+            "trace_id": self.trace_id,
+            "duration_ms": round(run.duration_s * 1000, 2) if run else None,
+            "queue_wait_ms": round(self.queue_wait_s * 1000, 2),
+            "nodes_ms": nodes,
+            "llm": {
+                "calls": len(llm),
+                "prompt_tokens": sum(span.attributes.get("llm.prompt_tokens", 0) for span in llm),
+                "completion_tokens": sum(span.attributes.get("llm.completion_tokens", 0) for span in llm),
+                "cached_tokens": sum(span.attributes.get("llm.cached_tokens", 0) for span in llm),
+                "estimated": any(span.attributes.get("llm.tokens_estimated") for span in llm),
+            },
+            "tools": [
+                {
+                    "tool": span.name,
+                    "status": "error" if span.error else "success",
+                    "ms": round(span.duration_s * 1000, 2),
+                    "queue_wait_ms": round(span.attributes.get("queue_wait_s", 0.0) * 1000, 2),
+                    "chars": span.attributes.get("chars", 0),
+                }
+                for span in self.spans if span.kind == "tool"
+            ],
+            "cache_hits": sum(1 for span in self.spans if span.attributes.get("cache_hit")),
+            "errors": sum(1 for span in self.spans if span.error),
+        }
+
+    def to_otlp(self) -> dict:
+        """
+        The run's spans as an OTLP/JSON ExportTraceServiceRequest.
+        """
+        def attribute(key, value):
+            if isinstance(value, bool):
+                return {"key": key, "value": {"boolValue": value}}
+            if isinstance(value, int):
+                return {"key": key, "value": {"intValue": str(value)}}
+            if isinstance(value, float):
+                return {"key": key, "value": {"doubleValue": value}}
+            return {"key": key, "value": {"stringValue": str(value)}}
+
+        spans = []
+        for span in self.spans:
+            otlp_span = {
+                "traceId": self.trace_id,
+                "spanId": span.span_id,
+                "name": span.name,
+                "kind": 1,  # SPAN_KIND_INTERNAL
+                "startTimeUnixNano": str(span.start_ns),
+                "endTimeUnixNano": str(span.end_ns),
+                "attributes": [attribute("agent.span_kind", span.kind)] + [attribute(k, v) for k, v in span.attributes.items()],
+                # STATUS_CODE_ERROR = 2, STATUS_CODE_OK = 1
+                "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+            }
+            if span.parent_id:
+                otlp_span["parentSpanId"] = span.parent_id
+            spans.append(otlp_span)
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [attribute("service.name", SERVICE_NAME)]},
+                "scopeSpans": [{"scope": {"name": "agents.telemetry"}, "spans": spans}],
+            }]
+        }
+
+    def export(self, path: str | None = None):
+        """
+        Append the run's OTLP/JSON spans as one line to TELEMETRY_EXPORT_PATH (if set).
+        """
+        path = path or os.getenv("TELEMETRY_EXPORT_PATH")
+        if not path:
+            return
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(self.to_otlp()) + "\n")
+
+
+def telemetry_enabled() -> bool:
+    return os.getenv("TELEMETRY", "1") == "1"
+
+
+def instrument(config: dict, queue_wait_s: float = 0.0, always: bool = False) -> tuple[dict, RunRecorder | None]:
+    """
+    Copy of a run config with a new RunRecorder attached.
+
+    Returns (config, None) when TELEMETRY=0 or the run is not sampled: most of
+    the cost is LangChain's callback dispatch for every runnable in the graph,
+    so busy deployments can record a fraction of runs (TELEMETRY_SAMPLE_RATE).
+    always=True attaches one regardless, for callers whose own output needs
+    the per-node timings and tool calls (batch mode).
+    """
+    if not always and (not telemetry_enabled() or random.random() >= float(os.getenv("TELEMETRY_SAMPLE_RATE", "1.0"))):
+        return config, None
+    recorder = RunRecorder(queue_wait_s)
+    callbacks = list(config.get("callbacks") or [])
+    return {**config, "callbacks": [*callbacks, recorder]}, recorder
@@ -0,0 +1,34 @@
+def _load_encoder():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        # tiktoken missing or its vocabulary cannot be downloaded
+        return None
+
+
+_ENCODER = _load_encoder()
+
+# Per-message overhead of the chat format (role, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def has_exact_tokenizer() -> bool:
+    return _ENCODER is not None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Token count with tiktoken, or a 4-characters-per-token estimate without it.
+    """
+    if _ENCODER is None:
+        return len(text) // 4
+    return len(_ENCODER.encode(text))
+
+
+def count_message_tokens(messages: list) -> int:
+    total = 0
+    for message in messages:
+        content = message.content if isinstance(message.content, str) else str(message.content)
+        total += count_tokens(content) + MESSAGE_OVERHEAD_TOKENS
+    return total
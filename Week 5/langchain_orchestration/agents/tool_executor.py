@@ -0,0 +1,146 @@
+import asyncio
+import json
+import os
+import time
+
+from langchain_core.messages import AIMessage, ToolMessage
+from agents.events import emit_event
+from agents.prompts import prompt_cache_stats
+from mcp_tools.file_tool import read_file
+from mcp_tools.search_tool import search_docs
+from mcp_tools.web_tool import web_search
+
+TOOLS = {tool.name: tool for tool in (read_file, search_docs, web_search)}
+
+# Seconds before a single tool call is abandoned
+DEFAULT_TOOL_TIMEOUTS = {"read_file": 5.0, "search_docs": 5.0, "web_search": 15.0}
+
+
+class ToolExecutor:
+    """
+    Shared async tool-execution engine for the specialist agents.
+
+    Purpose:
+    - Runs every tool call from one model turn concurrently
+    - Runs blocking tools in worker threads so the event loop keeps serving
+    - Applies a per-tool timeout and a concurrency limit
+    - Returns each result as a ToolMessage tied to its tool_call_id
+    - Repeats model -> tools rounds up to max_rounds
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int | None = None,
+        max_rounds: int | None = None,
+        timeouts: dict | None = None,
+    ):
+        self.max_concurrency = max_concurrency or int(os.getenv("TOOL_MAX_CONCURRENCY", "4"))
+        self.max_rounds = max_rounds or int(os.getenv("MAX_TOOL_ROUNDS", "3"))
+        self.timeouts = dict(DEFAULT_TOOL_TIMEOUTS)
+        if os.getenv("TOOL_TIMEOUT_S"):
+            self.timeouts = {name: float(os.getenv("TOOL_TIMEOUT_S")) for name in self.timeouts}
+        self.timeouts.update(timeouts or {})
+
+    def _prepare_args(self, name: str, args, domain: str):
+        if name == "read_file":
+            # read_file takes one JSON "payload" string; pin it to the agent's domain
+            if isinstance(args, dict) and "payload" in args:
+                args = args["payload"]
+            if isinstance(args, str):
+                try:
+                    args = json.loads(args)
+                except json.JSONDecodeError:
+                    args = {"filename": args}
+            args = dict(args)
+            args["domain"] = domain
+            return json.dumps(args)
+        if name == "search_docs":
+            # Always search the agent's own domain
+            args = dict(args) if isinstance(args, dict) else {"query": str(args)}
+            args["domain"] = domain
+            return args
+        if name == "web_search":
+            if isinstance(args, dict):
+                return args.get("query", str(args))
+            return str(args)
+        return args
+
+    async def _run_one(self, tool_call: dict, domain: str, semaphore: asyncio.Semaphore, log_prefix: str) -> ToolMessage:
+        name = tool_call["name"]
+        tool = TOOLS.get(name)
+        if tool is None:
+            return ToolMessage(content=f"Unknown tool: {name}", tool_call_id=tool_call["id"], name=name, status="error")
+
+        args = self._prepare_args(name, tool_call["args"], domain)
+        timeout = self.timeouts.get(name, 10.0)
+        await emit_event("tool_start", {"tool": name, "domain": domain, "tool_call_id": tool_call["id"]})
+        queued = time.perf_counter()
+        async with semaphore:
+            queue_wait = time.perf_counter() - queued
+            try:
+                if tool.coroutine is not None:
+                    result = await asyncio.wait_for(tool.ainvoke(args), timeout)
+                else:
+                    result = await asyncio.wait_for(asyncio.to_thread(tool.invoke, args), timeout)
+                message = ToolMessage(content=str(result), tool_call_id=tool_call["id"], name=name)
+                print(f"{log_prefix} Tool {name} result: {message.content[:100]}...")
+            except asyncio.TimeoutError:
+                print(f"{log_prefix} Tool {name} timed out after {timeout}s")
+                message = ToolMessage(content=f"Tool {name} timed out after {timeout}s", tool_call_id=tool_call["id"], name=name, status="error")
+            except Exception as e:
+                print(f"{log_prefix} Tool {name} failed: {e}")
+                message = ToolMessage(content=f"Tool {name} failed: {e}", tool_call_id=tool_call["id"], name=name, status="error")
+
+        await emit_event("tool_end", {"tool": name, "domain": domain, "tool_call_id": tool_call["id"], "status": message.status, "chars": len(message.content), "queue_wait_s": queue_wait})
+        return message
+
+    async def execute(self, tool_calls: list, domain: str, log_prefix: str = "") -> list[ToolMessage]:
+        """
+        Run one turn's tool calls concurrently; results keep the call order.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        return await asyncio.gather(
+            *(self._run_one(tool_call, domain, semaphore, log_prefix) for tool_call in tool_calls)
+        )
+
+    async def run(self, llm, messages: list, domain: str, log_prefix: str = "") -> AIMessage:
+        """
+        Call the model, execute any requested tools, and feed every result back
+        until the model answers without tools. After max_rounds, a last call
+        with tool_choice="none" forces a text answer.
+
+        `messages` is extended in place with the tool-call turns.
+        """
+        response = await llm.ainvoke(messages)
+        prompt_cache_stats.record(domain, response)
+        for _ in range(self.max_rounds):
+            if not getattr(response, "tool_calls", None):
+                return response
+
+            print(f"{log_prefix} Agent making {len(response.tool_calls)} tool call(s)...")
+            tool_messages = await self.execute(response.tool_calls, domain, log_prefix)
+            messages.append(response)
+            messages.extend(tool_messages)
+            response = await llm.ainvoke(messages)
+            prompt_cache_stats.record(domain, response)
+
+        if getattr(response, "tool_calls", None):
+            # Out of rounds: its calls are dropped and one more call, with tools
+            # disabled, makes the model answer from the results it already has
+            print(f"{log_prefix} Tool round limit ({self.max_rounds}) reached, asking for a final answer")
+            response = await llm.bind(tool_choice="none").ainvoke(messages)
+            prompt_cache_stats.record(domain, response)
+        return response
+
+
+_executor = None
+
+
+def get_tool_executor() -> ToolExecutor:
+    """
+    Return the shared ToolExecutor configured from the environment.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ToolExecutor()
+    return _executor
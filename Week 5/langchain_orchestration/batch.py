@@ -0,0 +1,159 @@
+"""
+Batch/offline mode for the multi-agent assistant.
+
+Reads queries from JSONL ({"id": ..., "query": ...} per line; id defaults to
+the line number), runs them through the compiled graph with bounded
+concurrency and writes one JSONL result per query. Results are appended and
+flushed as they finish, so an interrupted run resumes where it stopped.
+
+    python batch.py queries.jsonl results.jsonl --concurrency 8
+"""
+from agents.runtime import get_runtime
+from agents.memory import session_config
+from agents.model.AgentState import AgentState
+from agents.telemetry import instrument, telemetry_enabled
+
+from langchain_core.messages import HumanMessage
+from agents.response import extract_final_response
+import argparse
+import asyncio
+import json
+import os
+import time
+import uuid
+
+
+def read_queries(path: str):
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if isinstance(record, str):
+                record = {"query": record}
+            record.setdefault("id", line_number)
+            yield record
+
+
+def completed_ids(path: str) -> set:
+    """
+    Ids already in the results file. A torn last line from a crash is cut off.
+    """
+    if not os.path.exists(path):
+        return set()
+
+    with open(path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+            data = data[:data.rfind(b"\n") + 1]
+
+    done = set()
+    for line in data.decode("utf-8").splitlines():
+        try:
+            done.add(str(json.loads(line)["id"]))
+        except (json.JSONDecodeError, KeyError):
+            continue
+    return done
+
+
+async def run_query(agent, runtime, record: dict) -> dict:
+    # Unique per row: rows sharing an id must not share session memory
+    session_id = f"batch-{record['id']}-{uuid.uuid4().hex[:8]}"
+    # Always recorded: timings and tool_calls are part of every result line
+    config, recorder = instrument(session_config(session_id), always=True)
+    initial_state: AgentState = {
+        "messages": [HumanMessage(content=record["query"])],
+        "llm_calls": 0,
+        "route": "",
+        "response": "",
+        "error": None,
+    }
+
+    start = time.perf_counter()
+    result = {"id": record["id"], "query": record["query"]}
+    try:
+        state = await agent.ainvoke(initial_state, config)
+        result.update({
+            "route": state.get("route"),
+            "llm_calls": state.get("llm_calls"),
+            "response": extract_final_response(state),
+            # Specialists answer failures with error text; keep them failures here
+            "error": state.get("error"),
+        })
+    except Exception as e:
+        result.update({"route": None, "llm_calls": None, "response": None, "error": str(e)})
+    finally:
+        # Batch queries are independent; free their session state right away
+        runtime.memory.end_session(session_id)
+
+    telemetry = recorder.summary()
+    result["timings"] = {"total": round(time.perf_counter() - start, 4)}
+    result["timings"].update({node: round(ms / 1000, 4) for node, ms in telemetry["nodes_ms"].items()})
+    result["tool_calls"] = telemetry["tools"]
+    # The full trace and its export stay behind TELEMETRY
+    if telemetry_enabled():
+        recorder.export()
+        result["telemetry"] = telemetry
+    return result
+
+
+async def run_batch(input_path: str, output_path: str, concurrency: int = 4):
+    runtime = get_runtime()
+    await runtime.warm_up()
+    agent = runtime.get_graph()
+
+    done = completed_ids(output_path)
+    if done:
+        print(f"↩️ Resuming: {len(done)} queries already in {output_path}")
+
+    # Bounded queue: the reader waits whenever the workers fall behind
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    counts = {"done": 0, "errors": 0, "skipped": 0}
+    start = time.perf_counter()
+
+    async def reader():
+        for record in read_queries(input_path):
+            if str(record["id"]) in done:
+                counts["skipped"] += 1
+                continue
+            await queue.put(record)
+        for _ in range(concurrency):
+            await queue.put(None)
+
+    with open(output_path, "a", encoding="utf-8") as out:
+
+        async def worker():
+            while True:
+                record = await queue.get()
+                if record is None:
+                    return
+                result = await run_query(agent, runtime, record)
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                out.flush()
+                counts["done"] += 1
+                if result["error"]:
+                    counts["errors"] += 1
+                if counts["done"] % 50 == 0:
+                    elapsed = time.perf_counter() - start
+                    print(f"📦 {counts['done']} done ({counts['done'] / elapsed:.1f} q/s, {counts['errors']} errors)")
+
+        await asyncio.gather(reader(), *(worker() for _ in range(concurrency)))
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ Batch complete: {counts['done']} run, {counts['skipped']} skipped, {counts['errors']} errors in {elapsed:.1f}s")
+    await runtime.aclose()
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="JSONL file with one query per line")
+    parser.add_argument("output", help="JSONL results file (appended to; existing ids are skipped)")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("BATCH_CONCURRENCY", "4")))
+    args = parser.parse_args()
+    try:
+        asyncio.run(run_batch(args.input, args.output, args.concurrency))
+    except KeyboardInterrupt:
+        print("\n⏸️ Interrupted. Run the same command again to resume.")
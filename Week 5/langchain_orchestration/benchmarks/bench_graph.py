@@ -0,0 +1,232 @@
+"""
+Offline benchmark of the agent graph's orchestration overhead.
+
+Every LLM role is replaced by a deterministic fake (benchmarks/fake_llm.py)
+with a fixed latency, so the numbers show what the graph, supervisor,
+tool handling and extract_final_response cost on top of the model calls.
+Each workload (tool-call pattern) runs at several concurrency levels and
+reports p50/p95/p99 latency, throughput, overhead and peak memory.
+
+Run from langchain_orchestration/:
+    python benchmarks/bench_graph.py [--latency-ms 20] [--requests 100] [--concurrency 1,8,32]
+    python benchmarks/bench_graph.py --compare benchmarks/results/graph-<commit>.json
+
+Results go to benchmarks/results/graph-<commit>.json (or --output) so runs
+on different commits can be compared.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from langchain_core.messages import HumanMessage
+from agents.runtime import get_runtime
+from agents.memory import session_config
+from agents.answer_cache import get_answer_cache
+from agents.telemetry import RunRecorder
+from agents.prompts import prompt_cache_stats
+from benchmarks.fake_llm import install_fake_llms
+from agents.response import extract_final_response
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+QUERIES = [
+    "How do I set up VPN?",
+    "When is payroll processed?",
+    "How do I request a new laptop?",
+    "How do I file a reimbursement for travel expenses?",
+    "What software is approved for use?",
+    "Where can I find last month's budget report?",
+]
+
+
+def _search(query: str) -> dict:
+    return {"name": "search_docs", "args": {"query": query, "k": 3}}
+
+
+def _read(filename: str) -> dict:
+    return {"name": "read_file", "args": {"payload": json.dumps({"filename": filename})}}
+
+
+# Tool rounds per specialist role for each workload
+WORKLOADS = {
+    "answer_only": {},
+    "one_tool": {
+        "it": [[_search("vpn setup")]],
+        "finance": [[_search("payroll schedule")]],
+    },
+    "parallel_tools": {
+        "it": [[_search("vpn setup"), _read("vpn_setup.txt")]],
+        "finance": [[_search("payroll schedule"), _read("payroll_schedule.txt")]],
+    },
+    "two_rounds": {
+        "it": [[_search("laptop request")], [_read("laptop_request.txt")]],
+        "finance": [[_search("reimbursement")], [_read("reimbursement_process.txt")]],
+    },
+}
+
+
+def percentile(values: list, p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] if ordered else 0.0
+
+
+def git_commit() -> str:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True).stdout.strip()
+        return commit + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def run_queries(agent, runtime, requests: int, concurrency: int, telemetry: bool = False) -> tuple[list, int]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+
+    async def one(i: int):
+        nonlocal errors
+        session_id = f"bench-{i}"
+        state = {"messages": [HumanMessage(content=QUERIES[i % len(QUERIES)])], "llm_calls": 0, "route": "", "response": ""}
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                config = session_config(session_id)
+                if telemetry:
+                    config["callbacks"] = [RunRecorder()]
+                result = await agent.ainvoke(state, config)
+                extract_final_response(result)
+                latencies.append(time.perf_counter() - start)
+            except Exception:
+                errors += 1
+            finally:
+                runtime.memory.end_session(session_id)
+
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return latencies, errors
+
+
+async def run_workload(agent, runtime, name: str, requests: int, concurrency: int, latency_s: float, telemetry: bool = False) -> dict:
+    install_fake_llms(runtime, latency_s, WORKLOADS[name])
+    # Router call + one call per tool round + the final answer
+    model_calls = 1 + len(WORKLOADS[name].get("it", [])) + 1
+
+    await run_queries(agent, runtime, concurrency, concurrency, telemetry)
+
+    start = time.perf_counter()
+    latencies, errors = await run_queries(agent, runtime, requests, concurrency, telemetry)
+    elapsed = time.perf_counter() - start
+
+    # Separate pass for memory: tracemalloc slows allocation-heavy code down
+    tracemalloc.start()
+    await run_queries(agent, runtime, requests, concurrency, telemetry)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    p50 = percentile(latencies, 50)
+    return {
+        "workload": name,
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "p50_ms": round(p50 * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "throughput_qps": round(len(latencies) / elapsed, 2),
+        "overhead_p50_ms": round((p50 - model_calls * latency_s) * 1000, 2),
+        "peak_traced_mb": round(peak / 1e6, 2),
+    }
+
+
+def print_table(results: list, baseline: dict | None = None):
+    previous = {(r["workload"], r["concurrency"]): r for r in (baseline or {}).get("results", [])}
+    print(f"{'workload':<16}{'conc':>5}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'qps':>9}{'ovh ms':>9}{'peak MB':>9}")
+    for r in results:
+        print(f"{r['workload']:<16}{r['concurrency']:>5}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}{r['throughput_qps']:>9}{r['overhead_p50_ms']:>9}{r['peak_traced_mb']:>9}")
+        old = previous.get((r["workload"], r["concurrency"]))
+        if old:
+            deltas = {key: r[key] - old[key] for key in ("p50_ms", "p99_ms", "throughput_qps", "overhead_p50_ms", "peak_traced_mb")}
+            print(f"{'  vs baseline':<21}" + "  ".join(f"{key} {value:+.2f}" for key, value in deltas.items()))
+
+
+async def main(args):
+    latency_s = args.latency_ms / 1000
+    levels = [int(level) for level in args.concurrency.split(",")]
+    workloads = args.workloads.split(",") if args.workloads else list(WORKLOADS)
+
+    runtime = get_runtime()
+    install_fake_llms(runtime, latency_s)
+    await runtime.warm_up()
+    agent = runtime.get_graph()
+    # Measure the graph itself, not cached answers or the local fast path
+    get_answer_cache().enabled = False
+    if args.router == "llm":
+        runtime.get_fast_router().threshold = 2.0
+
+    results = []
+    with open(os.devnull, "w") as devnull:
+        for name in workloads:
+            for concurrency in levels:
+                # The agents log every step; keep that out of the terminal and the timings' noise
+                with contextlib.redirect_stdout(devnull):
+                    result = await run_workload(agent, runtime, name, args.requests, concurrency, latency_s, args.telemetry)
+                results.append(result)
+                print(f"✅ {name} @ {concurrency}: p50 {result['p50_ms']}ms, {result['throughput_qps']} q/s")
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "latency_ms": args.latency_ms,
+            "requests": args.requests,
+            "router": args.router,
+            "speculative_mode": os.getenv("SPECULATIVE_MODE", "off"),
+            "telemetry": args.telemetry,
+            "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        },
+        "results": results,
+        "prompt_cache": prompt_cache_stats.report(),
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"\n📊 Compared with {baseline['meta']['commit']} ({args.compare})")
+        # A changed prefix means the provider's prompt cache starts cold again
+        for agent, current in report["prompt_cache"].items():
+            old = baseline.get("prompt_cache", {}).get(agent)
+            if old and old["prefix_fingerprint"] != current["prefix_fingerprint"]:
+                print(f"⚠️ {agent} prompt prefix changed ({old['prefix_fingerprint']} -> {current['prefix_fingerprint']})")
+    print()
+    print_table(results, baseline)
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"graph-{report['meta']['commit']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"\n💾 Results written to {output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency-ms", type=float, default=20, help="latency of every fake LLM call")
+    parser.add_argument("--requests", type=int, default=100, help="queries per workload and concurrency level")
+    parser.add_argument("--concurrency", default="1,8,32", help="comma-separated concurrency levels")
+    parser.add_argument("--workloads", default=None, help=f"comma-separated subset of: {', '.join(WORKLOADS)}")
+    parser.add_argument("--router", choices=("llm", "fast"), default="llm", help="llm forces every query through the supervisor LLM")
+    parser.add_argument("--telemetry", action="store_true", help="attach a RunRecorder to every query to measure its overhead")
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--compare", default=None, help="earlier results file to diff against")
+    asyncio.run(main(parser.parse_args()))
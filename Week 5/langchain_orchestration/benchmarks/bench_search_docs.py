@@ -0,0 +1,66 @@
+"""
+Micro-benchmark: prompt tokens sent to the specialist LLM with read_file
+(whole document) versus search_docs (top-k BM25 passages).
+
+Run from langchain_orchestration/:
+    python benchmarks/bench_search_docs.py [--k 3] [--repeat 1000]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from agents.tokens import count_tokens, has_exact_tokenizer
+from mcp_tools.doc_store import get_document_store
+from mcp_tools.search_tool import get_search_index
+
+QUESTIONS = [
+    ("finance", "When is payroll processed?"),
+    ("finance", "How do I set up direct deposit?"),
+    ("finance", "How do I file a reimbursement for travel expenses?"),
+    ("finance", "What is the deadline for submitting expense receipts?"),
+    ("finance", "Where can I find last month's budget report?"),
+    ("it", "How do I set up VPN?"),
+    ("it", "How do I request a new laptop?"),
+    ("it", "What software is approved for use?"),
+    ("it", "How long does software approval take?"),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=1000)
+    args = parser.parse_args()
+
+    store = get_document_store()
+    index = get_search_index()
+
+    if not has_exact_tokenizer():
+        print("(tiktoken unavailable: estimating 4 characters per token)")
+    print(f"{'question':55} {'read_file':>10} {'search_docs':>12} {'saved':>7}")
+    total_full = total_search = 0
+    for domain, question in QUESTIONS:
+        results = index.get(domain).search(question, args.k)
+        # read_file baseline: the model reads the whole file holding the best passage
+        best_file = results[0][1].filename
+        full_tokens = count_tokens(store.get(domain, best_file).text)
+        search_tokens = count_tokens("\n\n".join(passage.text for _, passage in results))
+        total_full += full_tokens
+        total_search += search_tokens
+        print(f"{question[:55]:55} {full_tokens:>10} {search_tokens:>12} {1 - search_tokens / full_tokens:>7.0%}")
+
+    print(f"{'TOTAL':55} {total_full:>10} {total_search:>12} {1 - total_search / total_full:>7.0%}")
+
+    start = time.perf_counter()
+    for i in range(args.repeat):
+        domain, question = QUESTIONS[i % len(QUESTIONS)]
+        index.get(domain).search(question, args.k)
+    elapsed = time.perf_counter() - start
+    print(f"\nsearch latency: {elapsed / args.repeat * 1e6:.1f} us/query over {args.repeat} queries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Load test for server.py: throughput, latency percentiles and shed requests.
+
+By default the app runs in-process (httpx ASGI transport) with fake LLMs,
+so the numbers measure the serving layer and graph overhead only:
+
+    python benchmarks/bench_server.py --requests 400 --concurrency 64 --stub-llm-ms 200
+
+Point it at a running server instead with --url http://127.0.0.1:8080
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+QUERIES = [
+    "How do I reset my VPN password?",
+    "How many days of paid leave do I get?",
+    "My laptop will not connect to the office wifi",
+    "When is the travel reimbursement paid out?",
+]
+
+
+def percentile(values: list, p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] if ordered else 0.0
+
+
+async def run_load(client: httpx.AsyncClient, total: int, concurrency: int, stream: bool, bypass_cache: bool = False) -> dict:
+    latencies, statuses = [], {}
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(i)
+
+    async def worker():
+        while not queue.empty():
+            i = queue.get_nowait()
+            body = {"query": QUERIES[i % len(QUERIES)], "bypass_cache": bypass_cache}
+            start = time.perf_counter()
+            if stream:
+                async with client.stream("POST", "/chat/stream", json=body) as response:
+                    async for _ in response.aiter_lines():
+                        pass
+                    status = response.status_code
+            else:
+                status = (await client.post("/chat", json=body)).status_code
+            statuses[status] = statuses.get(status, 0) + 1
+            if status == 200:
+                latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "statuses": statuses,
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+    }
+
+
+async def main(args):
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, timeout=120) as client:
+            print(await run_load(client, args.requests, args.concurrency, args.stream, args.bypass_cache))
+        return
+
+    from server import create_app
+
+    app = create_app(args.max_in_flight, args.max_queue, args.stub_llm_ms)
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            print(await run_load(client, args.requests, args.concurrency, args.stream, args.bypass_cache))
+            print((await client.get("/stats")).json())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=None, help="benchmark a running server instead of an in-process one")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--stream", action="store_true", help="use /chat/stream")
+    parser.add_argument("--bypass-cache", action="store_true", help="skip the answer cache so every request runs the specialists")
+    parser.add_argument("--stub-llm-ms", type=float, default=200)
+    parser.add_argument("--max-in-flight", type=int, default=None)
+    parser.add_argument("--max-queue", type=int, default=None)
+    asyncio.run(main(parser.parse_args()))
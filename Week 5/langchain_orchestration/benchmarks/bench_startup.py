@@ -0,0 +1,101 @@
+"""
+Startup benchmark for the CLI: time until the prompt appears and until an
+immediate `exit` returns, compared with importing the full agent stack
+(what used to run before the prompt).
+
+Run from langchain_orchestration/:
+    python benchmarks/bench_startup.py [--runs 5] [--output startup.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PACKAGE_DIR = Path(__file__).resolve().parent.parent
+PROMPT_LINE = "Ask me about"
+
+# Everything chat() used to import and build before printing the prompt
+EAGER_STARTUP = (
+    "import main, agents.runtime, agents.multiagent, langchain_openai; "
+    "from agents.runtime import get_runtime; get_runtime().prepare()"
+)
+
+
+def _env() -> dict:
+    env = dict(os.environ, PYTHONUNBUFFERED="1")
+    # Client construction needs these to be set; nothing is sent
+    env.setdefault("AZURE_OPENAI_API_KEY", "startup-benchmark")
+    env.setdefault("AZURE_OPENAI_ENDPOINT", "https://example.openai.azure.com")
+    env.setdefault("AZURE_OPENAI_API_VERSION", "2024-06-01")
+    env.setdefault("AZURE_OPENAI_DEPLOYMENT_NAME", "startup-benchmark")
+    return env
+
+
+def time_to_prompt() -> tuple[float, float]:
+    """
+    Start the CLI, answer `exit` once the prompt shows; return (time to prompt, total).
+    """
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "main.py"],
+        cwd=PACKAGE_DIR,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        env=_env(),
+    )
+    for line in process.stdout:
+        if PROMPT_LINE in line:
+            break
+    prompt_at = time.perf_counter() - start
+    process.stdin.write("exit\n")
+    process.stdin.flush()
+    process.communicate()
+    return prompt_at, time.perf_counter() - start
+
+
+def eager_startup() -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", EAGER_STARTUP], cwd=PACKAGE_DIR, check=True, env=_env(), capture_output=True)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--output", default=None, help="write the results as JSON")
+    args = parser.parse_args()
+
+    # One untimed run so the bytecode cache is warm for every measured run
+    time_to_prompt()
+
+    prompts, exits, eager = [], [], []
+    for _ in range(args.runs):
+        prompt_at, total = time_to_prompt()
+        prompts.append(prompt_at)
+        exits.append(total)
+        eager.append(eager_startup())
+
+    results = {
+        "runs": args.runs,
+        "time_to_prompt_ms": round(statistics.median(prompts) * 1000, 1),
+        "exit_immediately_ms": round(statistics.median(exits) * 1000, 1),
+        "eager_startup_ms": round(statistics.median(eager) * 1000, 1),
+    }
+    results["saved_before_prompt_ms"] = round(results["eager_startup_ms"] - results["time_to_prompt_ms"], 1)
+
+    print(f"🚀 Time to prompt (median of {args.runs}): {results['time_to_prompt_ms']}ms")
+    print(f"🚪 Start + immediate exit: {results['exit_immediately_ms']}ms")
+    print(f"🐢 Eager import + warm-up (old time to prompt): {results['eager_startup_ms']}ms")
+    print(f"✅ Saved before the prompt: {results['saved_before_prompt_ms']}ms")
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Deterministic stand-ins for AzureChatOpenAI so the graph can run offline.
+"""
+import asyncio
+import hashlib
+import json
+import time
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import RunnableLambda
+from pydantic import PrivateAttr
+from agents.model.RouteDecision import RouteDecision
+from agents.prompts import PROVIDER_MIN_CACHED_TOKENS
+from agents.tokens import count_message_tokens
+
+# Beyond the minimum, the provider caches in steps of this many tokens
+PROVIDER_CACHE_STEP_TOKENS = 128
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Chat model that waits `latency_s` and then answers deterministically.
+
+    tool_calls holds one list of {"name", "args"} calls per tool round: the
+    model requests round N's calls after N earlier tool-call turns, and gives
+    the fixed answer (streamed word by word) once every round is done, or
+    right away when called with tool_choice="none".
+
+    with_structured_output() returns a router that produces a RouteDecision:
+    `route` when set, otherwise the local keyword router's pick.
+
+    Responses carry usage metadata in which a repeated head of the prompt is
+    reported as cached, with the provider's 1024-token minimum (see usage).
+    Each instance keeps its own prefix cache, so a fresh install_fake_llms()
+    starts cold.
+    """
+    latency_s: float = 0.1
+    answer: str = "This is a stub answer from the fake LLM."
+    tool_calls: list[list[dict]] = []
+    route: str | None = None
+
+    # Leading message runs already "sent", to simulate the provider's prefix cache
+    _seen_prefixes: set = PrivateAttr(default_factory=set)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def usage(self, messages) -> dict:
+        """
+        Usage metadata shaped like Azure OpenAI's: the longest run of leading
+        messages sent before counts as cached, but like the provider's cache only
+        from PROVIDER_MIN_CACHED_TOKENS up and in 128-token steps.
+        """
+        prompt_tokens = count_message_tokens(messages)
+        repeated = 0
+        digest = hashlib.sha256()
+        for end, message in enumerate(messages, 1):
+            digest.update(f"{message.type}\0{message.content!r}\0{getattr(message, 'tool_calls', None)!r}\0".encode("utf-8"))
+            key = digest.hexdigest()
+            if key in self._seen_prefixes:
+                repeated = end
+            self._seen_prefixes.add(key)
+        cached = count_message_tokens(messages[:repeated]) if repeated else 0
+        if cached < PROVIDER_MIN_CACHED_TOKENS:
+            cached = 0
+        else:
+            cached = PROVIDER_MIN_CACHED_TOKENS + (cached - PROVIDER_MIN_CACHED_TOKENS) // PROVIDER_CACHE_STEP_TOKENS * PROVIDER_CACHE_STEP_TOKENS
+        return {
+            "input_tokens": prompt_tokens,
+            "output_tokens": 10,
+            "total_tokens": prompt_tokens + 10,
+            "input_token_details": {"cache_read": cached},
+        }
+
+    def _message(self, messages, tool_choice=None) -> AIMessage:
+        done_rounds = sum(1 for msg in messages if isinstance(msg, AIMessage) and msg.tool_calls)
+        if done_rounds < len(self.tool_calls) and tool_choice != "none":
+            return AIMessage(content="", usage_metadata=self.usage(messages), tool_calls=[
+                {"name": call["name"], "args": call["args"], "id": f"call_{done_rounds}_{i}", "type": "tool_call"}
+                for i, call in enumerate(self.tool_calls[done_rounds])
+            ])
+        return AIMessage(content=self.answer, usage_metadata=self.usage(messages))
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.latency_s)
+        return ChatResult(generations=[ChatGeneration(message=self._message(messages, kwargs.get("tool_choice")))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.latency_s)
+        return ChatResult(generations=[ChatGeneration(message=self._message(messages, kwargs.get("tool_choice")))])
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(self.latency_s)
+        message = self._message(messages, kwargs.get("tool_choice"))
+        if message.tool_calls:
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=message.usage_metadata, tool_call_chunks=[
+                {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": i}
+                for i, call in enumerate(message.tool_calls)
+            ]))
+            return
+        words = message.content.split(" ")
+        for i, word in enumerate(words):
+            last = i == len(words) - 1
+            chunk = ChatGenerationChunk(message=AIMessageChunk(
+                content=word if last else word + " ",
+                usage_metadata=message.usage_metadata if last else None,
+            ))
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def with_structured_output(self, schema=RouteDecision, include_raw: bool = False, **kwargs):
+        # Imported here because the runtime imports the agents' tools
+        from agents.runtime import get_fast_router
+
+        async def route(messages):
+            await asyncio.sleep(self.latency_s)
+            route = self.route
+            if route is None:
+                query = next((m.content for m in reversed(messages) if isinstance(m, HumanMessage)), "")
+                route = get_fast_router().classify(query).route
+            decision = schema(route=route, confidence=1.0)
+            if include_raw:
+                raw = AIMessage(content=decision.model_dump_json(), usage_metadata=self.usage(messages))
+                return {"raw": raw, "parsed": decision, "parsing_error": None}
+            return decision
+
+        return RunnableLambda(route)
+
+
+def install_fake_llms(runtime, latency_s: float = 0.1, tool_calls: dict | None = None, route: str | None = None):
+    """
+    Replace every role client of an AgentRuntime with a fake.
+
+    tool_calls maps a specialist role ("it", "finance") to its tool rounds.
+    """
+    tool_calls = tool_calls or {}
+    runtime.set_llm("router", FakeChatModel(latency_s=latency_s, route=route).with_structured_output(RouteDecision, include_raw=True))
+    for role in ("it", "finance", "summarizer"):
+        runtime.set_llm(role, FakeChatModel(
+            latency_s=latency_s,
+            answer=f"Stub {role} answer from the fake LLM.",
+            tool_calls=tool_calls.get(role, []),
+        ))
@@ -1,15 +1,42 @@
-from agents.multiagent import create_agent_graph 
-from agents.model.AgentState import AgentState
-
-from langchain_core.messages import HumanMessage,AIMessage
+# Only the standard library is imported at startup so the prompt appears at once;
+# LangChain, LangGraph and the Azure OpenAI SDK load in a background thread.
+from concurrent.futures import Future
+import argparse
 import asyncio
+import subprocess
+import sys
+import threading
+import time
+
+def start_warm_up() -> Future:
+    """
+    Import the agent stack and build the graph and LLM clients on a daemon
+    thread, so the user can type the first question meanwhile and exiting
+    never waits for it.
+    """
+    future = Future()
+
+    def run():
+        try:
+            from agents.runtime import get_runtime
+            runtime = get_runtime()
+            runtime.prepare()
+            future.set_result(runtime)
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name="warm-up", daemon=True).start()
+    return future
+
+async def chat(stream: bool = False):
+    # Compile the graph and build the pooled LLM clients once, in the background
+    warm_up = start_warm_up()
+    runtime = agent = config = None
 
-async def chat():
     print("Ask me about insurance, benefits, and HR policies!")
     while True:
         try:
             user_input = input("You: ").strip()
-            agent = create_agent_graph()
 
             if not user_input:
                 continue
@@ -17,20 +44,42 @@ async def chat():
             if user_input.lower() in ['exit', 'quit', 'bye', 'goodbye']:
                 print("\nThank you for using Presidio HR Assistant. Goodbye!")
                 break
+
+            if agent is None:
+                # Usually finished while the question was typed
+                runtime = await asyncio.wrap_future(warm_up)
+                await runtime.warm_up()
+                agent = runtime.get_graph()
+                # One session per CLI run: earlier turns are remembered through the checkpointer
+                from agents.memory import session_config
+                config = session_config()
+
+            from agents.telemetry import instrument
+            from agents.response import extract_final_response
+            from langchain_core.messages import HumanMessage
             
-            # For CompiledStateGraph, invoke returns a dict with 'messages' key
-            initial_state: AgentState = {
+            # For CompiledStateGraph, invoke returns a dict with 'messages' key.
+            # The message is appended to the session history; the counters reset per turn.
+            initial_state = {
                 "messages": [HumanMessage(content=user_input)],
                 "llm_calls": 0,
                 "route": "",
                 "response": ""
                     }
-            result = await agent.ainvoke(initial_state)
+            # Fresh recorder per turn; the session config itself is reused
+            turn_config, recorder = instrument(config)
+            if stream:
+                await stream_turn(agent, initial_state, turn_config)
+                print_telemetry(recorder)
+                continue
+
+            result = await agent.ainvoke(initial_state, turn_config)
             
             response = result
             response = extract_final_response(result)
             
             print(f"\nAssistant: {response}\n")
+            print_telemetry(recorder)
             
         except KeyboardInterrupt:
             print("\n\nInterrupted. Goodbye!")
@@ -39,36 +88,109 @@ async def chat():
             print(f"\n❌ Error: {str(e)}")
             print("Please try rephrasing your question.\n")
 
-def extract_final_response(state: dict) -> str:
+    if runtime is None:
+        # Nothing was asked; don't wait for the warm-up just to print empty stats
+        return
+
+    from agents.speculative import speculation_stats
+    from agents.answer_cache import get_answer_cache
+    from agents.prompts import prompt_cache_stats
+    from mcp_tools.doc_store import get_document_store
+    from mcp_tools.search_cache import get_search_cache
+
+    print(f"⚙️ Runtime setup stats: {runtime.stats.report()}")
+    print(f"🧭 Router stats: {runtime.get_fast_router().stats()}")
+    print(f"⚡ Speculation stats: {speculation_stats.report()}")
+    print(f"🧠 Memory stats: {runtime.memory.stats}")
+    print(f"💾 Answer cache stats: {get_answer_cache().stats()}")
+    print(f"🧩 Prompt prefix cache stats: {prompt_cache_stats.report()}")
+    print(f"📄 Document store stats: {get_document_store().stats}")
+    search_cache = get_search_cache()
+    print(f"🔎 Web search cache stats: {search_cache.stats()} | client: {search_cache.provider.stats()}")
+    await runtime.aclose()
+
+async def stream_turn(agent, initial_state: dict, config: dict | None = None) -> dict:
+    """
+    Run one turn with token streaming and print time-to-first-token and total latency.
+    """
+    from agents.streaming import stream_agent_events
+    from agents.response import extract_final_response
+
+    start = time.perf_counter()
+    first_token_at = None
+    final_state = {}
+
+    async for kind, data in stream_agent_events(agent, initial_state, config):
+        if kind == "token":
+            if first_token_at is None:
+                first_token_at = time.perf_counter()
+                print("\nAssistant: ", end="", flush=True)
+            print(data, end="", flush=True)
+        elif kind == "route":
+            print(f"🧭 Routed to {data['route']} ({'fast path' if data['fast_path'] else 'LLM'})")
+        elif kind == "tool_start":
+            print(f"🛠️ Running {data['tool']}...")
+        elif kind == "tool_end":
+            print(f"🛠️ {data['tool']} finished ({data['status']}, {data['chars']} chars)")
+        elif kind == "done":
+            final_state = data
+
+    total = time.perf_counter() - start
+    if first_token_at is None:
+        # Nothing was streamed (e.g. an error message); print the final state instead
+        print(f"\nAssistant: {extract_final_response(final_state)}")
+        first_token_at = start + total
+    print(f"\n\n⏱️ Time to first token: {first_token_at - start:.2f}s | Total: {total:.2f}s\n")
+    return final_state
+
+def print_telemetry(recorder):
+    """
+    One-line summary of a turn's spans; also exports them when TELEMETRY_EXPORT_PATH is set.
     """
-    Robustly extract the final assistant response from a LangGraph state.
-    Priority:
-    1. state["response"] (if set by graph)
-    2. Last AIMessage found anywhere (even nested)
+    if recorder is None:
+        return
+    summary = recorder.summary()
+    llm = summary["llm"]
+    estimated = " (estimated)" if llm["estimated"] else ""
+    print(
+        f"📈 {summary['duration_ms']}ms | {llm['calls']} LLM call(s), {llm['prompt_tokens']} prompt + "
+        f"{llm['completion_tokens']} completion tokens{estimated} | {len(summary['tools'])} tool call(s) | "
+        f"{summary['cache_hits']} cache hit(s) | {summary['errors']} error(s)\n"
+    )
+    recorder.export()
+
+def profile_imports(top: int = 20):
+    """
+    Import everything the warm-up loads under `python -X importtime` and print
+    the slowest modules by self and by cumulative time.
     """
-    print("Extracting final response from state...")
-
-    # ✅ 1. Best case: graph already set response
-    if isinstance(state, dict):
-        response = state.get("response")
-        if isinstance(response, str) and response.strip():
-            return response.strip()
-
-    # ✅ 2. Walk messages (including nested dicts)
-    def walk(messages):
-        for msg in reversed(messages):
-            if isinstance(msg, AIMessage):
-                return msg.content
-            if isinstance(msg, dict) and "messages" in msg:
-                found = walk(msg["messages"])
-                if found:
-                    return found
-        return None
-
-    messages = state.get("messages", [])
-    found = walk(messages)
-
-    return found or "No response generated."            
+    statement = "import main, agents.runtime, agents.multiagent, langchain_openai"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], capture_output=True, text=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), name.rstrip(), name.strip()))
+    if not rows:
+        print(f"❌ Import profiling failed:\n{result.stderr[-2000:]}")
+        return
+
+    total = sum(row[0] for row in rows)
+    print(f"⏱️ {len(rows)} modules, {total / 1e6:.2f}s total import time\n")
+    print(f"Slowest by self time (top {top}):")
+    for self_us, cumulative_us, _, name in sorted(rows, reverse=True)[:top]:
+        print(f"  {self_us / 1000:8.1f} ms  {name}")
+    print(f"\nSlowest by cumulative time (top {top}, indented by import depth):")
+    for self_us, cumulative_us, indented, _ in sorted(rows, key=lambda row: row[1], reverse=True)[:top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms {indented}")
 
 if __name__ == "__main__":
-    asyncio.run(chat())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Presidio HR multi-agent assistant")
+    parser.add_argument("--stream", action="store_true", help="print answer tokens as they arrive")
+    parser.add_argument("--profile-imports", type=int, nargs="?", const=20, metavar="TOP", help="list the slowest imports and exit")
+    args = parser.parse_args()
+    if args.profile_imports:
+        profile_imports(args.profile_imports)
+    else:
+        asyncio.run(chat(stream=args.stream))
\ No newline at end of file
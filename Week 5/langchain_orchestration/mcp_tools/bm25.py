@@ -0,0 +1,89 @@
+import heapq
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOP_WORDS = frozenset("""
+a an and are as at be by can do does for from how i in is it its me my of on or
+our the this that to was what when where which who will with you your
+""".split())
+
+# Target passage size in characters; paragraphs are merged up to this size
+PASSAGE_CHARS = 600
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Lowercase word tokens without stop words.
+    """
+    return [token for token in _TOKEN_RE.findall(text.lower()) if token not in STOP_WORDS]
+
+
+@dataclass
+class Passage:
+    filename: str
+    start: int
+    end: int
+    text: str
+
+
+def split_passages(filename: str, text: str, max_chars: int = PASSAGE_CHARS) -> list[Passage]:
+    """
+    Split a document on blank lines and merge paragraphs into ~max_chars passages,
+    keeping character offsets into the original text.
+    """
+    paragraphs = [(m.start(), m.end()) for m in re.finditer(r"\S(?:.*?\S)?(?=\n\s*\n|\s*\Z)", text, re.S)]
+    passages = []
+    start = end = None
+    for para_start, para_end in paragraphs:
+        if start is not None and para_end - start > max_chars:
+            passages.append(Passage(filename, start, end, text[start:end]))
+            start = None
+        if start is None:
+            start = para_start
+        end = para_end
+    if start is not None:
+        passages.append(Passage(filename, start, end, text[start:end]))
+    return passages
+
+
+class BM25Index:
+    """
+    Inverted index over passages with Okapi BM25 scoring.
+    """
+
+    def __init__(self, passages: list[Passage], k1: float = 1.5, b: float = 0.75):
+        self.passages = passages
+        self.k1 = k1
+        self.b = b
+        self.postings: dict[str, list[tuple[int, int]]] = {}
+        self.lengths = []
+        for passage_id, passage in enumerate(passages):
+            counts = Counter(tokenize(passage.text))
+            self.lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                self.postings.setdefault(term, []).append((passage_id, tf))
+        self.avg_length = sum(self.lengths) / len(self.lengths) if self.lengths else 0.0
+        total = len(passages)
+        self.idf = {
+            term: math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self.postings.items()
+        }
+
+    def search(self, query: str, k: int = 3) -> list[tuple[float, Passage]]:
+        """
+        Top-k passages for the query as (score, passage), best first.
+        """
+        scores: dict[int, float] = {}
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for passage_id, tf in self.postings[term]:
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[passage_id] / self.avg_length)
+                scores[passage_id] = scores.get(passage_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        best = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [(score, self.passages[passage_id]) for passage_id, score in best]
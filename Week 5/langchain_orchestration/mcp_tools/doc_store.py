@@ -0,0 +1,191 @@
+import hashlib
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+# docs/ next to this package, independent of the current working directory
+DOCS_DIR = Path(__file__).resolve().parent.parent / "docs"
+
+
+@dataclass
+class Document:
+    domain: str
+    filename: str
+    path: Path
+    mtime_ns: int
+    size: int
+    text: str
+
+
+class DocumentStore:
+    """
+    In-memory store for the internal docs/<domain>/ files.
+
+    Purpose:
+    - Loads every file once at startup
+    - Re-reads a file only when its mtime or size changes
+    - Checks the disk at most once per refresh interval, so hot reads cost no I/O
+    - Keeps a per-domain catalog of available files for the tool schema
+    - Resolves loose filenames ("vpn", "Payroll_Schedule") to catalog entries
+    """
+
+    def __init__(self, root: Path = DOCS_DIR, refresh_interval: float | None = None):
+        if refresh_interval is None:
+            refresh_interval = float(os.getenv("DOC_STORE_REFRESH_S", "2.0"))
+        self.root = Path(root)
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._docs: dict[tuple[str, str], Document] = {}
+        self._last_scan = 0.0
+        self._last_checked: dict[tuple[str, str], float] = {}
+        self._hashes: dict[str, tuple[tuple, str]] = {}
+        self.stats = {"hits": 0, "reloads": 0, "misses": 0}
+        self.scan()
+
+    def _load(self, domain: str, path: Path, stat: os.stat_result) -> Document:
+        return Document(
+            domain=domain,
+            filename=path.name,
+            path=path,
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+            text=path.read_text(encoding="utf-8"),
+        )
+
+    def scan(self):
+        """
+        Walk docs/ and (re)load new or changed files; drop deleted ones.
+        """
+        with self._lock:
+            seen = set()
+            if self.root.is_dir():
+                for domain_dir in sorted(p for p in self.root.iterdir() if p.is_dir()):
+                    for path in sorted(p for p in domain_dir.iterdir() if p.is_file()):
+                        key = (domain_dir.name, path.name)
+                        seen.add(key)
+                        stat = path.stat()
+                        doc = self._docs.get(key)
+                        if doc is None or doc.mtime_ns != stat.st_mtime_ns or doc.size != stat.st_size:
+                            self._docs[key] = self._load(domain_dir.name, path, stat)
+                            if doc is not None:
+                                self.stats["reloads"] += 1
+            for key in set(self._docs) - seen:
+                del self._docs[key]
+            self._last_scan = time.monotonic()
+
+    def maybe_scan(self):
+        """
+        Re-scan docs/ if the last scan is older than the refresh interval.
+        """
+        if time.monotonic() - self._last_scan >= self.refresh_interval:
+            self.scan()
+
+    def _refresh(self, key: tuple[str, str]):
+        # Caller holds the lock
+        now = time.monotonic()
+        if now - self._last_checked.get(key, 0.0) < self.refresh_interval:
+            return
+        self._last_checked[key] = now
+        doc = self._docs[key]
+        try:
+            stat = doc.path.stat()
+        except FileNotFoundError:
+            del self._docs[key]
+            return
+        if doc.mtime_ns != stat.st_mtime_ns or doc.size != stat.st_size:
+            self._docs[key] = self._load(doc.domain, doc.path, stat)
+            self.stats["reloads"] += 1
+
+    def resolve(self, domain: str, filename: str) -> str | None:
+        """
+        Map a requested filename to a catalog filename for the domain.
+        Tries exact, case-insensitive, missing extension, then a unique partial match.
+        """
+        names = self.catalog().get(domain, [])
+        wanted = Path(filename).name.strip().lower()
+        if not wanted:
+            return None
+        by_lower = {name.lower(): name for name in names}
+        if wanted in by_lower:
+            return by_lower[wanted]
+        stems = {Path(name).stem.lower(): name for name in names}
+        if Path(wanted).stem in stems:
+            return stems[Path(wanted).stem]
+        stem = Path(wanted).stem.replace(" ", "_").replace("-", "_")
+        partial = [name for name in names if stem in name.lower()]
+        if len(partial) == 1:
+            return partial[0]
+        return None
+
+    def get(self, domain: str, filename: str) -> Document | None:
+        """
+        Return a document, reloading it first if it changed on disk.
+        """
+        domain = domain.strip().lower()
+        resolved = self.resolve(domain, filename)
+        if resolved is None:
+            # Maybe the file was added after startup
+            self.maybe_scan()
+            resolved = self.resolve(domain, filename)
+
+        with self._lock:
+            key = (domain, resolved)
+            if resolved is None or key not in self._docs:
+                self.stats["misses"] += 1
+                return None
+            self._refresh(key)
+            doc = self._docs.get(key)
+            if doc is None:
+                self.stats["misses"] += 1
+                return None
+            self.stats["hits"] += 1
+            return doc
+
+    def documents(self, domain: str) -> list[Document]:
+        with self._lock:
+            return [doc for (doc_domain, _), doc in sorted(self._docs.items()) if doc_domain == domain]
+
+    def content_hash(self, domain: str) -> str:
+        """
+        Hash of every file in docs/<domain>; changes whenever a file is edited, added or removed.
+        """
+        self.maybe_scan()
+        with self._lock:
+            docs = [doc for (doc_domain, _), doc in sorted(self._docs.items()) if doc_domain == domain]
+            signature = tuple((doc.filename, doc.mtime_ns, doc.size) for doc in docs)
+            cached = self._hashes.get(domain)
+            if cached is not None and cached[0] == signature:
+                return cached[1]
+            digest = hashlib.sha256()
+            for doc in docs:
+                digest.update(doc.filename.encode("utf-8") + b"\0" + doc.text.encode("utf-8") + b"\0")
+            self._hashes[domain] = (signature, digest.hexdigest()[:16])
+            return self._hashes[domain][1]
+
+    def catalog(self) -> dict[str, list[str]]:
+        """
+        Available filenames per domain.
+        """
+        with self._lock:
+            catalog: dict[str, list[str]] = {}
+            for domain, filename in sorted(self._docs):
+                catalog.setdefault(domain, []).append(filename)
+            return catalog
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_document_store() -> DocumentStore:
+    """
+    Return the process-wide DocumentStore, loading docs/ on first use.
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = DocumentStore()
+    return _store
@@ -1,6 +1,7 @@
 import json
-from pathlib import Path
+import threading
 from langchain_core.tools import tool
+from mcp_tools.doc_store import get_document_store
 
 @tool
 def read_file(payload: str) -> str:
@@ -17,8 +18,46 @@ def read_file(payload: str) -> str:
     domain = data["domain"]
     filename = data["filename"]
 
-    path = Path("docs") / domain / filename
-    if not path.exists():
-        return "File not found"
+    store = get_document_store()
+    doc = store.get(domain, filename)
+    if doc is None:
+        available = ", ".join(store.catalog().get(domain, [])) or "none"
+        return f"File not found. Available {domain} files: {available}"
 
-    return path.read_text()
+    return doc.text
+
+
+# The docstring above; the catalog is appended to a copy of it
+READ_FILE_DESCRIPTION = read_file.description
+_catalog_lock = threading.Lock()
+_described_catalog = None
+_catalog_version = 0
+
+
+def _catalog_description(catalog: dict[str, list[str]]) -> str:
+    lines = [READ_FILE_DESCRIPTION.rstrip(), "", "Available files:"]
+    for domain, filenames in catalog.items():
+        lines.append(f"- {domain}: {', '.join(filenames)}")
+    return "\n".join(lines)
+
+
+def refresh_catalog() -> int:
+    """
+    Put the current file catalog into the read_file schema so the model does
+    not guess filenames.
+
+    Nothing is loaded at import: the document store is built on the first
+    call, and later calls pick up files added or removed since. Returns a
+    version that changes whenever the description does, so callers holding
+    rendered tool schemas know when to re-render them.
+    """
+    global _described_catalog, _catalog_version
+    store = get_document_store()
+    store.maybe_scan()
+    catalog = store.catalog()
+    with _catalog_lock:
+        if catalog != _described_catalog:
+            read_file.description = _catalog_description(catalog)
+            _described_catalog = catalog
+            _catalog_version += 1
+        return _catalog_version
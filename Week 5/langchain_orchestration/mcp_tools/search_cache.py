@@ -0,0 +1,318 @@
+import asyncio
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Protocol
+
+CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache"
+
+
+class SearchProvider(Protocol):
+    """
+    Upstream web search backend.
+    """
+    name: str
+
+    def search(self, query: str) -> str:
+        ...
+
+
+class DuckDuckGoProvider:
+    """
+    DuckDuckGo via langchain_community, built once and reused.
+    """
+    name = "duckduckgo"
+
+    def __init__(self):
+        self._client = None
+        self._lock = threading.Lock()
+
+    def search(self, query: str) -> str:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    from langchain_community.tools import DuckDuckGoSearchRun
+                    self._client = DuckDuckGoSearchRun()
+        return self._client.run(query)
+
+
+class StubProvider:
+    """
+    Offline provider for tests and benchmarks: canned answers with a fixed delay.
+    """
+    name = "stub"
+
+    def __init__(self, responses: dict | None = None, delay: float = 0.0):
+        self.responses = responses or {}
+        self.delay = delay
+        self.calls = 0
+
+    def search(self, query: str) -> str:
+        self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        return self.responses.get(query, f"Stub result for: {query}")
+
+
+def normalize_query(query: str) -> str:
+    """
+    Cache key for a query: lowercase, single spaces, no surrounding punctuation.
+    """
+    query = re.sub(r"\s+", " ", query.lower()).strip()
+    return query.strip(" ?!.,;:\"'")
+
+
+class SearchCache:
+    """
+    TTL cache with request coalescing in front of a search provider.
+
+    The provider is either an async one (asearch, see
+    mcp_tools/search_client.py) or a blocking SearchProvider, which asearch
+    runs in a worker thread. There is no blocking entry point: the default
+    provider is async-only.
+
+    Purpose:
+    - Serves repeated queries from an in-memory LRU
+    - Persists entries in a local SQLite file so they survive restarts
+    - Expires every entry after its TTL
+    - Lets only one request (disk read, then upstream) run per normalized
+      query; concurrent callers wait for that result
+    - Tracks hit rate and the upstream latency saved by hits, counting
+      coalesced waiters as hits that saved the owner's latency
+
+    Only the in-memory LRU and the in-flight futures are touched on the
+    caller's thread (the event loop, for asearch). SQLite reads run in a
+    worker thread for asearch, and every write and commit runs on a single
+    background writer thread, so no caller waits for one.
+    """
+
+    def __init__(
+        self,
+        provider: SearchProvider,
+        db_path: str | Path | None = None,
+        ttl: float | None = None,
+        max_entries: int | None = None,
+    ):
+        self.provider = provider
+        self.ttl = ttl if ttl is not None else float(os.getenv("WEB_SEARCH_CACHE_TTL_S", "3600"))
+        self.max_entries = max_entries or int(os.getenv("WEB_SEARCH_CACHE_SIZE", "512"))
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[str, tuple[str, float, float]] = OrderedDict()
+        self._in_flight: dict[str, Future] = {}
+        # Callers waiting on each in-flight request besides its owner
+        self._waiters: dict[str, int] = {}
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "errors": 0,
+            "upstream_time_s": 0.0,
+            "saved_time_s": 0.0,
+        }
+
+        if db_path is None:
+            db_path = os.getenv("WEB_SEARCH_CACHE_PATH", str(CACHE_DIR / "web_search.sqlite3"))
+        if str(db_path) != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        # One connection shared by the reader threads and the writer, serialized by _db_lock
+        self._db_lock = threading.Lock()
+        self._db = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS search_cache ("
+            " provider TEXT NOT NULL, query_key TEXT NOT NULL, result TEXT NOT NULL,"
+            " expires_at REAL NOT NULL, latency REAL NOT NULL,"
+            " PRIMARY KEY (provider, query_key))"
+        )
+        self._db.commit()
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="search-cache-writer")
+
+    def _remember(self, key: str, entry: tuple[str, float, float]):
+        # Caller holds the lock
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _read_disk(self, key: str) -> tuple[str, float, float] | None:
+        with self._db_lock:
+            return self._db.execute(
+                "SELECT result, expires_at, latency FROM search_cache WHERE provider = ? AND query_key = ?",
+                (self.provider.name, key),
+            ).fetchone()
+
+    def _write_disk(self, statement: str, parameters: tuple):
+        # Runs on the writer thread
+        with self._db_lock:
+            self._db.execute(statement, parameters)
+            self._db.commit()
+
+    def _persist(self, statement: str, parameters: tuple):
+        self._writer.submit(self._write_disk, statement, parameters)
+
+    def lookup_or_claim(self, query: str) -> tuple[str, str | None, Future, bool]:
+        """
+        Return (key, cached_result, future, owner), from memory only.
+
+        On a memory hit cached_result is set. Otherwise the caller either owns
+        the request (owner=True: check the disk with resolve_disk_row, then
+        call complete()) or shares the future of a request already in flight.
+        """
+        key = normalize_query(query)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                result, expires_at, latency = entry
+                if expires_at > time.time():
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    self._stats["saved_time_s"] += latency
+                    return key, result, None, False
+                del self._memory[key]
+            future = self._in_flight.get(key)
+            if future is not None:
+                self._stats["coalesced"] += 1
+                self._waiters[key] = self._waiters.get(key, 0) + 1
+                return key, None, future, False
+            future = Future()
+            self._in_flight[key] = future
+            return key, None, future, True
+
+    def resolve_disk_row(self, key: str, future: Future, row) -> str | None:
+        """
+        Owner side of a memory miss: publish the row read from disk if it is
+        still fresh, else count a miss (the owner goes upstream).
+        """
+        if row is not None:
+            result, expires_at, latency = row
+            if expires_at > time.time():
+                with self._lock:
+                    self._remember(key, (result, expires_at, latency))
+                    self._in_flight.pop(key, None)
+                    waiters = self._waiters.pop(key, 0)
+                    self._stats["disk_hits"] += 1
+                    self._stats["saved_time_s"] += latency * (1 + waiters)
+                future.set_result(result)
+                return result
+            self._persist("DELETE FROM search_cache WHERE provider = ? AND query_key = ?", (self.provider.name, key))
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+
+    def complete(self, key: str, future: Future, result: str | None = None, error: BaseException | None = None, latency: float = 0.0):
+        """
+        Publish the owner's upstream result (or error) to every waiter.
+        """
+        with self._lock:
+            if error is None:
+                expires_at = time.time() + self.ttl
+                self._remember(key, (result, expires_at, latency))
+            self._in_flight.pop(key, None)
+            waiters = self._waiters.pop(key, 0)
+            self._stats["upstream_time_s"] += latency
+            if error is None:
+                # Every waiter got the result without its own upstream call
+                self._stats["saved_time_s"] += latency * waiters
+            else:
+                self._stats["errors"] += 1
+        if error is None:
+            self._persist(
+                "INSERT OR REPLACE INTO search_cache (provider, query_key, result, expires_at, latency)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (self.provider.name, key, result, expires_at, latency),
+            )
+            future.set_result(result)
+        else:
+            future.set_exception(error)
+
+    async def asearch(self, query: str) -> str:
+        """
+        Cached, coalesced search that never blocks the event loop.
+        """
+        key, cached, future, owner = self.lookup_or_claim(query)
+        if cached is not None:
+            return cached
+        if not owner:
+            return await asyncio.wrap_future(future)
+
+        start = time.perf_counter()
+        try:
+            cached = self.resolve_disk_row(key, future, await asyncio.to_thread(self._read_disk, key))
+            if cached is not None:
+                return cached
+            start = time.perf_counter()
+            if hasattr(self.provider, "asearch"):
+                result = await self.provider.asearch(query)
+            else:
+                result = await asyncio.to_thread(self.provider.search, query)
+        except asyncio.CancelledError:
+            # Do not leave coalesced waiters hanging on a cancelled owner
+            if not future.done():
+                self.complete(key, future, error=RuntimeError("Web search was cancelled"), latency=time.perf_counter() - start)
+            raise
+        except Exception as e:
+            if not future.done():
+                self.complete(key, future, error=e, latency=time.perf_counter() - start)
+            raise
+        self.complete(key, future, result=result, latency=time.perf_counter() - start)
+        return result
+
+    def flush(self):
+        """
+        Wait until every write queued so far is committed.
+        """
+        self._writer.submit(lambda: None).result()
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        self._writer.submit(self._write_disk, "DELETE FROM search_cache WHERE provider = ?", (self.provider.name,)).result()
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self._stats["memory_hits"] + self._stats["disk_hits"] + self._stats["coalesced"]
+            lookups = hits + self._stats["misses"]
+            return {
+                "memory_hits": self._stats["memory_hits"],
+                "disk_hits": self._stats["disk_hits"],
+                "misses": self._stats["misses"],
+                "coalesced": self._stats["coalesced"],
+                "errors": self._stats["errors"],
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "upstream_time_s": round(self._stats["upstream_time_s"], 3),
+                "saved_time_s": round(self._stats["saved_time_s"], 3),
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> SearchCache:
+    """
+    Return the process-wide web search cache in front of the async,
+    rate-limited search client (DuckDuckGo by default).
+    """
+    # Imported here because the client module builds on this one
+    from mcp_tools.search_client import build_search_client
+
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SearchCache(build_search_client())
+    return _cache
+
+
+def set_search_cache(cache: SearchCache):
+    """
+    Swap the process-wide cache, e.g. for one backed by a stub or fake provider.
+    """
+    global _cache
+    with _cache_lock:
+        _cache = cache
@@ -0,0 +1,211 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Protocol
+
+from mcp_tools.search_cache import SearchProvider, DuckDuckGoProvider
+
+
+class AsyncSearchProvider(Protocol):
+    """
+    Web search backend usable from async code without blocking the event loop.
+    """
+    name: str
+
+    async def asearch(self, query: str) -> str:
+        ...
+
+
+class ThreadedSearchProvider:
+    """
+    Runs a blocking SearchProvider on a bounded, dedicated worker pool.
+    """
+
+    def __init__(self, provider: SearchProvider, max_workers: int | None = None):
+        self.provider = provider
+        self.name = provider.name
+        self.max_workers = max_workers or int(os.getenv("WEB_SEARCH_WORKERS", "4"))
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="web-search")
+
+    async def asearch(self, query: str) -> str:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, self.provider.search, query)
+
+
+class FakeSearchProvider:
+    """
+    Local async provider for tests: configurable latency, jitter and failure rate.
+    """
+    name = "fake"
+
+    def __init__(self, latency: float = 0.05, jitter: float = 0.0, fail_rate: float = 0.0, seed: int | None = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.fail_rate = fail_rate
+        self.calls = 0
+        self._random = random.Random(seed)
+
+    async def asearch(self, query: str) -> str:
+        self.calls += 1
+        await asyncio.sleep(self.latency + self._random.uniform(0, self.jitter))
+        if self._random.random() < self.fail_rate:
+            raise ConnectionError(f"Fake search failure for: {query}")
+        return f"Fake result for: {query}"
+
+
+class TokenBucket:
+    """
+    Global rate limiter shared by every event loop and thread in the process.
+
+    Tokens are reserved under a plain lock and the caller then sleeps off any
+    deficit, so waiting never holds the lock and the bucket is not tied to a
+    particular event loop.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        # Caller holds the lock
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    async def acquire(self):
+        with self._lock:
+            self._refill()
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            await asyncio.sleep(wait)
+
+
+class AsyncSearchClient:
+    """
+    Async web search client shared by all sessions in the process.
+
+    Purpose:
+    - Never blocks the event loop (blocking providers run on a worker pool)
+    - Limits upstream requests with a global token bucket
+    - Sends a hedged duplicate request when the first one is slow
+    - Retries failed attempts up to max_attempts
+    - Enforces a hard timeout on the whole search
+    """
+
+    def __init__(
+        self,
+        provider: AsyncSearchProvider,
+        rate: float | None = None,
+        burst: float | None = None,
+        timeout: float | None = None,
+        hedge_after: float | None = None,
+        max_attempts: int | None = None,
+    ):
+        self.provider = provider
+        self.name = provider.name
+        self.bucket = TokenBucket(
+            rate if rate is not None else float(os.getenv("WEB_SEARCH_RATE", "1.0")),
+            burst if burst is not None else float(os.getenv("WEB_SEARCH_BURST", "3")),
+        )
+        self.timeout = timeout if timeout is not None else float(os.getenv("WEB_SEARCH_TIMEOUT_S", "10"))
+        self.hedge_after = hedge_after if hedge_after is not None else float(os.getenv("WEB_SEARCH_HEDGE_AFTER_S", "2.0"))
+        self.max_attempts = max_attempts or int(os.getenv("WEB_SEARCH_MAX_ATTEMPTS", "2"))
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "attempts": 0, "hedges": 0, "retries": 0, "failures": 0, "timeouts": 0}
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    async def _attempt(self, query: str) -> str:
+        self._count("attempts")
+        return await self.provider.asearch(query)
+
+    async def _search(self, query: str) -> str:
+        await self.bucket.acquire()
+        pending = {asyncio.create_task(self._attempt(query))}
+        started = 1
+        # Set once the bucket had no token for a hedge; retries after a failure still run
+        hedging = True
+        last_error = None
+        try:
+            while pending:
+                # Hedge only while the first attempt is the only one running
+                can_hedge = hedging and started < self.max_attempts and len(pending) == 1
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=self.hedge_after if can_hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    # Slow attempt: hedge if the rate limit has room right now
+                    if self.bucket.try_acquire():
+                        self._count("hedges")
+                        pending.add(asyncio.create_task(self._attempt(query)))
+                        started += 1
+                    else:
+                        hedging = False
+                    continue
+
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    last_error = task.exception()
+
+                if not pending and started < self.max_attempts:
+                    self._count("retries")
+                    await self.bucket.acquire()
+                    pending.add(asyncio.create_task(self._attempt(query)))
+                    started += 1
+        finally:
+            for task in pending:
+                task.cancel()
+
+        raise last_error
+
+    async def asearch(self, query: str) -> str:
+        """
+        Rate-limited, hedged search with a hard timeout.
+        """
+        self._count("requests")
+        try:
+            return await asyncio.wait_for(self._search(query), self.timeout)
+        except asyncio.TimeoutError:
+            self._count("timeouts")
+            raise TimeoutError(f"Web search timed out after {self.timeout}s")
+        except Exception:
+            self._count("failures")
+            raise
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
+
+
+def build_search_client() -> AsyncSearchClient:
+    """
+    Build the client for WEB_SEARCH_PROVIDER ("duckduckgo" or "fake").
+    """
+    provider_name = os.getenv("WEB_SEARCH_PROVIDER", "duckduckgo").lower()
+    if provider_name == "fake":
+        provider = FakeSearchProvider()
+    elif provider_name == "duckduckgo":
+        provider = ThreadedSearchProvider(DuckDuckGoProvider())
+    else:
+        raise ValueError(f"Unknown WEB_SEARCH_PROVIDER: {provider_name}")
+    return AsyncSearchClient(provider)
@@ -0,0 +1,75 @@
+import threading
+from langchain_core.tools import tool
+from mcp_tools.bm25 import BM25Index, split_passages
+from mcp_tools.doc_store import get_document_store
+
+
+class DocsSearchIndex:
+    """
+    Per-domain BM25 passage indexes over the document store.
+
+    Built at startup; a domain's index is rebuilt when any of its files
+    changes (tracked through the store's mtime/size signature).
+    """
+
+    def __init__(self, store=None):
+        self.store = store or get_document_store()
+        self._lock = threading.Lock()
+        self._indexes: dict[str, tuple[tuple, BM25Index]] = {}
+        for domain in self.store.catalog():
+            self.get(domain)
+
+    def _signature(self, domain: str) -> tuple:
+        return tuple((doc.filename, doc.mtime_ns, doc.size) for doc in self.store.documents(domain))
+
+    def get(self, domain: str) -> BM25Index:
+        self.store.maybe_scan()
+        signature = self._signature(domain)
+        with self._lock:
+            cached = self._indexes.get(domain)
+            if cached is None or cached[0] != signature:
+                passages = []
+                for doc in self.store.documents(domain):
+                    passages.extend(split_passages(doc.filename, doc.text))
+                cached = (signature, BM25Index(passages))
+                self._indexes[domain] = cached
+            return cached[1]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_search_index() -> DocsSearchIndex:
+    """
+    Return the process-wide DocsSearchIndex, building it on first use.
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = DocsSearchIndex()
+    return _index
+
+
+@tool
+def search_docs(domain: str, query: str, k: int = 3) -> str:
+    """
+    Search internal documentation and return only the most relevant passages.
+    Prefer this over read_file when the question is about a specific detail.
+
+    Args:
+        domain: "it" | "finance"
+        query: what to look for, in plain words
+        k: number of passages to return (default 3)
+    """
+    print(f"\n[TOOL CALLED] SearchDocs in {domain} with query: {query}")
+    k = max(1, min(int(k), 10))
+    results = get_search_index().get(domain.strip().lower()).search(query, k)
+    if not results:
+        return "No matching passages found."
+
+    return "\n\n".join(
+        f"[{passage.filename} chars {passage.start}-{passage.end} | score {score:.2f}]\n{passage.text}"
+        for score, passage in results
+    )
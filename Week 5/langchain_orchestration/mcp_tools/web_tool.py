@@ -1,13 +1,12 @@
 from langchain_core.tools import tool
-from langchain_community.tools import DuckDuckGoSearchRun
+from mcp_tools.search_cache import get_search_cache
 
 @tool
-def web_search(query: str) -> str:
+async def web_search(query: str) -> str:
     """
     Search the public web for general information.
     Input: a plain text query string.
     """
     print(f"\n[TOOL CALLED] WebSearch with query: {query}")
-    ddg_search = DuckDuckGoSearchRun()
-    result = ddg_search.run(query)
+    result = await get_search_cache().asearch(query)
     return result
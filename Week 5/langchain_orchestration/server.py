@@ -0,0 +1,429 @@
+"""
+Async HTTP serving layer for the multi-agent assistant.
+
+One compiled graph and one set of pooled LLM clients serve every request.
+Each request runs with its own input state and session id, so concurrent
+requests never share messages.
+
+    uvicorn server:app --port 8080
+    python server.py --port 8080 --max-in-flight 16 --max-queue 32
+    python server.py --stub-llm-ms 200     # offline, with fake LLMs
+
+Endpoints:
+- POST /chat          {"query", "session_id"?, "bypass_cache"?} -> answer as JSON
+- POST /chat/stream   same body -> Server-Sent Events (route, tool_start, tool_end, token, done, telemetry)
+- DELETE /sessions/{session_id}
+- GET /health, GET /stats, GET /metrics (Prometheus)
+"""
+from agents.runtime import get_runtime
+from agents.memory import session_config
+from agents.streaming import stream_agent_events
+from agents.answer_cache import get_answer_cache
+from agents.telemetry import get_metrics, instrument
+from agents.prompts import prompt_cache_stats
+from agents.model.AgentState import AgentState
+
+from contextlib import asynccontextmanager
+from collections import deque
+from fastapi import FastAPI, HTTPException, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from langchain_core.messages import HumanMessage
+from pydantic import BaseModel
+from agents.response import extract_final_response
+import argparse
+import asyncio
+import json
+import os
+import signal
+import threading
+import time
+import uuid
+import weakref
+
+
+class ChatRequest(BaseModel):
+    query: str
+    # Without a session id the request is one-shot and its state is dropped afterwards
+    session_id: str | None = None
+    # Skip the specialist answer cache for this request
+    bypass_cache: bool = False
+
+
+class AdmissionController:
+    """
+    Admission control for graph runs.
+
+    Purpose:
+    - At most max_in_flight graph runs at once
+    - At most max_queue requests waiting for a slot; beyond that requests are
+      shed with 429 instead of piling up latency
+    - Draining: new requests get 503 while in-flight ones finish; set as
+      soon as the shutdown signal arrives (see install_drain_signals)
+    """
+
+    def __init__(self, max_in_flight: int | None = None, max_queue: int | None = None):
+        self.max_in_flight = max_in_flight or int(os.getenv("SERVER_MAX_IN_FLIGHT", "16"))
+        self.max_queue = max_queue if max_queue is not None else int(os.getenv("SERVER_MAX_QUEUE", "32"))
+        self.in_flight = 0
+        self.waiting = 0
+        self.shed = 0
+        self.draining = False
+        self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    async def acquire(self) -> float:
+        """
+        Wait for a slot and return the time spent queued.
+        """
+        if self.draining:
+            raise HTTPException(status_code=503, detail="Server is shutting down", headers={"Retry-After": "5"})
+        if self._semaphore.locked() and self.waiting >= self.max_queue:
+            self.shed += 1
+            get_metrics().inc("server_requests_shed_total")
+            raise HTTPException(status_code=429, detail="Too many requests queued", headers={"Retry-After": "1"})
+
+        start = time.perf_counter()
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        self._idle.clear()
+        return time.perf_counter() - start
+
+    def release(self):
+        self.in_flight -= 1
+        self._semaphore.release()
+        if self.in_flight == 0:
+            self._idle.set()
+
+    async def drain(self, timeout: float) -> bool:
+        """
+        Stop admitting requests and wait for in-flight ones. Returns False on timeout.
+        """
+        self.draining = True
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+
+class AdmittedStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse that calls on_close however the response ends, including
+    a client that disconnects before the body starts, when the body generator
+    never runs and so never reaches its own finally.
+    """
+
+    def __init__(self, content, on_close, **kwargs):
+        super().__init__(content, **kwargs)
+        self.on_close = on_close
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.on_close()
+
+
+def install_drain_signals(admission: AdmissionController, grace: float) -> dict:
+    """
+    Chain SIGINT/SIGTERM handlers that mark the server draining the moment the
+    signal arrives, then hand the signal to the previous handler (uvicorn's,
+    which stops accepting connections) after `grace` seconds. Until then new
+    requests get 503 and /health reports draining, so load balancers move
+    traffic away first. A second signal is passed on at once.
+
+    Returns the previous handlers, to restore on shutdown.
+    """
+    # Signals can only be handled from the main thread (not e.g. under TestClient)
+    if threading.current_thread() is not threading.main_thread():
+        return {}
+    previous_handlers = {}
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        previous = signal.getsignal(sig)
+        if not callable(previous):
+            continue
+
+        def handler(signum, frame, previous=previous):
+            first = not admission.draining
+            admission.draining = True
+            if first and grace > 0:
+                print(f"⏳ Shutdown signal: refusing new requests, stopping in {grace:.0f}s")
+                timer = threading.Timer(grace, previous, (signum, frame))
+                timer.daemon = True
+                timer.start()
+            else:
+                previous(signum, frame)
+
+        previous_handlers[sig] = previous
+        signal.signal(sig, handler)
+    return previous_handlers
+
+
+class LatencyStats:
+    """
+    Rolling request latency percentiles and throughput.
+    """
+
+    def __init__(self, window: int = 2048):
+        self.latencies = deque(maxlen=window)
+        self.completed = 0
+        self.errors = 0
+        self.started_at = time.perf_counter()
+
+    def record(self, seconds: float, error: bool = False):
+        self.latencies.append(seconds)
+        self.completed += 1
+        if error:
+            self.errors += 1
+
+    def percentile(self, p: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+    def report(self) -> dict:
+        uptime = time.perf_counter() - self.started_at
+        return {
+            "completed": self.completed,
+            "errors": self.errors,
+            "throughput_rps": round(self.completed / uptime, 2) if uptime else 0.0,
+            "p50_ms": round(self.percentile(50) * 1000, 1),
+            "p95_ms": round(self.percentile(95) * 1000, 1),
+            "p99_ms": round(self.percentile(99) * 1000, 1),
+        }
+
+
+class SessionLocks:
+    """
+    One asyncio.Lock per session id so turns of the same session run in order.
+    Locks disappear once no request holds them.
+    """
+
+    def __init__(self):
+        self._locks = weakref.WeakValueDictionary()
+
+    def get(self, session_id: str) -> asyncio.Lock:
+        lock = self._locks.get(session_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[session_id] = lock
+        return lock
+
+
+def create_app(max_in_flight: int | None = None, max_queue: int | None = None, stub_llm_ms: float | None = None) -> FastAPI:
+    if stub_llm_ms is None and os.getenv("AGENT_STUB_LLM_MS"):
+        stub_llm_ms = float(os.getenv("AGENT_STUB_LLM_MS"))
+    drain_timeout = float(os.getenv("SERVER_DRAIN_TIMEOUT_S", "30"))
+    # Seconds between the shutdown signal and closing the listener, answering 503 meanwhile
+    drain_grace = float(os.getenv("SERVER_DRAIN_GRACE_S", "5"))
+
+    runtime = get_runtime()
+    admission = AdmissionController(max_in_flight, max_queue)
+    latency = LatencyStats()
+    session_locks = SessionLocks()
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        if stub_llm_ms is not None:
+            from benchmarks.fake_llm import install_fake_llms
+            install_fake_llms(runtime, stub_llm_ms / 1000)
+            print(f"🧪 Using fake LLMs with {stub_llm_ms:.0f}ms latency")
+        await runtime.warm_up()
+        app.state.agent = runtime.get_graph()
+        previous_handlers = install_drain_signals(admission, drain_grace)
+        print(f"🚀 Serving with max {admission.max_in_flight} in flight, {admission.max_queue} queued")
+        yield
+        print(f"⏳ Draining {admission.in_flight} in-flight request(s)...")
+        if not await admission.drain(drain_timeout):
+            print(f"⚠️ Drain timed out after {drain_timeout}s with {admission.in_flight} request(s) still running")
+        for sig, handler in previous_handlers.items():
+            signal.signal(sig, handler)
+        await runtime.aclose()
+
+    app = FastAPI(title="Presidio HR Assistant", lifespan=lifespan)
+    app.state.admission = admission
+
+    def start_turn(request: ChatRequest) -> tuple[AgentState, dict, bool]:
+        # Fresh input state per request; history comes from the session's checkpoint
+        one_shot = request.session_id is None
+        config = session_config(request.session_id or f"oneshot-{uuid.uuid4()}")
+        config["configurable"]["bypass_answer_cache"] = request.bypass_cache
+        initial_state: AgentState = {
+            "messages": [HumanMessage(content=request.query)],
+            "llm_calls": 0,
+            "route": "",
+            "response": ""
+        }
+        return initial_state, config, one_shot
+
+    def finish_turn(config: dict, one_shot: bool):
+        if one_shot:
+            runtime.memory.end_session(config["configurable"]["thread_id"])
+
+    @app.post("/chat")
+    async def chat(request: ChatRequest):
+        if not request.query.strip():
+            raise HTTPException(status_code=400, detail="Query cannot be empty")
+
+        start = time.perf_counter()
+        queue_wait = await admission.acquire()
+        config, one_shot = None, True
+        error = False
+        # Everything after acquire() is inside the try, so the slot is always released
+        try:
+            initial_state, config, one_shot = start_turn(request)
+            session_id = config["configurable"]["thread_id"]
+            config, recorder = instrument(config, queue_wait)
+            async with session_locks.get(session_id):
+                state = await app.state.agent.ainvoke(initial_state, config)
+            response = {
+                "session_id": None if one_shot else session_id,
+                "route": state.get("route"),
+                "llm_calls": state.get("llm_calls"),
+                "response": extract_final_response(state),
+                "queue_wait_ms": round(queue_wait * 1000, 1),
+                "latency_ms": round((time.perf_counter() - start) * 1000, 1),
+            }
+            if recorder is not None:
+                response["telemetry"] = recorder.summary()
+                recorder.export()
+            return response
+        except Exception as e:
+            error = True
+            print(f"❌ Chat request failed: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
+        finally:
+            try:
+                if config is not None:
+                    finish_turn(config, one_shot)
+            finally:
+                admission.release()
+                latency.record(time.perf_counter() - start, error)
+
+    @app.post("/chat/stream")
+    async def chat_stream(request: ChatRequest):
+        if not request.query.strip():
+            raise HTTPException(status_code=400, detail="Query cannot be empty")
+
+        start = time.perf_counter()
+        # Admitted before the response starts so overload still returns a 429 status
+        queue_wait = await admission.acquire()
+        config, one_shot = None, True
+        finished = False
+
+        def finish(error: bool):
+            # Called by the body generator, by the response once it ends, or below
+            # if setup fails; whichever comes first releases the slot
+            nonlocal finished
+            if finished:
+                return
+            finished = True
+            try:
+                if config is not None:
+                    finish_turn(config, one_shot)
+            finally:
+                admission.release()
+                latency.record(time.perf_counter() - start, error)
+
+        try:
+            initial_state, config, one_shot = start_turn(request)
+            session_id = config["configurable"]["thread_id"]
+            config, recorder = instrument(config, queue_wait)
+        except Exception:
+            finish(error=True)
+            raise
+
+        async def events():
+            error = False
+            try:
+                async with session_locks.get(session_id):
+                    async for kind, data in stream_agent_events(app.state.agent, initial_state, config):
+                        if kind == "token":
+                            data = {"text": data}
+                        elif kind == "done":
+                            data = {
+                                "session_id": None if one_shot else session_id,
+                                "route": data.get("route"),
+                                "llm_calls": data.get("llm_calls"),
+                                "response": extract_final_response(data),
+                                "latency_ms": round((time.perf_counter() - start) * 1000, 1),
+                            }
+                        yield f"event: {kind}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+                if recorder is not None:
+                    yield f"event: telemetry\ndata: {json.dumps(recorder.summary())}\n\n"
+                    recorder.export()
+            except Exception as e:
+                error = True
+                print(f"❌ Stream request failed: {e}")
+                yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+            finally:
+                finish(error)
+
+        # A client gone before the body starts never runs events(): the response releases the slot
+        return AdmittedStreamingResponse(events(), on_close=lambda: finish(error=True), media_type="text/event-stream")
+
+    @app.delete("/sessions/{session_id}")
+    async def end_session(session_id: str):
+        runtime.memory.end_session(session_id)
+        return {"session_id": session_id, "ended": True}
+
+    @app.get("/metrics")
+    async def metrics():
+        # Prometheus text format; gauges are rendered from the live admission state
+        gauges = (
+            f"# TYPE server_in_flight gauge\nserver_in_flight {admission.in_flight}\n"
+            f"# TYPE server_queued gauge\nserver_queued {admission.waiting}\n"
+        )
+        return PlainTextResponse(get_metrics().render() + gauges, media_type="text/plain; version=0.0.4")
+
+    @app.get("/health")
+    async def health(response: Response):
+        if admission.draining:
+            # Non-2xx so load balancers stop sending traffic during the drain grace period
+            response.status_code = 503
+            return {"status": "draining"}
+        return {"status": "healthy"}
+
+    @app.get("/stats")
+    async def stats():
+        return {
+            "in_flight": admission.in_flight,
+            "queued": admission.waiting,
+            "shed": admission.shed,
+            "max_in_flight": admission.max_in_flight,
+            "max_queue": admission.max_queue,
+            "sessions": runtime.memory.session_count(),
+            **latency.report(),
+            "answer_cache": get_answer_cache().stats(),
+            "prompt_cache": prompt_cache_stats.report(),
+        }
+
+    return app
+
+
+app = create_app()
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-in-flight", type=int, default=None)
+    parser.add_argument("--max-queue", type=int, default=None)
+    parser.add_argument("--stub-llm-ms", type=float, default=None, help="serve with fake LLMs of this latency")
+    args = parser.parse_args()
+
+    uvicorn.run(
+        create_app(args.max_in_flight, args.max_queue, args.stub_llm_ms),
+        host=args.host,
+        port=args.port,
+        timeout_graceful_shutdown=int(float(os.getenv("SERVER_DRAIN_TIMEOUT_S", "30"))),
+    )
@@ -0,0 +1,64 @@
+import asyncio
+import time
+
+import pytest
+
+from agents import answer_cache
+from agents.answer_cache import AnswerCache
+from mcp_tools.doc_store import DocumentStore
+
+
+class FakeEmbedder:
+    """Every question embeds to the same direction, so any cached answer is similar"""
+
+    async def aembed_query(self, text):
+        return [1.0, 0.0]
+
+
+@pytest.fixture
+def docs(tmp_path, monkeypatch):
+    (tmp_path / "it").mkdir()
+    (tmp_path / "it" / "vpn_setup.txt").write_text("Open the VPN client.", encoding="utf-8")
+    store = DocumentStore(tmp_path, refresh_interval=0)
+    monkeypatch.setattr(answer_cache, "get_document_store", lambda: store)
+    return tmp_path
+
+
+def remember(cache, question, answer):
+    _, key, embedding = asyncio.run(cache.lookup("it", question))
+    cache.store(key, answer, embedding)
+
+
+def test_exact_hit_until_the_ttl_expires(docs):
+    cache = AnswerCache(ttl=0.05, enabled=True)
+    remember(cache, "How do I set up the VPN?", "Open the client.")
+    assert asyncio.run(cache.lookup("it", "how do I set up the VPN"))[0] == "Open the client."
+    time.sleep(0.1)
+    assert asyncio.run(cache.lookup("it", "How do I set up the VPN?"))[0] is None
+    stats = cache.stats()
+    assert stats["exact_hits"] == 1 and stats["expired"] == 1 and stats["entries"] == 0
+
+
+def test_expired_similar_entry_is_evicted(docs):
+    cache = AnswerCache(ttl=0.05, similarity=0.9, embedder=FakeEmbedder(), enabled=True)
+    remember(cache, "How do I set up the VPN?", "Open the client.")
+    assert asyncio.run(cache.lookup("it", "VPN setup steps"))[0] == "Open the client."
+    time.sleep(0.1)
+    assert asyncio.run(cache.lookup("it", "VPN setup steps"))[0] is None
+    stats = cache.stats()
+    assert stats["similar_hits"] == 1 and stats["expired"] == 1 and stats["entries"] == 0
+
+
+def test_editing_a_doc_invalidates_its_answers(docs):
+    cache = AnswerCache(enabled=True)
+    remember(cache, "How do I set up the VPN?", "Open the client.")
+    (docs / "it" / "vpn_setup.txt").write_text("Open the new VPN client.", encoding="utf-8")
+    assert asyncio.run(cache.lookup("it", "How do I set up the VPN?"))[0] is None
+
+
+def test_empty_answers_are_not_cached(docs):
+    cache = AnswerCache(enabled=True)
+    remember(cache, "How do I set up the VPN?", "   ")
+    assert asyncio.run(cache.lookup("it", "How do I set up the VPN?"))[0] is None
+    stats = cache.stats()
+    assert stats["stores"] == 0 and stats["rejected"] == 1
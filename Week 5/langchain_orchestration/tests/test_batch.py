@@ -0,0 +1,73 @@
+import asyncio
+import json
+
+import pytest
+from langchain_core.runnables import RunnableLambda
+
+import batch
+from agents.memory import session_config
+from agents.runtime import get_runtime
+from batch import run_query
+from benchmarks.fake_llm import install_fake_llms
+
+READ_VPN = {"name": "read_file", "args": {"payload": json.dumps({"domain": "it", "filename": "vpn_setup.txt"})}}
+
+
+@pytest.mark.parametrize("telemetry", ["1", "0"])
+def test_results_keep_timings_and_tool_calls(monkeypatch, telemetry):
+    monkeypatch.setenv("TELEMETRY", telemetry)
+    # Sampling must not drop batch output either
+    monkeypatch.setenv("TELEMETRY_SAMPLE_RATE", "0")
+    monkeypatch.setenv("ANSWER_CACHE", "0")
+
+    async def main():
+        runtime = get_runtime()
+        install_fake_llms(runtime, latency_s=0, tool_calls={"it": [[READ_VPN]]}, route="IT")
+        agent = runtime.get_graph()
+        return await run_query(agent, runtime, {"id": f"t{telemetry}", "query": "How do I set up VPN?"})
+
+    result = asyncio.run(main())
+    assert result["error"] is None
+    assert [call["tool"] for call in result["tool_calls"]] == ["read_file"]
+    assert "total" in result["timings"] and len(result["timings"]) > 1
+    assert ("telemetry" in result) == (telemetry == "1")
+
+
+def test_agent_failure_is_reported_as_an_error(monkeypatch):
+    monkeypatch.setenv("ANSWER_CACHE", "0")
+
+    async def failing_llm(messages):
+        raise ConnectionError("Azure OpenAI unavailable")
+
+    async def main():
+        runtime = get_runtime()
+        install_fake_llms(runtime, latency_s=0, route="IT")
+        runtime.set_llm("it", RunnableLambda(failing_llm))
+        try:
+            return await run_query(runtime.get_graph(), runtime, {"id": "down", "query": "How do I set up VPN?"})
+        finally:
+            install_fake_llms(runtime, latency_s=0)
+
+    result = asyncio.run(main())
+    assert result["error"] == "IT Agent error: Azure OpenAI unavailable"
+
+
+def test_duplicate_ids_get_separate_sessions(monkeypatch):
+    sessions = []
+
+    def recording_session_config(session_id):
+        sessions.append(session_id)
+        return session_config(session_id)
+
+    monkeypatch.setattr(batch, "session_config", recording_session_config)
+
+    async def main():
+        runtime = get_runtime()
+        install_fake_llms(runtime, latency_s=0.01, route="IT")
+        agent = runtime.get_graph()
+        return await asyncio.gather(*(run_query(agent, runtime, {"id": 7, "query": query})
+                                      for query in ("How do I set up VPN?", "I forgot my password")))
+
+    results = asyncio.run(main())
+    assert [result["error"] for result in results] == [None, None]
+    assert len(set(sessions)) == 2 and all(session.startswith("batch-7-") for session in sessions)
@@ -0,0 +1,37 @@
+from mcp_tools.bm25 import BM25Index, split_passages
+
+DOC = """Travel expenses are reimbursed within two weeks.
+
+Submit every expense report with the receipts attached.
+
+Meal expenses during travel are covered up to the daily limit.
+
+Parking at the office is free for all employees."""
+
+
+def test_passages_keep_offsets_into_the_document():
+    passages = split_passages("travel.txt", DOC, max_chars=60)
+    assert len(passages) == 4
+    assert all(DOC[p.start:p.end] == p.text for p in passages)
+    assert split_passages("travel.txt", DOC)[0].text == DOC
+
+
+def test_passage_matching_more_query_terms_ranks_first():
+    index = BM25Index(split_passages("travel.txt", DOC, max_chars=60))
+    results = index.search("How are travel expenses reimbursed?", k=2)
+    assert [p.text for _, p in results][0].startswith("Travel expenses are reimbursed")
+    assert results[0][0] > results[1][0]
+
+
+def test_rare_term_outweighs_a_common_one():
+    index = BM25Index(split_passages("travel.txt", DOC, max_chars=60))
+    # "expense" is in two passages, "parking" in one
+    assert index.search("expense parking", k=1)[0][1].text.startswith("Parking")
+
+
+def test_unknown_or_stop_word_queries_find_nothing():
+    index = BM25Index(split_passages("travel.txt", DOC, max_chars=60))
+    assert index.search("what is the") == []
+    assert index.search("vacation") == []
+    assert BM25Index([]).search("travel") == []
+    assert len(index.search("expenses", k=1)) == 1
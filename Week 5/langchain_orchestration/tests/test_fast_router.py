@@ -0,0 +1,46 @@
+import pytest
+
+from agents.fast_router import FastRouter
+
+
+@pytest.fixture(scope="module")
+def router():
+    return FastRouter(threshold=0.75, min_margin=1.5)
+
+
+@pytest.mark.parametrize("query, route", [
+    ("My VPN is not connecting", "IT"),
+    ("I need a new laptop", "IT"),
+    ("I forgot my password", "IT"),
+    ("When is payday?", "Finance"),
+    ("How do I get reimbursed for travel expenses?", "Finance"),
+    ("Who approves my expense report?", "Finance"),
+])
+def test_clear_queries_take_the_fast_path(router, query, route):
+    decision = router.classify(query)
+    assert decision.route == route
+    assert router.is_confident(decision)
+
+
+@pytest.mark.parametrize("query", [
+    "What is the weather today?",
+    "How do I submit a request?",
+    "How many days of paid leave",
+    "Tell me a joke",
+    "hello",
+    "",
+])
+def test_out_of_domain_queries_fall_back_to_the_llm(router, query):
+    decision = router.classify(query)
+    assert not router.is_confident(decision)
+    assert 0.0 <= decision.confidence < 0.5
+
+
+def test_mixed_signals_fall_back_to_the_llm(router):
+    # One strong keyword for each route: no lead, whatever the share says
+    assert not router.is_confident(router.classify("laptop reimbursement"))
+
+
+def test_zero_min_margin_keeps_the_plain_share():
+    router = FastRouter(threshold=0.75, min_margin=0)
+    assert router.classify("What is the weather today?").confidence > 0.75
@@ -0,0 +1,54 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from agents import prompts
+from mcp_tools import file_tool
+from mcp_tools.doc_store import DocumentStore
+from mcp_tools.file_tool import read_file, refresh_catalog
+
+PROJECT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def docs(tmp_path, monkeypatch):
+    (tmp_path / "it").mkdir()
+    (tmp_path / "it" / "vpn_setup.txt").write_text("Open the VPN client.", encoding="utf-8")
+    store = DocumentStore(tmp_path, refresh_interval=0)
+    monkeypatch.setattr(file_tool, "get_document_store", lambda: store)
+    yield tmp_path
+    monkeypatch.undo()
+    # Put the real catalog back for the other tests
+    prompts.refresh_prefixes()
+
+
+def test_import_does_not_load_the_document_store():
+    code = "import mcp_tools.file_tool, mcp_tools.doc_store as d; print(d._store is None)"
+    result = subprocess.run([sys.executable, "-c", code], cwd=PROJECT, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "True"
+
+
+def test_catalog_follows_added_and_removed_files(docs):
+    version = refresh_catalog()
+    assert "- it: vpn_setup.txt" in read_file.description
+    assert refresh_catalog() == version
+
+    (docs / "it" / "laptop_request.txt").write_text("File a ticket.", encoding="utf-8")
+    added = refresh_catalog()
+    assert added != version
+    assert "- it: laptop_request.txt, vpn_setup.txt" in read_file.description
+
+    (docs / "it" / "vpn_setup.txt").unlink()
+    assert refresh_catalog() != added
+    assert "vpn_setup.txt" not in read_file.description
+
+
+def test_specialist_prefix_is_rerendered_with_the_catalog(docs):
+    prompts.refresh_prefixes()
+    before = prompts.PREFIXES["it"].fingerprint
+    (docs / "it" / "laptop_request.txt").write_text("File a ticket.", encoding="utf-8")
+    prompts.refresh_prefixes()
+    assert prompts.PREFIXES["it"].fingerprint != before
+    assert prompts.PREFIXES["it"].tokens > 0
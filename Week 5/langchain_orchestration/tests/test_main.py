@@ -0,0 +1,38 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT = Path(__file__).resolve().parent.parent
+
+# Enough for AzureChatOpenAI to be constructed; nothing is sent
+AZURE_ENV = {
+    "AZURE_OPENAI_API_KEY": "test",
+    "AZURE_OPENAI_ENDPOINT": "https://example.invalid",
+    "AZURE_OPENAI_API_VERSION": "2024-06-01",
+    "AZURE_OPENAI_DEPLOYMENT_NAME": "test",
+}
+
+
+def run(code: str) -> str:
+    env = {**os.environ, **AZURE_ENV}
+    result = subprocess.run([sys.executable, "-c", code], cwd=PROJECT, env=env, capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    return result.stdout.strip()
+
+
+def test_importing_main_loads_only_the_standard_library():
+    code = "import main, sys; print(sorted(m for m in sys.modules if m.split('.')[0] in ('agents', 'mcp_tools', 'langchain_core', 'langgraph', 'openai')))"
+    assert run(code) == "[]"
+
+
+def test_warm_up_builds_the_runtime_in_the_background():
+    code = (
+        "import main\n"
+        "future = main.start_warm_up()\n"
+        "runtime = future.result(timeout=60)\n"
+        "from agents.runtime import get_runtime\n"
+        "assert runtime is get_runtime()\n"
+        "print(runtime.stats.graph_build_s > 0, sorted(runtime.stats.client_build_s))"
+    )
+    assert run(code) == "True ['finance', 'it', 'router', 'summarizer']"
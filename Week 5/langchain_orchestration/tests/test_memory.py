@@ -0,0 +1,44 @@
+import asyncio
+
+from langchain_core.messages import AIMessage, HumanMessage, RemoveMessage
+
+from agents.memory import SessionMemory, session_config
+from agents.tokens import count_message_tokens
+
+
+def conversation(turns: int) -> list:
+    messages = []
+    for turn in range(turns):
+        messages.append(HumanMessage(content=f"Question {turn}: " + "how do I set up the VPN client " * 10, id=f"h{turn}"))
+        messages.append(AIMessage(content=f"Answer {turn}: " + "open the client and sign in " * 10, id=f"a{turn}"))
+    messages.append(HumanMessage(content="And on macOS?", id="latest"))
+    return messages
+
+
+def test_history_within_budget_is_kept():
+    messages = conversation(2)
+    assert SessionMemory(token_budget=count_message_tokens(messages)).trim(messages) == []
+
+
+def test_oldest_turns_go_first_and_history_starts_at_a_question():
+    messages = conversation(4)
+    budget = count_message_tokens(messages[3:])
+    evicted = SessionMemory(token_budget=budget).trim(messages)
+    # Dropping three messages fits the budget but would leave an answer first, so it goes too
+    assert [msg.id for msg in evicted] == ["h0", "a0", "h1", "a1"]
+    assert count_message_tokens(messages[len(evicted):]) <= budget
+
+
+def test_latest_question_is_kept_even_over_budget():
+    messages = conversation(3)
+    evicted = SessionMemory(token_budget=1).trim(messages)
+    assert messages[len(evicted):] == [messages[-1]]
+
+
+def test_memory_node_removes_the_trimmed_messages():
+    memory = SessionMemory(token_budget=1, summarize=False)
+    messages = conversation(2)
+    updates = asyncio.run(memory.memory_node({"messages": messages}, session_config("s1")))
+    assert all(isinstance(msg, RemoveMessage) for msg in updates["messages"])
+    assert [msg.id for msg in updates["messages"]] == ["h0", "a0", "h1", "a1"]
+    assert memory.stats["trimmed_messages"] == 4
@@ -0,0 +1,39 @@
+from langchain_core.messages import AIMessage, HumanMessage
+
+from agents.prompts import PREFIXES, PROVIDER_MIN_CACHED_TOKENS, assemble
+from benchmarks.fake_llm import FakeChatModel
+
+
+def cached(llm, messages) -> int:
+    return llm.invoke(messages).usage_metadata["input_token_details"]["cache_read"]
+
+
+def test_static_prefixes_are_below_the_provider_minimum():
+    # Documented in agents/prompts.py: none of them is cacheable on its own
+    assert all(prefix.tokens < PROVIDER_MIN_CACHED_TOKENS for prefix in PREFIXES.values())
+
+
+def test_repeated_short_prefix_is_not_cached():
+    llm = FakeChatModel(latency_s=0)
+    assert cached(llm, assemble("it", HumanMessage(content="How do I set up VPN?"))) == 0
+    assert cached(llm, assemble("it", HumanMessage(content="How do I request a laptop?"))) == 0
+
+
+def test_repeated_long_head_is_cached_from_the_minimum():
+    llm = FakeChatModel(latency_s=0)
+    history = [HumanMessage(content="vpn setup steps " * 200), AIMessage(content="Open the client and sign in.")]
+    first = assemble("it", *history, HumanMessage(content="Which port does it use?"))
+    assert cached(llm, first) == 0
+    follow_up = llm.invoke(assemble("it", *history, HumanMessage(content="And on macOS?"))).usage_metadata
+    usage = follow_up["input_token_details"]["cache_read"]
+    assert PROVIDER_MIN_CACHED_TOKENS <= usage < follow_up["input_tokens"]
+    assert (usage - PROVIDER_MIN_CACHED_TOKENS) % 128 == 0
+
+
+def test_prefix_cache_is_per_model_instance():
+    history = [HumanMessage(content="vpn setup steps " * 200), AIMessage(content="Open the client and sign in.")]
+    warm = FakeChatModel(latency_s=0)
+    cached(warm, assemble("it", *history, HumanMessage(content="Which port does it use?")))
+    follow_up = assemble("it", *history, HumanMessage(content="And on macOS?"))
+    assert cached(FakeChatModel(latency_s=0), follow_up) == 0
+    assert cached(warm, follow_up) >= PROVIDER_MIN_CACHED_TOKENS
@@ -0,0 +1,15 @@
+from langchain_core.messages import AIMessage, HumanMessage
+
+from agents.response import extract_final_response
+
+
+def test_prefers_the_response_field_and_prints_nothing(capsys):
+    state = {"response": "  From the graph  ", "messages": [AIMessage(content="older")]}
+    assert extract_final_response(state) == "From the graph"
+    assert capsys.readouterr().out == ""
+
+
+def test_falls_back_to_the_last_ai_message():
+    state = {"response": "", "messages": [HumanMessage(content="hi"), AIMessage(content="first"), AIMessage(content="last")]}
+    assert extract_final_response(state) == "last"
+    assert extract_final_response({"messages": []}) == "No response generated."
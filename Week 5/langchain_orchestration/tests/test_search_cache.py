@@ -0,0 +1,65 @@
+import asyncio
+import time
+
+from mcp_tools.search_cache import SearchCache, StubProvider
+from mcp_tools.search_client import FakeSearchProvider
+
+
+def make_cache(tmp_path, provider=None, **kwargs):
+    return SearchCache(provider or StubProvider(), db_path=tmp_path / "cache.sqlite3", **kwargs)
+
+
+def test_repeated_query_is_served_from_memory(tmp_path):
+    cache = make_cache(tmp_path)
+    first = asyncio.run(cache.asearch("What is a VPN?"))
+    # Normalized: case, spacing and trailing punctuation do not matter
+    assert asyncio.run(cache.asearch("  what is a vpn ")) == first
+    assert cache.provider.calls == 1
+    assert cache.stats()["memory_hits"] == 1
+
+
+def test_entries_expire_after_the_ttl(tmp_path):
+    cache = make_cache(tmp_path, ttl=0.05)
+    asyncio.run(cache.asearch("vpn"))
+    time.sleep(0.1)
+    asyncio.run(cache.asearch("vpn"))
+    assert cache.provider.calls == 2
+    assert cache.stats()["misses"] == 2
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    cache = make_cache(tmp_path, max_entries=2)
+
+    async def run():
+        for query in ("a", "b", "a", "c"):
+            await cache.asearch(query)
+    asyncio.run(run())
+    assert list(cache._memory) == ["a", "c"]
+
+
+def test_entries_persist_across_instances(tmp_path):
+    first = make_cache(tmp_path)
+    result = asyncio.run(first.asearch("payroll dates"))
+    first.flush()
+
+    second = make_cache(tmp_path)
+    assert asyncio.run(second.asearch("payroll dates")) == result
+    assert second.provider.calls == 0
+    assert second.stats()["disk_hits"] == 1
+
+
+def test_concurrent_identical_queries_make_one_upstream_call(tmp_path):
+    provider = FakeSearchProvider(latency=0.05)
+    cache = make_cache(tmp_path, provider=provider)
+
+    async def run():
+        return await asyncio.gather(*(cache.asearch("laptop policy") for _ in range(5)))
+
+    results = asyncio.run(run())
+    assert len(set(results)) == 1
+    assert provider.calls == 1
+    stats = cache.stats()
+    assert stats["coalesced"] == 4 and stats["misses"] == 1
+    # Waiters count as hits, each saving the owner's upstream latency
+    assert stats["hit_rate"] == 0.8
+    assert stats["saved_time_s"] >= 4 * 0.05
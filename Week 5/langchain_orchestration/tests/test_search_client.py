@@ -0,0 +1,88 @@
+import asyncio
+import time
+
+import pytest
+
+from mcp_tools.search_client import AsyncSearchClient, TokenBucket
+
+
+class ScriptedProvider:
+    """Fake transport: each attempt takes the next (delay, error) from the script"""
+    name = "scripted"
+
+    def __init__(self, *script):
+        self.script = list(script)
+        self.calls = 0
+
+    async def asearch(self, query):
+        delay, error = self.script[min(self.calls, len(self.script) - 1)]
+        attempt = self.calls = self.calls + 1
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return f"result {attempt} for {query}"
+
+
+def client(provider, **kwargs):
+    options = {"rate": 100.0, "burst": 10, "timeout": 2.0, "hedge_after": 0.05, "max_attempts": 2}
+    options.update(kwargs)
+    return AsyncSearchClient(provider, **options)
+
+
+def test_token_bucket_spends_the_burst_then_refills():
+    bucket = TokenBucket(rate=20.0, capacity=2)
+    assert bucket.try_acquire() and bucket.try_acquire()
+    assert not bucket.try_acquire()
+    time.sleep(0.06)
+    assert bucket.try_acquire()
+
+
+def test_token_bucket_acquire_waits_off_the_deficit():
+    bucket = TokenBucket(rate=20.0, capacity=1)
+
+    async def run():
+        start = time.perf_counter()
+        await bucket.acquire()
+        await bucket.acquire()
+        return time.perf_counter() - start
+
+    assert asyncio.run(run()) >= 0.04
+
+
+def test_slow_attempt_is_hedged_and_the_faster_one_wins():
+    provider = ScriptedProvider((0.5, None), (0.01, None))
+    search = client(provider)
+    assert asyncio.run(search.asearch("vpn")) == "result 2 for vpn"
+    assert search.stats()["hedges"] == 1
+
+
+def test_failed_attempt_is_retried():
+    provider = ScriptedProvider((0.0, ConnectionError("reset")), (0.0, None))
+    search = client(provider)
+    assert asyncio.run(search.asearch("vpn")) == "result 2 for vpn"
+    assert search.stats()["retries"] == 1
+
+
+def test_no_token_for_a_hedge_still_allows_a_retry():
+    # Slow first attempt that then fails; the bucket is empty when the hedge is due
+    provider = ScriptedProvider((0.15, ConnectionError("reset")), (0.0, None))
+    search = client(provider, rate=10.0, burst=1)
+    assert asyncio.run(search.asearch("vpn")) == "result 2 for vpn"
+    stats = search.stats()
+    assert stats["hedges"] == 0 and stats["retries"] == 1
+
+
+def test_attempts_stop_at_max_attempts():
+    provider = ScriptedProvider((0.0, ConnectionError("reset")))
+    search = client(provider, max_attempts=3)
+    with pytest.raises(ConnectionError):
+        asyncio.run(search.asearch("vpn"))
+    assert provider.calls == 3
+    assert search.stats()["failures"] == 1
+
+
+def test_whole_search_times_out():
+    search = client(ScriptedProvider((1.0, None)), timeout=0.1, max_attempts=1)
+    with pytest.raises(TimeoutError):
+        asyncio.run(search.asearch("vpn"))
+    assert search.stats()["timeouts"] == 1
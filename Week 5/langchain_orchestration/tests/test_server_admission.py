@@ -0,0 +1,90 @@
+import asyncio
+import json
+import os
+import signal
+
+import httpx
+import pytest
+
+import server
+from server import AdmissionController, create_app, install_drain_signals
+
+QUERY = {"query": "How do I reset my VPN password?"}
+
+
+def run_app(check):
+    """Run check(app, client) inside the app's lifespan, with fake LLMs"""
+    async def main():
+        app = create_app(stub_llm_ms=1)
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                await check(app, client)
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize("path", ["/chat", "/chat/stream"])
+def test_setup_failure_releases_the_slot(monkeypatch, path):
+    def failing_instrument(*args, **kwargs):
+        raise RuntimeError("telemetry unavailable")
+
+    async def check(app, client):
+        monkeypatch.setattr(server, "instrument", failing_instrument)
+        try:
+            await client.post(path, json=QUERY)
+        except RuntimeError:
+            pass
+        assert app.state.admission.in_flight == 0
+
+    run_app(check)
+
+
+def test_disconnect_before_the_body_releases_the_slot():
+    async def check(app, client):
+        scope = {
+            "type": "http", "asgi": {"version": "3.0", "spec_version": "2.4"}, "http_version": "1.1",
+            "method": "POST", "scheme": "http", "path": "/chat/stream", "raw_path": b"/chat/stream",
+            "query_string": b"", "root_path": "", "headers": [(b"content-type", b"application/json")],
+            "client": ("test", 1), "server": ("test", 80), "app": app, "state": {},
+        }
+        received = False
+
+        async def receive():
+            nonlocal received
+            if not received:
+                received = True
+                return {"type": "http.request", "body": json.dumps(QUERY).encode(), "more_body": False}
+            await asyncio.sleep(10)
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            # The client is gone before the response starts
+            raise OSError("connection reset")
+
+        with pytest.raises(Exception):
+            await app(scope, receive, send)
+        assert app.state.admission.in_flight == 0
+
+    run_app(check)
+
+
+def test_shutdown_signal_drains_before_stopping():
+    async def main():
+        admission = AdmissionController(max_in_flight=1, max_queue=0)
+        forwarded = []
+        original = signal.signal(signal.SIGTERM, lambda signum, frame: forwarded.append(signum))
+        previous = install_drain_signals(admission, grace=0.2)
+        try:
+            os.kill(os.getpid(), signal.SIGTERM)
+            await asyncio.sleep(0.05)
+            assert admission.draining and not forwarded
+            with pytest.raises(server.HTTPException) as refused:
+                await admission.acquire()
+            assert refused.value.status_code == 503
+            await asyncio.sleep(0.3)
+            assert forwarded == [signal.SIGTERM]
+        finally:
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+            signal.signal(signal.SIGTERM, original)
+    asyncio.run(main())
@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from agents import speculative
+from agents.model.RouteDecision import RouteDecision
+from agents.prompts import PREFIXES
+from agents.speculative import SpeculationPolicy, SpeculationStats, make_speculative_agent
+
+
+class FixedRouter:
+    """Fast router stand-in that always guesses `route` with `confidence`"""
+
+    def __init__(self, route, confidence):
+        self.decision = RouteDecision(route=route, confidence=confidence)
+
+    def classify(self, query):
+        return self.decision
+
+    def is_confident(self, decision):
+        return decision.confidence >= 0.75
+
+
+@pytest.fixture
+def graph_parts(monkeypatch):
+    """Fake supervisor and specialists that record what started, finished and was cancelled"""
+    events = {"started": [], "finished": [], "cancelled": [], "guesses": []}
+    picked = {"route": "IT"}
+
+    async def route_query(state, local_decision=None):
+        events["guesses"].append(local_decision)
+        await asyncio.sleep(0.02)
+        return {"route": picked["route"], "llm_calls": state["llm_calls"] + 1}
+
+    def specialist(route):
+        async def agent(state, config):
+            events["started"].append(route)
+            try:
+                await asyncio.sleep(0.05)
+            except asyncio.CancelledError:
+                events["cancelled"].append(route)
+                raise
+            events["finished"].append(route)
+            return {"messages": [AIMessage(content=route)], "response": route, "llm_calls": state["llm_calls"] + 1}
+        return agent
+
+    monkeypatch.setattr(speculative, "route_query", route_query)
+    monkeypatch.setattr(speculative, "SPECIALISTS", {"IT": specialist("IT"), "Finance": specialist("Finance")})
+    monkeypatch.setattr(speculative, "speculation_stats", SpeculationStats())
+    return events, picked
+
+
+def run(policy, guess, monkeypatch):
+    monkeypatch.setattr(speculative, "get_fast_router", lambda: FixedRouter(*guess))
+    node = make_speculative_agent(policy)
+    state = {"messages": [HumanMessage(content="My laptop expense")], "llm_calls": 0, "route": "", "response": ""}
+    return asyncio.run(node(state, {}))
+
+
+def test_both_commits_the_routed_branch_and_cancels_the_other(graph_parts, monkeypatch):
+    events, picked = graph_parts
+    picked["route"] = "Finance"
+    result = run(SpeculationPolicy(mode="both", max_speculative_tokens=100_000), ("IT", 0.6), monkeypatch)
+    assert result["route"] == "Finance" and result["response"] == "Finance"
+    assert events["cancelled"] == ["IT"] and events["finished"] == ["Finance"]
+    assert result["llm_calls"] == 2
+    assert speculative.speculation_stats.report()["hits"] == 1
+
+
+def test_likely_miss_runs_the_routed_branch_after(graph_parts, monkeypatch):
+    events, picked = graph_parts
+    picked["route"] = "Finance"
+    result = run(SpeculationPolicy(mode="likely", max_speculative_tokens=100_000), ("IT", 0.6), monkeypatch)
+    assert result["response"] == "Finance"
+    assert events["started"] == ["IT", "Finance"] and events["cancelled"] == ["IT"]
+    assert speculative.speculation_stats.report()["misses"] == 1
+
+
+def test_confident_guess_is_passed_on_and_nothing_speculated(graph_parts, monkeypatch):
+    events, picked = graph_parts
+    result = run(SpeculationPolicy(mode="both", max_speculative_tokens=100_000), ("IT", 0.95), monkeypatch)
+    assert result["response"] == "IT"
+    assert events["started"] == ["IT"] and not events["cancelled"]
+    # The supervisor got the node's own classification instead of classifying again
+    assert events["guesses"][0].confidence == 0.95
+    assert speculative.speculation_stats.report()["skipped"] == 1
+
+
+def test_budget_uses_real_prefixes_and_tool_rounds():
+    policy = SpeculationPolicy(mode="both", expected_tool_rounds=2)
+    cost = policy.branch_tokens("IT", conversation_tokens=20)
+    assert cost == 3 * (PREFIXES["it"].tokens + 20 + speculative.SPECIALIST_COMPLETION_TOKENS)
+    # Room for exactly one branch
+    policy.max_speculative_tokens = cost + 1
+    assert policy.branches_for("IT", 20) == ["IT"]
+    policy.max_speculative_tokens = cost - 1
+    assert policy.branches_for("IT", 20) == []
@@ -0,0 +1,36 @@
+import asyncio
+import json
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from agents.memory import SessionMemory, session_config
+from agents.multiagent import create_agent_graph
+from agents.runtime import get_runtime
+from agents.speculative import SpeculationPolicy
+from agents.streaming import stream_agent_events
+from benchmarks.fake_llm import install_fake_llms
+
+READ_VPN = {"name": "read_file", "args": {"payload": json.dumps({"domain": "it", "filename": "vpn_setup.txt"})}}
+
+
+@pytest.mark.parametrize("mode", ["off", "both"])
+def test_events_arrive_in_order_with_only_the_routed_tokens(monkeypatch, mode):
+    monkeypatch.setenv("ANSWER_CACHE", "0")
+
+    async def main():
+        runtime = get_runtime()
+        install_fake_llms(runtime, latency_s=0.01, tool_calls={"it": [[READ_VPN]]}, route="IT")
+        graph = create_agent_graph(SpeculationPolicy(mode=mode), memory=SessionMemory())
+        state = {"messages": [HumanMessage(content="How do I set up VPN?")], "llm_calls": 0, "route": "", "response": ""}
+        return [event async for event in stream_agent_events(graph, state, session_config())]
+
+    events = asyncio.run(main())
+    kinds = [kind for kind, _ in events]
+    assert kinds[0] == "route" and events[0][1]["route"] == "IT"
+    assert kinds[-1] == "done" and kinds.count("done") == 1
+    # Both tool events come before the answer, which is streamed after the last tool round
+    assert kinds.index("tool_start") < kinds.index("tool_end") < kinds.index("token")
+    tokens = "".join(data for kind, data in events if kind == "token")
+    assert tokens == "Stub it answer from the fake LLM."
+    assert events[-1][1]["response"] == tokens
@@ -0,0 +1,28 @@
+import asyncio
+import json
+
+from langchain_core.messages import HumanMessage
+
+from agents.tool_executor import ToolExecutor
+from benchmarks.fake_llm import FakeChatModel
+
+READ_VPN = {"name": "read_file", "args": {"payload": json.dumps({"filename": "vpn_setup.txt"})}}
+
+
+def test_round_limit_still_ends_with_a_text_answer():
+    # Asks for tools in more rounds than the executor allows
+    llm = FakeChatModel(latency_s=0, answer="Use the VPN client.", tool_calls=[[READ_VPN]] * 5).with_config(tags=["it"])
+    messages = [HumanMessage(content="How do I set up VPN?")]
+    response = asyncio.run(ToolExecutor(max_rounds=2).run(llm, messages, domain="it"))
+    assert not response.tool_calls
+    assert response.content == "Use the VPN client."
+    # Both allowed rounds ran: two tool-call turns and their results
+    assert sum(1 for message in messages if message.type == "tool") == 2
+
+
+def test_answer_within_the_limit_needs_no_extra_call():
+    llm = FakeChatModel(latency_s=0, answer="Done.", tool_calls=[[READ_VPN]])
+    messages = [HumanMessage(content="How do I set up VPN?")]
+    response = asyncio.run(ToolExecutor(max_rounds=3).run(llm, messages, domain="it"))
+    assert response.content == "Done."
+    assert sum(1 for message in messages if message.type == "tool") == 1
@@ -0,0 +1,338 @@
+"""
+Sentence table and BM25 inverted index over the loaded insurance documents.
+
+The corpus is split into sentences once, when it is loaded. Queries then only
+read the postings of their own words: every sentence that shares a content
+word with the query gets a BM25 score, sentences containing the query's
+words next to each other get a phrase boost, and a heap keeps the top k.
+A batch of queries is scored together with numpy: each distinct term's
+postings are weighted once, and all the scores are summed in one bincount.
+"""
+import heapq
+import math
+import os
+import re
+from array import array
+from collections.abc import Mapping
+from typing import NamedTuple
+
+import numpy as np
+
+# Same sentence boundaries the keyword search has always used
+SENTENCE_SPLIT = re.compile(r'[.!?\n]+')
+TERM = re.compile(r'\w+')
+
+BM25_K1 = float(os.getenv("SEARCH_BM25_K1", "1.2"))
+BM25_B = float(os.getenv("SEARCH_BM25_B", "0.75"))
+# Score multiplier for a sentence that contains all the query's adjacent word pairs (pro rata for some)
+PHRASE_BOOST = float(os.getenv("SEARCH_PHRASE_BOOST", "0.5"))
+# Queries x sentences scored at once by a batch search (8 bytes each)
+BATCH_SCORE_CELLS = int(os.getenv("SEARCH_BATCH_SCORE_CELLS", str(1 << 22)))
+
+STOP_WORDS = frozenset("""
+a about all also am an and any are as at be been but by can could do does did for from
+had has have how i if in into is it its me my no not of on or our please should so
+than that the their them then there these they this those to us was we were what when
+where which who whom why will with would you your
+""".split())
+
+
+def stem(term):
+    """Fold plurals onto the singular ("dependents" -> "dependent", "policies" -> "policy")"""
+    if len(term) > 4 and term.endswith("ies"):
+        return term[:-3] + "y"
+    if len(term) > 3 and term.endswith("s") and not term.endswith("ss"):
+        return term[:-1]
+    return term
+
+
+def tokenize(text):
+    return [stem(term) for term in TERM.findall(text.lower())]
+
+
+def query_terms(query):
+    """The query's terms without stop words; all of them if that would leave nothing"""
+    terms = tokenize(query)
+    content = [term for term in terms if term not in STOP_WORDS]
+    return content or terms
+
+
+def phrase_terms(terms):
+    """
+    Terms the phrase boost compares: stop words dropped on both the query and
+    the sentence side, so "claim for dental" holds the pair (claim, dental).
+    """
+    return [term for term in terms if term not in STOP_WORDS]
+
+
+def phrase_pairs(terms):
+    """Adjacent pairs of distinct query terms, for the phrase boost"""
+    if PHRASE_BOOST <= 0:
+        return set()
+    terms = phrase_terms(terms)
+    return {(first, second) for first, second in zip(terms, terms[1:]) if first != second}
+
+
+def bm25_idf(sentences, matches):
+    return math.log(1 + (sentences - matches + 0.5) / (matches + 0.5))
+
+
+class Hit(NamedTuple):
+    score: float
+    sentence_id: int
+    text: str
+    # Name of the document the text comes from, when the corpus has several
+    source: str = ""
+
+
+class PackedPostings(Mapping):
+    """
+    Read-only term -> array view over one flat array, the form an index is
+    pickled in: a handful of large arrays load much faster than one small
+    array per term.
+    """
+
+    def __init__(self, terms, bounds, values):
+        self._positions = dict(zip(terms, range(len(terms))))
+        self._bounds = bounds
+        self._values = memoryview(values)
+        self._packed = (terms, bounds, values)
+
+    @classmethod
+    def pack(cls, postings):
+        terms = list(postings)
+        bounds, values = array('Q', [0]), array('I')
+        for term in terms:
+            values.extend(postings[term])
+            bounds.append(len(values))
+        return cls(terms, bounds, values)
+
+    def __getitem__(self, term):
+        position = self._positions[term]
+        return self._values[self._bounds[position]:self._bounds[position + 1]]
+
+    def __iter__(self):
+        return iter(self._positions)
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __reduce__(self):
+        return PackedPostings, self._packed
+
+
+class SentenceIndex:
+    """Sentences in document order plus a term -> (sentence ids, term frequencies) inverted index"""
+
+    def __init__(self):
+        self.sentences = []
+        self.lengths = array('I')
+        self.postings = {}
+        self.frequencies = {}
+        self._total_length = 0
+
+    @classmethod
+    def from_text(cls, text):
+        index = cls()
+        index.add_text(text)
+        return index
+
+    def add_text(self, text):
+        """Append the sentences of `text` and index their terms"""
+        self._add_sentences(SENTENCE_SPLIT.split(text))
+
+    def add_chunks(self, chunks):
+        """
+        add_text for text that arrives in pieces (e.g. read from a file), without
+        joining them: only the sentence cut off at the end of a piece is held
+        back for the next one. Returns the number of characters added.
+        """
+        characters, tail = 0, ""
+        for chunk in chunks:
+            characters += len(chunk)
+            sentences = SENTENCE_SPLIT.split(tail + chunk)
+            tail = sentences.pop()
+            self._add_sentences(sentences)
+        self._add_sentences([tail])
+        return characters
+
+    def _add_sentences(self, sentences):
+        for sentence in sentences:
+            sentence = sentence.strip()
+            if not sentence:
+                continue
+            terms = tokenize(sentence)
+            if not terms:
+                continue
+            sentence_id = len(self.sentences)
+            self.sentences.append(sentence)
+            self.lengths.append(len(terms))
+            self._total_length += len(terms)
+            counts = {}
+            for term in terms:
+                counts[term] = counts.get(term, 0) + 1
+            for term, count in counts.items():
+                postings = self.postings.get(term)
+                if postings is None:
+                    postings = self.postings[term] = array('I')
+                    self.frequencies[term] = array('I')
+                postings.append(sentence_id)
+                self.frequencies[term].append(count)
+
+    def __len__(self):
+        return len(self.sentences)
+
+    def __getstate__(self):
+        # Pickled (and loaded back) read-only, with postings packed into flat arrays
+        state = dict(self.__dict__)
+        state["postings"] = PackedPostings.pack(self.postings)
+        state["frequencies"] = PackedPostings.pack(self.frequencies)
+        return state
+
+    @property
+    def average_length(self):
+        return self._total_length / len(self.sentences) if self.sentences else 0.0
+
+    @property
+    def total_length(self):
+        return self._total_length
+
+    def idf(self, term):
+        return bm25_idf(len(self.sentences), len(self.postings.get(term, ())))
+
+    def score(self, terms, idf=None, average_length=None):
+        """
+        BM25 score of every sentence containing at least one of `terms`.
+
+        idf (term -> weight) and average_length default to this index's own
+        statistics; a corpus of several indexes passes its combined ones.
+        """
+        scores = {}
+        average = (average_length or self.average_length) or 1.0
+        lengths = self.lengths
+        for term in set(terms):
+            postings = self.postings.get(term)
+            if postings is None:
+                continue
+            weight = idf[term] if idf is not None else self.idf(term)
+            for sentence_id, tf in zip(postings, self.frequencies[term]):
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[sentence_id] / average)
+                scores[sentence_id] = scores.get(sentence_id, 0.0) + weight * tf * (BM25_K1 + 1) / (tf + norm)
+        return scores
+
+    def _phrase_candidates(self, pairs):
+        """Sentences holding both words of some pair: only they can contain it"""
+        candidates = [
+            np.intersect1d(
+                np.frombuffer(self.postings[first], dtype=np.uint32),
+                np.frombuffer(self.postings[second], dtype=np.uint32),
+                assume_unique=True,
+            )
+            for first, second in pairs
+            if first in self.postings and second in self.postings
+        ]
+        return np.unique(np.concatenate(candidates)) if candidates else np.empty(0, dtype=np.uint32)
+
+    def _phrase_factor(self, sentence_id, pairs, pairs_cache):
+        """
+        Score multiplier for a sentence containing some of the query's
+        adjacent word pairs as adjacent words (stop words aside). pairs_cache (sentence_id ->
+        its word pairs) tokenizes each sentence once per rank or batch.
+        """
+        sentence_pairs = pairs_cache.get(sentence_id)
+        if sentence_pairs is None:
+            tokens = phrase_terms(tokenize(self.sentences[sentence_id]))
+            sentence_pairs = pairs_cache[sentence_id] = set(zip(tokens, tokens[1:]))
+        return 1 + PHRASE_BOOST * len(pairs & sentence_pairs) / len(pairs)
+
+    def rank(self, terms, k, idf=None, average_length=None):
+        """(score, sentence_id) of the top `k` sentences for already tokenized query terms"""
+        scores = self.score(terms, idf, average_length)
+        pairs = phrase_pairs(terms)
+        if pairs and len(scores) and k > 0:
+            # A boost can only lift a sentence into the top k if it is within (1 + PHRASE_BOOST) of it
+            floor = heapq.nlargest(k, scores.values())[-1] / (1 + PHRASE_BOOST)
+            pairs_cache = {}
+            for sentence_id in self._phrase_candidates(pairs).tolist():
+                if scores[sentence_id] >= floor:
+                    scores[sentence_id] *= self._phrase_factor(sentence_id, pairs, pairs_cache)
+        # Ties go to the earlier sentence
+        top = heapq.nlargest(k, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [(score, sentence_id) for sentence_id, score in top]
+
+    def _term_weights(self, term, idf, average, lengths):
+        """(sentence ids, BM25 contribution to each) over one term's postings, or None"""
+        postings = self.postings.get(term)
+        if postings is None:
+            return None
+        ids = np.frombuffer(postings, dtype=np.uint32)
+        tf = np.frombuffer(self.frequencies[term], dtype=np.uint32).astype(np.float64)
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[ids] / average)
+        weight = idf[term] if idf is not None else self.idf(term)
+        return ids, weight * tf * (BM25_K1 + 1) / (tf + norm)
+
+    def rank_batch(self, term_lists, k, idf=None, average_length=None, floors=None):
+        """
+        rank() for many queries in one vectorized pass: the BM25 weights of
+        each distinct term's postings are computed once for the whole batch,
+        then the scores of a block of queries x sentences are summed by a
+        single bincount. Same results as calling rank() per query, in order.
+
+        floors (one per query) are scores the k-th result is already known
+        to reach, e.g. from other documents of the corpus; sentences that
+        cannot reach them even with a phrase boost are not checked for one.
+        """
+        ranked = [[] for _ in term_lists]
+        count = len(self.sentences)
+        if not count or k <= 0:
+            return ranked
+        average = (average_length or self.average_length) or 1.0
+        lengths = np.frombuffer(self.lengths, dtype=np.uint32)
+        weights, pairs_cache = {}, {}
+        rows = max(1, BATCH_SCORE_CELLS // count)
+        for first in range(0, len(term_lists), rows):
+            block = term_lists[first:first + rows]
+            keys, contributions = [], []
+            for row, terms in enumerate(block):
+                for term in set(terms):
+                    if term not in weights:
+                        weights[term] = self._term_weights(term, idf, average, lengths)
+                    if weights[term] is not None:
+                        ids, contribution = weights[term]
+                        keys.append(row * count + ids.astype(np.int64))
+                        contributions.append(contribution)
+            if not keys:
+                continue
+            # BM25 scores are positive, so the nonzero cells are exactly the matches, by query then sentence
+            dense = np.bincount(np.concatenate(keys), weights=np.concatenate(contributions), minlength=len(block) * count)
+            matched = np.flatnonzero(dense)
+            scores = dense[matched]
+            key_queries, key_sentences = np.divmod(matched, count)
+            starts = np.searchsorted(key_queries, np.arange(len(block) + 1))
+            for row, terms in enumerate(block):
+                pairs = phrase_pairs(terms)
+                begin, end = starts[row], starts[row + 1]
+                if not pairs or begin == end:
+                    continue
+                # Same cut-off as rank(): candidates too far below the query's k-th score are not tokenized
+                top = min(k, end - begin)
+                floor = np.partition(scores[begin:end], -top)[-top]
+                if floors is not None:
+                    floor = max(floor, floors[first + row])
+                positions = begin + np.searchsorted(key_sentences[begin:end], self._phrase_candidates(pairs))
+                for position in positions[scores[positions] >= floor / (1 + PHRASE_BOOST)].tolist():
+                    scores[position] *= self._phrase_factor(int(key_sentences[position]), pairs, pairs_cache)
+
+            # Best first within each query; ties go to the earlier sentence
+            order = np.lexsort((key_sentences, -scores, key_queries))
+            for row in range(len(block)):
+                top = order[starts[row]:min(starts[row + 1], starts[row] + k)]
+                ranked[first + row] = list(zip(scores[top].tolist(), key_sentences[top].tolist()))
+        return ranked
+
+    def search(self, query, k=5):
+        """Top `k` sentences by BM25 score (with phrase boost), best first"""
+        return [
+            Hit(round(score, 4), sentence_id, self.sentences[sentence_id])
+            for score, sentence_id in self.rank(query_terms(query), k)
+        ]
@@ -0,0 +1,198 @@
+"""
+Semantic search over the loaded insurance documents.
+
+Passages (short windows of consecutive sentences) are embedded in batches
+with the same model the notebooks use, normalized, and stored as a .npy
+matrix named after a hash of the model, passages and dtype. The matrix is
+memory-mapped, so a restart with unchanged content reuses it instead of
+re-embedding. A query is one dot product against the matrix plus an
+argpartition for the top k.
+"""
+import hashlib
+import os
+import threading
+import weakref
+from pathlib import Path
+
+import numpy as np
+
+from search_index import Hit
+
+EMBEDDING_MODEL = os.getenv("SEARCH_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+EMBED_BATCH_SIZE = int(os.getenv("SEARCH_EMBED_BATCH_SIZE", "64"))
+# float32, or int8 for a matrix four times smaller at a small cost in precision
+VECTOR_DTYPE = os.getenv("SEARCH_VECTOR_DTYPE", "float32")
+VECTOR_CACHE_DIR = os.getenv("SEARCH_VECTOR_DIR", ".vector_cache")
+PASSAGE_SENTENCES = int(os.getenv("SEARCH_PASSAGE_SENTENCES", "3"))
+PASSAGE_STRIDE = int(os.getenv("SEARCH_PASSAGE_STRIDE", "2"))
+
+# Components of normalized vectors lie in [-1, 1]; int8 stores them times this
+INT8_SCALE = 127
+# Rows scored per block, so an int8 matrix is never converted to float all at once
+SCORE_BLOCK_ROWS = 65536
+# Texts embedded and written to the matrix at a time
+WRITE_BLOCK_TEXTS = 1024
+
+# Every VectorIndex still reachable, so pruning never deletes a matrix one has mapped
+_live_indexes = weakref.WeakSet()
+_live_indexes_lock = threading.Lock()
+
+
+class SentenceEmbedder:
+    """sentence-transformers model loaded on first use; encode() returns normalized float32 rows"""
+
+    def __init__(self, model_name=EMBEDDING_MODEL, batch_size=EMBED_BATCH_SIZE):
+        self.name = model_name
+        self.batch_size = batch_size
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _get_model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    # Heavy import, only paid when semantic search is used
+                    from sentence_transformers import SentenceTransformer
+                    print(f"Loading embedding model {self.name}...")
+                    self._model = SentenceTransformer(self.name)
+        return self._model
+
+    @property
+    def dimension(self):
+        return self._get_model().get_sentence_embedding_dimension()
+
+    def encode(self, texts):
+        return self._get_model().encode(
+            texts,
+            batch_size=self.batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        ).astype(np.float32, copy=False)
+
+
+def passage_windows(sentences, size=PASSAGE_SENTENCES, stride=PASSAGE_STRIDE):
+    """(first sentence id, text) for overlapping windows of `size` sentences"""
+    stride = max(1, min(stride, size))
+    last_start = max(0, len(sentences) - size)
+    starts = list(range(0, last_start + 1, stride))
+    if starts and starts[-1] != last_start:
+        starts.append(last_start)
+    return [(start, ". ".join(sentences[start:start + size])) for start in starts if sentences]
+
+
+def content_hash(model_name, texts, dtype):
+    digest = hashlib.sha256(f"{model_name}\0{dtype}\0".encode("utf-8"))
+    for text in texts:
+        digest.update(text.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _quantize(vectors, dtype):
+    if dtype == "int8":
+        return np.clip(np.rint(vectors * INT8_SCALE), -INT8_SCALE, INT8_SCALE).astype(np.int8)
+    return vectors
+
+
+class VectorIndex:
+    """Memory-mapped matrix of normalized passage embeddings"""
+
+    def __init__(self, passages, matrix, embedder, path=None):
+        self.passages = passages
+        self.matrix = matrix
+        self.embedder = embedder
+        self.path = path
+        if path is not None:
+            with _live_indexes_lock:
+                _live_indexes.add(self)
+
+    def __len__(self):
+        return len(self.passages)
+
+    @classmethod
+    def build(cls, sentences, embedder=None, cache_dir=VECTOR_CACHE_DIR, dtype=VECTOR_DTYPE):
+        """Load the stored matrix for these sentences, or embed them and store it"""
+        if dtype not in ("float32", "int8"):
+            raise ValueError(f"Unsupported vector dtype: {dtype}")
+        embedder = embedder or SentenceEmbedder()
+        passages = passage_windows(sentences)
+        texts = [text for _, text in passages]
+        if not texts:
+            # A document without sentences: nothing to embed, store or map
+            return cls(passages, np.zeros((0, embedder.dimension), dtype=dtype), embedder)
+        digest = content_hash(embedder.name, texts, dtype)
+        cache_dir = Path(cache_dir)
+        path = cache_dir / f"{digest}.npy"
+
+        if path.exists():
+            print(f"Reusing stored embeddings: {path}")
+            return cls(passages, np.load(path, mmap_mode="r"), embedder, path)
+
+        print(f"Embedding {len(texts)} passages in batches of {getattr(embedder, 'batch_size', '?')}...")
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        # Written under a temporary name and renamed, so a crash never leaves a partial matrix
+        temp_path = cache_dir / f"{digest}.tmp.npy"
+        matrix = np.lib.format.open_memmap(temp_path, mode="w+", dtype=dtype, shape=(len(texts), embedder.dimension))
+        for start in range(0, len(texts), WRITE_BLOCK_TEXTS):
+            block = embedder.encode(texts[start:start + WRITE_BLOCK_TEXTS])
+            matrix[start:start + len(block)] = _quantize(block, dtype)
+        matrix.flush()
+        del matrix
+        os.replace(temp_path, path)
+        return cls(passages, np.load(path, mmap_mode="r"), embedder, path)
+
+    def scores(self, query_vectors):
+        """Cosine similarity of every passage (rows) to each query vector (columns)"""
+        query_vectors = np.asarray(query_vectors, dtype=np.float32)
+        scale = 1.0
+        if self.matrix.dtype == np.int8:
+            scale = 1.0 / INT8_SCALE
+        result = np.empty((len(self.matrix), query_vectors.shape[0]), dtype=np.float32)
+        for start in range(0, len(self.matrix), SCORE_BLOCK_ROWS):
+            block = self.matrix[start:start + SCORE_BLOCK_ROWS]
+            np.dot(block.astype(np.float32, copy=False), query_vectors.T, out=result[start:start + len(block)])
+        if scale != 1.0:
+            result *= scale
+        return result
+
+    def top_k(self, scores, k):
+        """Hits for the k best rows of one column of scores, best first"""
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [
+            Hit(round(float(scores[i]), 4), self.passages[i][0], self.passages[i][1])
+            for i in best
+        ]
+
+    def query_vector(self, query):
+        return self.embedder.encode([query])
+
+    def search(self, query, k=5):
+        """Top `k` passages by cosine similarity to the query, best first"""
+        if not self.passages:
+            return []
+        return self.top_k(self.scores(self.query_vector(query))[:, 0], k)
+
+
+def prune_vector_cache(keep, cache_dir=VECTOR_CACHE_DIR):
+    """
+    Delete stored matrices other than `keep`: earlier content is never read again.
+
+    Matrices still mapped by a live VectorIndex (an old corpus an in-flight
+    search holds on to) are kept until a later prune. A file that cannot be
+    deleted is skipped.
+    """
+    keep = {Path(path) for path in keep if path is not None}
+    with _live_indexes_lock:
+        keep.update(Path(index.path) for index in list(_live_indexes))
+    for stale in Path(cache_dir).glob("*.npy"):
+        if stale in keep:
+            continue
+        try:
+            stale.unlink(missing_ok=True)
+        except OSError as e:
+            print(f"Could not delete stored embeddings {stale}: {e}")